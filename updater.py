@@ -4,22 +4,106 @@
 # Imports
 # ----------------------------------------------------------------------
 
-import os, time
+import os, sys, threading, time
+import argparse
 import pywikibot  # type: ignore
 from tqdm import tqdm
 import asyncio
-from typing import Dict, List, Optional
+import concurrent.futures
+from typing import Dict, List, Optional, Set, Tuple
 
 
-from scripts.userscripts.updater_modules.item_orchestrator import orchestrate_item  # type: ignore
-from scripts.userscripts.updater_modules.tile_orchestrator import orchestrate_tile  # type: ignore
-from scripts.userscripts.updater_modules.fluid_orchestrator import orchestrate_fluid  # type: ignore
-from scripts.userscripts.updater_modules.vehicle_orchestrator import orchestrate_vehicle  # type: ignore
-from scripts.userscripts.updater_modules.tag_orchestrator import orchestrate_tag  # type: ignore
+from scripts.userscripts.updater_modules.registry import (  # type: ignore
+    category_names,
+    get_plugin,
+    index_roots,
+    set_enabled,
+    template_scan_enabled,
+)
 
 from scripts.userscripts.updater_modules.formatter import format_wiki_text  # type: ignore
 from scripts.userscripts.updater_modules.loot_orchestrator import orchestrate_loot  # type: ignore
-from updater_modules.updater_search import search_wiki, process_pages  # type: ignore
+from scripts.userscripts.updater_modules.async_reader import fetch_pages_blocking  # type: ignore
+from scripts.userscripts.updater_modules.audit import DriftAudit, loot_sources  # type: ignore
+from scripts.userscripts.updater_modules.item.file_utils import (  # type: ignore
+    build_parser_index,
+    cache_stats,
+    file_mtime,
+    find_file_with_subfolders,
+    invalidate_paths,
+    is_directory,
+    list_directory,
+    load_parser_index_state,
+    connect_cache_server,
+    mount_pack,
+    parser_index_state,
+    recording_reads,
+    reset_cache_stats,
+)
+from scripts.userscripts.updater_modules.updater_search import (  # type: ignore
+    search_wiki,
+    process_pages,
+    scan_template_files,
+    get_language_code,
+    load_language_partitions,
+    refresh_pages,
+    fetch_changed_titles,
+    recent_changes_cover,
+    fetch_tuner,
+    cpu_tuner,
+)
+from scripts.userscripts.updater_modules.scheduler import (  # type: ignore
+    Stage,
+    run_stages,
+    print_stage_report,
+)
+from scripts.userscripts.updater_modules.dependencies import (  # type: ignore
+    DependencyMap,
+    template_titles_for,
+)
+from scripts.userscripts.updater_modules.watcher import create_watcher, collect_changes  # type: ignore
+from scripts.userscripts.updater_modules.diagnostics import diagnostics, record_event  # type: ignore
+from scripts.userscripts.updater_modules.watchdog import (  # type: ignore
+    PageWatchdog,
+    mark_processor,
+    print_quarantine_report,
+    write_quarantine_report,
+)
+from scripts.userscripts.updater_modules.navbox_index import (  # type: ignore
+    NAVBOX_SOURCES,
+    navbox_index,
+)
+from scripts.userscripts.updater_modules.tile.tile_index import tile_index  # type: ignore
+from scripts.userscripts.updater_modules.autotune import write_tuning_log  # type: ignore
+from scripts.userscripts.updater_modules.features import page_features  # type: ignore
+from scripts.userscripts.updater_modules.parser_pack import ParserPack  # type: ignore
+from scripts.userscripts.updater_modules.cache_server import CacheClient  # type: ignore
+from scripts.userscripts.updater_modules.prefetch import Prefetcher  # type: ignore
+from scripts.userscripts.updater_modules.dry_run import DryRun  # type: ignore
+from scripts.userscripts.updater_modules.deadline import (  # type: ignore
+    Deadline,
+    PriorityScheduler,
+    load_continuation,
+    load_priority_titles,
+    write_continuation,
+)
+from scripts.userscripts.updater_modules.patterns import (  # type: ignore
+    pattern_stats,
+    print_pattern_report,
+    reset_pattern_stats,
+    set_profiling,
+)
+from scripts.userscripts.updater_modules.metrics import (  # type: ignore
+    MetricsStore,
+    print_report,
+    run_metrics,
+)
+from scripts.userscripts.updater_modules.sharding import (  # type: ignore
+    ShardQueue,
+    print_shard_report,
+    shard_of,
+    worker_name,
+)
 
 # ----------------------------------------------------------------------
 # Config
@@ -28,17 +112,92 @@ from updater_modules.updater_search import search_wiki, process_pages  # type: i
 cpu_threads = 8
 rate_limit = 0
 
+fetch_backend = "pywikibot"  # "pywikibot" or "async" (requires aiohttp)
+fetch_concurrency = 16  # Requests in flight for the async backend
+
+# Auto-tuning: batch size and workers for fetching (pywikibot backend) and categorizing pages.
+# None calibrates on the first batches of the run; set a value to pin it.
+auto_tune = True
+fetch_batch_size = None
+fetch_workers = None
+cpu_batch_size = None
+cpu_workers = None
+autotune_log_path = "updater_autotune.json"  # Chosen settings and calibration trials of the last run
+
+# Run history: one record per run, compared with the median of earlier runs of the same mode
+metrics_db_path = "updater_metrics.sqlite"  # None to disable
+metrics_window = 10
+metrics_regression_ratio = 1.5
+dump_path = None  # Optional pages-articles XML dump (.xml, .bz2, .gz, .xz) to load instead of the API
+
 default_language = "en"
 language_pages = False  # Set to False to exclude pages with language codes
 
+# Multi-language mode: load the wiki once and process every language in parallel
+multi_language = False
+languages = None  # List of language codes to process, None for all
+language_workers = 4
+
 parser_output_path = os.path.join(
     os.sep, "mnt", "data", "wiki", "pz-wiki_parser", "output"
 )
 history_path = os.path.join(os.sep, "mnt", "data", "wiki", "history", "txt")
+parser_pack_path = None  # Pack of the parser output and history, read instead of the trees when set
+parser_pack_verify = False  # Also compare the size of every file with the pack before using it
+cache_server_socket = None  # Unix socket of a cache server shared by the updater processes of this host
 
 test_mode = False
 test_page = "User:Calvy/sandbox"
 
+# Dry run: run everything but write a diff per changed page and change statistics instead of saving
+dry_run = False
+dry_run_path = "updater_dry_run"
+
+# Audit: report how far the wiki has drifted from the parser output instead of updating it
+audit_mode = False
+audit_report_path = "updater_audit.json"  # Drift per category and processor, with the stale pages
+
+# Targeted run: only these titles are fetched and processed (set from the command line)
+target_titles = None
+
+# Daemon mode: after the first run, keep watching the parser output and only
+# update the pages whose parser files change
+daemon_mode = False
+watch_debounce = 5  # Seconds without new writes before a batch of changes is processed
+watch_max_delay = 60  # Longest a batch of changes waits while writes keep coming
+watch_poll_interval = 10  # Seconds between scans when inotify is unavailable
+
+# Sharded mode: split a run across several processes or hosts by title hash
+shard_count = 1  # More than 1 enables sharded mode
+shard_index = None  # Shard for this worker, None to claim pending shards from the queue
+shard_role = "worker"  # "worker" processes shards, "saver" saves their results, "status" reports progress
+shard_run_id = "default"  # Name of the run, change it to start a fresh re-sync
+shard_db_path = "updater_shards.sqlite"  # Shared by every worker, e.g. on a network drive
+shard_progress_batch = 250  # Pages processed between progress updates
+shard_lease = 600  # Seconds a running shard may go without an update before another worker reclaims it
+shard_max_attempts = 3  # Claims of a shard before its failure is final
+
+# Watchdog: process each page in a worker process under a time and memory budget
+page_timeout = None  # Seconds a page may take before it is cancelled and quarantined, None to disable
+page_memory_limit = 2048  # MB a page may allocate on top of the run, when page_timeout is set
+quarantine_report_path = "updater_quarantine.json"  # Cancelled pages and the processor that was running
+
+# Diagnostics: missing files and failed batches are counted and summarised at the end of the run
+diagnostics_log_path = None  # Optional JSON lines file receiving every diagnostic event
+pattern_profiling = False  # Time every regular expression and print the costliest at the end of the run
+
+# Navboxes: pages grouped by infobox category, type and tags, kept between runs
+navbox_index_path = "updater_navbox_index.json"  # Only infoboxes changed since the last run are read again
+
+# Prefetch: read the parser files of upcoming pages in the background while earlier pages are processed
+prefetch_lookahead = 64  # Pages read ahead of the one being processed, 0 to disable
+prefetch_workers = 8  # Threads reading ahead
+
+# Deadline runs: process and save pages in priority order and stop cleanly at the deadline
+run_deadline = None  # Minutes the run may take, None for no limit
+continuation_path = "updater_continuation.json"  # Pages left by the last full run, processed first by the next
+priority_titles_path = None  # Optional file of high-traffic titles, one per line, most important first
+
 # ----------------------------------------------------------------------
 # Orchestrator Options
 # ----------------------------------------------------------------------
@@ -51,6 +210,19 @@ enable_vehicle_orchestrator = True
 enable_tag_orchestrator = True
 enable_text_formatter = True
 
+# Parser files read by each processed page, kept to map file changes back to pages
+page_dependencies = DependencyMap()
+
+# Page order and leftovers of a deadline run, None without a deadline
+scheduler: Optional[PriorityScheduler] = None
+
+# Diffs and statistics of a dry run, None when saving for real
+dry_run_writer: Optional[DryRun] = None
+
+# Language partitions that failed this run, and their pages as (title, category)
+failed_languages: List[str] = []
+failed_pages: List[Tuple[str, Optional[str]]] = []
+
 # ----------------------------------------------------------------------
 # Processing
 # ----------------------------------------------------------------------
@@ -69,127 +241,1321 @@ except FileNotFoundError:
     current_version = "Unknown"
 
 
+def apply_orchestrator_options() -> None:
+    """Enable or disable the registered orchestrators from the config flags."""
+    set_enabled("item", enable_item_orchestrator)
+    set_enabled("tile", enable_tile_orchestrator)
+    set_enabled("vehicle", enable_vehicle_orchestrator)
+    set_enabled("fluid", enable_fluid_orchestrator)
+    set_enabled("tag", enable_tag_orchestrator)
+
+
+def apply_tuning_options() -> None:
+    """Pin or free the fetch and categorization settings from the config."""
+    fetch_tuner.enabled = cpu_tuner.enabled = auto_tune
+    fetch_tuner.pin(fetch_batch_size, fetch_workers)
+    cpu_tuner.pin(cpu_batch_size, cpu_workers)
+
+
+def mount_parser_pack(check: bool = True) -> None:
+    """
+    Read parser output and history from parser_pack_path, if one is configured.
+
+    Args:
+        check: Compare the pack with the trees first; watchdog workers mount
+            the pack the main process already checked
+    """
+    global parser_pack_path
+    if not parser_pack_path:
+        return
+    try:
+        pack = ParserPack(parser_pack_path)
+    except (OSError, ValueError) as e:
+        print(f"Parser pack not used, reading the parser output directly: {e}")
+        return
+    roots = {parser_output_path: "parser", history_path: "history"}
+    # A pack older than its trees would publish outdated content
+    stale = pack.stale_roots(roots, parser_pack_verify) if check else []
+    if stale:
+        pack.close()
+        print(
+            f"Parser pack not used, {' and '.join(stale)} changed since it was built on {pack.built}; "
+            f"rebuild {parser_pack_path} to use it again"
+        )
+        # Watchdog workers take their settings from here and read the trees too
+        parser_pack_path = None
+        return
+    if check and not pack.stamps:
+        print(f"Parser pack {parser_pack_path} records no directory stamps, rebuild it to check it is current")
+    mount_pack(pack, roots)
+    print(f"Parser pack: {pack.file_count} files from {parser_pack_path}, built {pack.built}")
+
+
+def connect_parser_cache() -> None:
+    """Take the parser index and file contents from cache_server_socket, if one is configured."""
+    if not cache_server_socket:
+        return
+    try:
+        client = CacheClient(cache_server_socket)
+    except OSError as e:
+        print(f"Cache server not used, reading the parser output directly: {e}")
+        return
+    connect_cache_server(client)
+    stats = client.stats() or {}
+    print(
+        f"Cache server: {stats.get('files', 0)} files indexed, "
+        f"{stats.get('cached', 0)} cached, on {cache_server_socket}"
+    )
+
+
+def refresh_navbox_index() -> None:
+    """Load the navbox index and bring it up to date with the parser output."""
+    if not any(get_plugin(kind) for kind in NAVBOX_SOURCES):
+        return
+    if navbox_index.path != navbox_index_path:
+        navbox_index.path = navbox_index_path
+        navbox_index.load()
+
+    pages, parsed = navbox_index.refresh(parser_output_path, indexed_languages())
+    print(f"Navbox index: {pages} pages, {parsed} infoboxes read")
+
+
+def indexed_languages() -> List[str]:
+    """Languages whose parser output the run's indexes cover."""
+    if not (multi_language or language_pages):
+        return [default_language]
+    if languages is not None:
+        return languages
+    # Every language: the language folders of the parser output
+    try:
+        return sorted(
+            name
+            for name in list_directory(parser_output_path)
+            if is_directory(os.path.join(parser_output_path, name))
+        )
+    except OSError as e:
+        print(f"Could not list languages in {parser_output_path}: {e}")
+        return []
+
+
+def refresh_tile_index() -> None:
+    """Rebuild the sprite and tile ID reverse index of the tile parser output."""
+    if not get_plugin("tile"):
+        return
+    infoboxes, ids = tile_index.refresh(parser_output_path, indexed_languages())
+    print(f"Tile index: {infoboxes} infoboxes, {ids} sprite and tile IDs")
+
+
+def orchestrator_settings(title: str) -> Dict:
+    """Settings handed to the orchestrator entry points for a page."""
+    return {
+        "parser_output_path": parser_output_path,
+        "history_path": history_path,
+        "current_version": current_version,
+        "features": page_features.get(title),
+    }
+
+
+def prefetch_paths(title: str, text: str, category: str) -> List[str]:
+    """
+    Parser files a page is expected to read: the ones it read last time it
+    was processed, or the ones its orchestrator derives from the page text.
+    """
+    recorded = page_dependencies.paths_of(title)
+    if recorded:
+        return sorted(recorded)
+    plugin = get_plugin(category)
+    if plugin is None or plugin.prefetch is None:
+        return []
+    language_code = get_language_code(title, default_language)
+    return plugin.prefetch(title, text, language_code, orchestrator_settings(title))
+
+
 def process_page_by_category(title: str, text: str, category: str) -> Optional[Dict]:
     """Process a page based on its category."""
     # Language code
-    if title.startswith("User:") or "/" not in title:
-        language_code = default_language
-    else:
-        language_code = title.rsplit("/", 1)[1]
+    language_code = get_language_code(title, default_language)
 
     # Orchestrators
-    if category == "item" and enable_item_orchestrator:
-        new_text, processes = orchestrate_item(
-            text, parser_output_path, history_path, language_code, title
-        )
-    elif category == "vehicle" and enable_vehicle_orchestrator:
-        new_text, processes = orchestrate_vehicle(
-            text, parser_output_path, history_path, language_code, title
-        )
-    elif category == "tile" and enable_tile_orchestrator:
-        new_text, processes = orchestrate_tile(
-            text, parser_output_path, history_path, language_code
-        )
-    elif category == "fluid" and enable_fluid_orchestrator:
-        new_text, processes, was_edited = orchestrate_fluid(
-            text, parser_output_path, history_path, language_code
-        )
-        if not was_edited:
-            return None
-    elif category == "tag" and enable_tag_orchestrator:
-        new_text, processes, was_edited = orchestrate_tag(
-            text,
-            parser_output_path,
-            history_path,
-            language_code,
-            current_version,
-            title,
-        )
-        if not was_edited:
-            return None
-    else:
+    plugin = get_plugin(category)
+    if plugin is None:
         return None
+    settings = orchestrator_settings(title)
+    mark_processor(f"{category}.orchestrate")
+    result = plugin.entry(title, text, language_code, settings)
+    if result is None:
+        return None
+    new_text, processes = result
 
     # Formatter
     if enable_text_formatter:
+        mark_processor("format_wiki_text")
         formatted_text = format_wiki_text(new_text)
         if formatted_text != text:
             if "Format wiki text" not in processes:
                 processes.append("Format wiki text")
-            return {"title": title, "new_text": formatted_text, "processes": processes}
+            return {
+                "title": title,
+                "old_text": text,
+                "new_text": formatted_text,
+                "processes": processes,
+                "category": category,
+            }
     elif new_text != text:
-        return {"title": title, "new_text": new_text, "processes": processes}
+        return {
+            "title": title,
+            "old_text": text,
+            "new_text": new_text,
+            "processes": processes,
+            "category": category,
+        }
 
     return None
 
 
+def process_page_recorded(
+    title: str, text: str, category: str
+) -> Tuple[Optional[Dict], set]:
+    """Process a page and return its result with the parser paths it read."""
+    with recording_reads() as paths:
+        result = process_page_by_category(title, text, category)
+    return result, paths
+
+
+# Config a watchdog worker takes over from the run before processing pages
+PAGE_WORKER_SETTINGS = (
+    "parser_output_path",
+    "history_path",
+    "parser_pack_path",
+    "cache_server_socket",
+    "default_language",
+    "languages",
+    "multi_language",
+    "language_pages",
+    "enable_item_orchestrator",
+    "enable_tile_orchestrator",
+    "enable_vehicle_orchestrator",
+    "enable_fluid_orchestrator",
+    "enable_tag_orchestrator",
+    "enable_text_formatter",
+)
+
+
+def page_worker_settings() -> Dict:
+    """The config of this run that a watchdog worker needs to process pages like it."""
+    return {name: globals()[name] for name in PAGE_WORKER_SETTINGS}
+
+
+def page_worker_indexes() -> Dict:
+    """The parser indexes of this run, handed to watchdog workers so they need not rebuild them."""
+    return {
+        "parser": parser_index_state(),
+        "navbox": navbox_index.state(),
+        "tile": tile_index.state(),
+    }
+
+
+def init_page_worker(settings: Dict, indexes: Dict) -> None:
+    """
+    Set up a watchdog worker process: apply the run's config and take over
+    the parser indexes the orchestrators read through.
+    """
+    globals().update(settings)
+    apply_orchestrator_options()
+    mount_parser_pack(check=False)
+    connect_parser_cache()
+    load_parser_index_state(indexes["parser"])
+    navbox_index.load_state(indexes["navbox"])
+    tile_index.load_state(indexes["tile"])
+
+
+# Watchdogs of the run by thread, each keeping its worker from one category
+# to the next; a worker is only replaced after a page killed it
+_page_watchdogs: Dict[int, PageWatchdog] = {}
+_page_watchdogs_lock = threading.Lock()
+
+
+def page_watchdog() -> Optional[PageWatchdog]:
+    """The calling thread's watchdog, None unless a page budget is configured."""
+    if not page_timeout:
+        return None
+    thread = threading.get_ident()
+    with _page_watchdogs_lock:
+        watchdog = _page_watchdogs.get(thread)
+        if watchdog is None:
+            watchdog = PageWatchdog(
+                process_page_recorded,
+                page_timeout,
+                page_memory_limit,
+                init_page_worker,
+                (page_worker_settings(), page_worker_indexes()),
+            )
+            _page_watchdogs[thread] = watchdog
+    return watchdog
+
+
+def close_page_watchdogs() -> None:
+    """Stop the watchdog workers; pages processed later start new ones from the current indexes."""
+    with _page_watchdogs_lock:
+        watchdogs = list(_page_watchdogs.values())
+        _page_watchdogs.clear()
+    for watchdog in watchdogs:
+        watchdog.close()
+
+
 async def process_category(
-    site: pywikibot.Site, titles: List[str], category: str, wiki_cache: Dict[str, str]
+    site: pywikibot.Site,
+    titles: List[str],
+    category: str,
+    wiki_cache: Dict[str, str],
+    language_code: str = None,
+    position: int = None,
 ) -> List[Dict]:
     """Process all pages in a category using the wiki cache."""
+    desc = f"Processing {category} pages"
+    if language_code:
+        desc = f"[{language_code}] {desc}"
+
+    # Most important pages first when the run has a deadline
+    if scheduler is not None:
+        titles = scheduler.order(titles, category, wiki_cache)
+
+    # Run pages in a watchdog worker when a page budget is configured
+    watchdog = page_watchdog()
+
+    # Read parser files ahead of the loop; watchdog workers are separate
+    # processes with their own file cache, so not with those
+    prefetcher = None
+    if prefetch_lookahead and watchdog is None:
+        prefetcher = Prefetcher(
+            [(title, wiki_cache[title]) for title in titles if title in wiki_cache],
+            lambda title, text: prefetch_paths(title, text, category),
+            prefetch_lookahead,
+            prefetch_workers,
+        )
+
     # Process pages using the cache
     update_queue = []
-    with tqdm(total=len(titles), desc=f"Processing {category} pages") as pbar:
-        for title in titles:
-            # For template pages, we need to fetch them separately since they're not in the main cache
-            if category == "tag" and title.startswith("Template:Tag_"):
-                try:
-                    page = pywikibot.Page(site, title)
-                    text = page.text if page.exists() else ""
-                    result = process_page_by_category(title, text, category)
+    # The prefetch threads stop even if a processor raises; watchdog
+    # workers are stopped by main
+    try:
+        with tqdm(total=len(titles), desc=desc, position=position) as pbar:
+            for index, title in enumerate(titles):
+                if scheduler is not None and scheduler.deadline.expired():
+                    for left_title in titles[index:]:
+                        scheduler.leave(left_title, category)
+                    break
+
+                # For template pages, we need to fetch them separately since they're not in the main cache
+                if category == "tag" and title.startswith("Template:Tag_"):
+                    try:
+                        page = pywikibot.Page(site, title)
+                        text = page.text if page.exists() else ""
+                        result = process_page_by_category(title, text, category)
+                        if result:
+                            result["page"] = page
+                            update_queue.append(result)
+                    except Exception as e:
+                        record_event(
+                            "template_page_failed",
+                            "process_category",
+                            language_code,
+                            f"{title}: {e}",
+                            "error",
+                        )
+                elif title in wiki_cache:
+                    if prefetcher is not None:
+                        prefetcher.wait(title)
+                    if watchdog is None:
+                        result, paths = process_page_recorded(
+                            title, wiki_cache[title], category
+                        )
+                    else:
+                        completed, outcome = watchdog.run(
+                            title, category, title, wiki_cache[title], category
+                        )
+                        result, paths = outcome if completed else (None, None)
+                    if paths is not None:
+                        page_dependencies.record(title, category, paths)
                     if result:
+                        # Create page object only for pages that need updating
+                        page = pywikibot.Page(site, title)
                         result["page"] = page
                         update_queue.append(result)
-                except Exception as e:
-                    print(f"Error processing template page {title}: {e}")
-            elif title in wiki_cache:
-                result = process_page_by_category(title, wiki_cache[title], category)
-                if result:
-                    # Create page object only for pages that need updating
-                    page = pywikibot.Page(site, title)
-                    result["page"] = page
-                    update_queue.append(result)
-            pbar.update(1)
+                pbar.update(1)
+    finally:
+        if prefetcher is not None:
+            prefetcher.close()
+
+    if prefetcher is not None:
+        run_metrics.add("prefetch_files", prefetcher.files)
+        run_metrics.add("prefetch_wait_seconds", round(prefetcher.waited, 3))
 
     return update_queue
 
 
-async def main(site):
-    if test_mode:
-        # Create a single-item wiki cache for the sandbox
-        sandbox_page = pywikibot.Page(site, test_page)
-        wiki_cache = {sandbox_page.title(): sandbox_page.text}
+def process_language_partition(
+    site: pywikibot.Site, language_code: str, wiki_cache: Dict[str, str], position: int
+) -> Tuple[List[Dict], Dict]:
+    """Categorize and process one language partition, returning its updates and stats."""
+    start = time.perf_counter()
 
-        # Use the search module to categorize the sandbox page
-        categorized_pages = await process_pages(
-            wiki_cache, None, default_language, site
+    # Template pages have no language suffix, so only the default language scans them
+    scan_path = parser_output_path if language_code == default_language else None
+    categorized_pages = asyncio.run(
+        process_pages(
+            wiki_cache, scan_path, language_code, site, fetch_backend, fetch_concurrency
         )
-    else:
-        # Search and categorize pages
-        categorized_pages, wiki_cache = await search_wiki(
-            site, language_pages, cpu_threads, parser_output_path, default_language
-        )
-
-    # First update loot modules if enabled
-    if enable_loot_orchestrator:
-        orchestrate_loot(site, parser_output_path, rate_limit)
+    )
 
-    # Process categories
-    all_update_queues = []
+    update_queue = []
     for category, titles in categorized_pages.items():
         if titles:
-            update_queue = await process_category(site, titles, category, wiki_cache)
-            all_update_queues.extend(update_queue)
+            update_queue.extend(
+                asyncio.run(
+                    process_category(
+                        site, titles, category, wiki_cache, language_code, position
+                    )
+                )
+            )
+
+    stats = {
+        "pages": len(wiki_cache),
+        "edits": len(update_queue),
+        "seconds": time.perf_counter() - start,
+    }
+    return update_queue, stats
 
-    # Save sequentially
-    for entry in tqdm(all_update_queues, desc="Saving pages"):
+
+async def process_language_partitions(
+    site: pywikibot.Site, partitions: Dict[str, Dict[str, str]]
+) -> List[Dict]:
+    """Process all language partitions concurrently and report per-language throughput."""
+    loop = asyncio.get_running_loop()
+    all_update_queues = []
+    language_stats = {}
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=language_workers) as executor:
+        futures = {
+            language_code: loop.run_in_executor(
+                executor,
+                process_language_partition,
+                site,
+                language_code,
+                partition,
+                position,
+            )
+            for position, (language_code, partition) in enumerate(
+                sorted(partitions.items())
+            )
+        }
+        for language_code, future in futures.items():
+            try:
+                update_queue, language_stats[language_code] = await future
+                all_update_queues.extend(update_queue)
+            except Exception as e:
+                print(f"Error processing language {language_code}: {e}")
+                record_event(
+                    "language_partition_failed",
+                    "process_language_partitions",
+                    language_code,
+                    f"{type(e).__name__}: {e}",
+                    level="error",
+                )
+                failed_languages.append(language_code)
+                failed_pages.extend((title, None) for title in sorted(partitions[language_code]))
+
+    print(f"\n{'Language':<10}{'Pages':>10}{'Edits':>10}{'Seconds':>10}{'Pages/s':>10}")
+    for language_code, stats in sorted(language_stats.items()):
+        rate = stats["pages"] / stats["seconds"] if stats["seconds"] else 0.0
+        print(
+            f"{language_code:<10}{stats['pages']:>10}{stats['edits']:>10}"
+            f"{stats['seconds']:>10.1f}{rate:>10.1f}"
+        )
+
+    return all_update_queues
+
+
+def save_updates(update_queue: List[Dict]) -> int:
+    """Save queued page updates sequentially, honouring the rate limit and the deadline."""
+    if scheduler is not None:
+        update_queue = sorted(update_queue, key=lambda entry: scheduler.key(entry["title"]))
+    saved = 0
+    for entry in tqdm(update_queue, desc="Saving pages"):
+        if scheduler is not None and scheduler.deadline.expired():
+            scheduler.leave(entry["title"], entry.get("category"))
+            continue
+        if dry_run_writer is not None:
+            old_text = entry.get("old_text")
+            if old_text is None:
+                old_text = entry["page"].text
+            dry_run_writer.record(
+                entry["title"], entry.get("category"), entry["processes"], old_text, entry["new_text"]
+            )
+            saved += 1
+            continue
         entry["page"].text = entry["new_text"]
         summary = f"Automated updating: {', '.join(entry['processes'])}"
         entry["page"].save(summary=summary, tags="bot")
+        run_metrics.record_edit(entry.get("category"))
+        saved += 1
         time.sleep(rate_limit)
+    return saved
+
+
+def parser_inputs_changed(since: float):
+    """Return a check telling whether a page's parser files changed after since (epoch seconds)."""
+
+    def changed(title: str, text: str, category: str) -> bool:
+        for path in prefetch_paths(title, text, category):
+            mtime = file_mtime(find_file_with_subfolders(path))
+            if mtime is not None and mtime > since:
+                return True
+        return False
+
+    return changed
+
+
+async def run_audit(site: pywikibot.Site) -> None:
+    """Report the drift of item pages and loot modules from the parser output, saving nothing."""
+    started = time.perf_counter()
+    # Only item pages are audited, so only they are searched for and indexed
+    for name in category_names():
+        if name != "item":
+            set_enabled(name, False)
+    mount_parser_pack()
+    connect_parser_cache()
+    build_parser_index(*index_roots(parser_output_path, history_path))
+    audit = DriftAudit(parser_output_path, history_path)
+
+    if get_plugin("item"):
+        if target_titles is not None:
+            wiki_cache = {}
+            refresh_pages(site, wiki_cache, target_titles, fetch_backend, fetch_concurrency)
+            categorized_pages = await process_pages(wiki_cache, None, default_language, site)
+        else:
+            categorized_pages, wiki_cache = await search_wiki(
+                site,
+                language_pages,
+                cpu_workers,
+                None,
+                default_language,
+                fetch_backend,
+                fetch_concurrency,
+                dump_path,
+            )
+        titles = [title for title in categorized_pages.get("item", []) if title in wiki_cache]
+        for title in tqdm(titles, desc="Auditing item pages"):
+            audit.audit_item(
+                title,
+                wiki_cache[title],
+                get_language_code(title, default_language),
+                page_features.get(title),
+            )
+
+    if enable_loot_orchestrator:
+        sources = loot_sources(parser_output_path)
+        if target_titles is not None:
+            sources = {title: path for title, path in sources.items() if title in target_titles}
+        if fetch_backend == "async":
+            module_texts = fetch_pages_blocking(site, list(sources), fetch_concurrency, include_missing=True)
+        else:
+            module_texts = {title: pywikibot.Page(site, title).text for title in sources}
+        audit.audit_loot(module_texts, sources)
+
+    audit.write_report(audit_report_path)
+    print(f"Audit took {time.perf_counter() - started:.1f}s")
+
+
+def start_dry_run() -> None:
+    """Write diffs instead of saving when the run is a dry run."""
+    global dry_run_writer
+    dry_run_writer = None
+    if dry_run:
+        dry_run_writer = DryRun(dry_run_path)
+        dry_run_writer.prepare()
+        print(f"Dry run: nothing is saved, diffs are written to {dry_run_path}")
+
+
+def start_scheduler() -> None:
+    """Set up priority scheduling when the run has a deadline."""
+    global scheduler
+    scheduler = None
+    failed_languages.clear()
+    failed_pages.clear()
+    if not run_deadline:
+        return
+    continuation = load_continuation(continuation_path)
+    since = continuation["started"]
+    scheduler = PriorityScheduler(
+        Deadline(run_deadline * 60),
+        continuation["pending"],
+        load_priority_titles(priority_titles_path),
+        parser_inputs_changed(since) if since else (lambda title, text, category: False),
+    )
+    print(
+        f"Deadline in {run_deadline:g} minutes; "
+        f"{len(continuation['pending'])} pages left by the previous run go first"
+    )
+
+
+def finish_scheduler(started: float) -> None:
+    """Report the deadline run and record the pages left for the next run."""
+    global scheduler
+    left = scheduler.left() if scheduler is not None else []
+    # Pages of failed language partitions were not processed either
+    leaving = {title for title, _ in left}
+    left += [entry for entry in failed_pages if entry[0] not in leaving]
+    if failed_pages:
+        print(f"Processing failed for {', '.join(failed_languages)}; {len(failed_pages)} pages left for the next run")
+    if scheduler is not None:
+        tiers = ", ".join(f"{tier} {count}" for tier, count in scheduler.tier_counts.items())
+        print(f"\nPriority tiers: {tiers}")
+        if left:
+            print(f"Deadline reached, {len(left)} pages left for the next run")
+        run_metrics.set("pages_left", len(left))
+    # Only runs over every page that save their edits set the baseline for changed parser files
+    if dry_run_writer is None and run_mode() in ("full", "multi_language"):
+        write_continuation(continuation_path, started, left)
+    # The deadline bounds the first pass only, not daemon mode after it
+    scheduler = None
+
+
+def build_stages(site: pywikibot.Site) -> List[Stage]:
+    """Express the run as a dependency graph of stages for the scheduler."""
+    stages = []
+
+    # Loot modules are independent of the page cache, so they sync alongside it.
+    # They save their own pages, so a dry run leaves them out.
+    if enable_loot_orchestrator and dry_run_writer is None:
+        stages.append(
+            Stage(
+                "loot",
+                lambda _: orchestrate_loot(
+                    site, parser_output_path, rate_limit, fetch_backend, fetch_concurrency
+                ),
+                kind="io",
+            )
+        )
+    write_deps = ["loot"] if enable_loot_orchestrator and dry_run_writer is None else []
+
+    if multi_language and not test_mode and target_titles is None:
+        stages.append(
+            Stage(
+                "search",
+                lambda _: asyncio.run(
+                    load_language_partitions(
+                        site,
+                        cpu_workers,
+                        default_language,
+                        languages,
+                        fetch_backend,
+                        fetch_concurrency,
+                        dump_path,
+                    )
+                ),
+                kind="io",
+            )
+        )
+        stages.append(
+            Stage(
+                "languages",
+                lambda r: asyncio.run(process_language_partitions(site, r["search"])),
+                deps=["search"],
+            )
+        )
+        stages.append(
+            Stage("save", lambda r: save_updates(r["languages"]), ["languages"] + write_deps, "io")
+        )
+        return stages
+
+    if test_mode:
+        def search(_):
+            # Create a single-item wiki cache for the sandbox
+            sandbox_page = pywikibot.Page(site, test_page)
+            wiki_cache = {sandbox_page.title(): sandbox_page.text}
+
+            # Use the search module to categorize the sandbox page
+            categorized_pages = asyncio.run(
+                process_pages(wiki_cache, None, default_language, site)
+            )
+            return categorized_pages, wiki_cache
+
+        def templates(_):
+            return []
+    elif target_titles is not None:
+        def search(_):
+            # Fetch only the targeted pages instead of enumerating the wiki
+            wiki_cache = {}
+            article_titles = [t for t in target_titles if not t.startswith("Template:Tag_")]
+            print(f"Fetching {len(article_titles)} targeted pages...")
+            refresh_pages(site, wiki_cache, article_titles, fetch_backend, fetch_concurrency)
+            categorized_pages = asyncio.run(
+                process_pages(wiki_cache, None, default_language, site)
+            )
+            return categorized_pages, wiki_cache
+
+        def templates(_):
+            # Template pages are fetched by the tag stage itself
+            return [t for t in target_titles if t.startswith("Template:Tag_")]
+    else:
+        def search(_):
+            # Template files are scanned by their own stage
+            return asyncio.run(
+                search_wiki(
+                    site,
+                    language_pages,
+                    cpu_workers,
+                    None,
+                    default_language,
+                    fetch_backend,
+                    fetch_concurrency,
+                    dump_path,
+                )
+            )
+
+        def templates(_):
+            if not template_scan_enabled():
+                return []
+            print("Scanning tag template files...")
+            template_titles = scan_template_files(
+                site,
+                parser_output_path,
+                default_language,
+                fetch_backend,
+                fetch_concurrency,
+            )
+            print(f"Found {len(template_titles)} tag templates to update")
+            return template_titles
+
+    stages.append(Stage("search", search, kind="io"))
+    stages.append(Stage("templates", templates, kind="io"))
+
+    def category_stage(category, position):
+        def run(results):
+            categorized_pages, wiki_cache = results["search"]
+            titles = categorized_pages.get(category, [])
+            if scans_templates:
+                titles = sorted(titles + results["templates"])
+            if not titles:
+                return []
+            return asyncio.run(
+                process_category(site, titles, category, wiki_cache, None, position)
+            )
+
+        scans_templates = get_plugin(category).template_scan
+        deps = ["search", "templates"] if scans_templates else ["search"]
+        return Stage(category, run, deps)
+
+    categories = category_names()
+    for position, category in enumerate(categories):
+        stages.append(category_stage(category, position))
+
+    stages.append(
+        Stage(
+            "save",
+            lambda r: save_updates(
+                [entry for category in categories for entry in r[category]]
+            ),
+            categories + write_deps,
+            "io",
+        )
+    )
+    return stages
+
+
+async def watch_parser_output(site: pywikibot.Site, wiki_cache: Dict[str, str], watcher) -> None:
+    """
+    Update the pages affected by parser output changes until interrupted.
+
+    Args:
+        site: The wiki site
+        wiki_cache: Page title -> text of the pages processed by the first pass
+        watcher: Watcher created before the first pass; files changed during
+            that pass are handled first
+    """
+    loot_path = os.path.join(
+        parser_output_path, "en", "item", "distributions", "data_files", ""
+    )
+    print(f"Watching parser output for changes ({len(page_dependencies)} pages tracked)...")
+
+    try:
+        # Files rewritten while the first pass ran, still cached with their old contents
+        pending = watcher.read_events(0)
+        while True:
+            if pending:
+                changed, pending = pending, set()
+            else:
+                changed = collect_changes(watcher, watch_debounce, watch_max_delay)
+            try:
+                await update_changed(site, wiki_cache, changed, loot_path)
+            except Exception as e:
+                # One failed fetch or save must not stop the daemon
+                print(f"Error updating pages for {len(changed)} changed files: {e}")
+                record_event(
+                    "daemon_batch_failed", "updater.watch_parser_output", None, str(e), level="error"
+                )
+            diagnostics.print_summary()
+            diagnostics.reset()
+    except KeyboardInterrupt:
+        print("Stopped watching parser output")
+    finally:
+        watcher.close()
+
+
+async def update_changed(
+    site: pywikibot.Site, wiki_cache: Dict[str, str], changed: Set[str], loot_path: str
+) -> None:
+    """Update the pages depending on a batch of changed parser files."""
+    # Drop stale file contents; everything else stays cached
+    invalidate_paths(changed)
+    refresh_navbox_index()
+    refresh_tile_index()
+    # Watchdog workers cache file contents too; new ones start from the refreshed indexes
+    close_page_watchdogs()
+
+    titles = page_dependencies.pages_for(changed)
+    by_category = {}
+    for title in titles:
+        by_category.setdefault(page_dependencies.category_of(title), []).append(title)
+    template_titles = template_titles_for(
+        changed, parser_output_path, default_language
+    )
+    for category in category_names():
+        if template_titles and get_plugin(category).template_scan:
+            by_category.setdefault(category, []).extend(template_titles)
+    print(
+        f"{len(changed)} files changed, "
+        f"{len(titles) + len(template_titles)} pages affected"
+    )
+
+    # Pages may have been edited on the wiki since they were cached
+    if titles:
+        refresh_pages(
+            site, wiki_cache, sorted(titles), fetch_backend, fetch_concurrency
+        )
+
+    update_queue = []
+    for category in category_names():
+        if by_category.get(category):
+            update_queue.extend(
+                await process_category(
+                    site, sorted(by_category[category]), category, wiki_cache
+                )
+            )
+    save_updates(update_queue)
+
+    if enable_loot_orchestrator and any(
+        path.startswith(loot_path) or loot_path.startswith(path)
+        for path in changed
+    ):
+        orchestrate_loot(
+            site, parser_output_path, rate_limit, fetch_backend, fetch_concurrency
+        )
+
+
+async def process_shard(site: pywikibot.Site, queue: ShardQueue, index: int, worker: str) -> bool:
+    """
+    Load, categorize and process the pages of one shard, queueing their updates.
+
+    Returns:
+        False if the shard was reclaimed by another worker before it was done
+    """
+
+    def in_shard(title):
+        return shard_of(title, shard_count) == index
+
+    categorized_pages, wiki_cache = await search_wiki(
+        site,
+        language_pages,
+        cpu_workers,
+        None,
+        default_language,
+        fetch_backend,
+        fetch_concurrency,
+        dump_path,
+        in_shard,
+    )
+    if template_scan_enabled():
+        template_titles = [
+            title
+            for title in scan_template_files(
+                site, parser_output_path, default_language, fetch_backend, fetch_concurrency
+            )
+            if in_shard(title)
+        ]
+        for category in category_names():
+            if get_plugin(category).template_scan:
+                categorized_pages[category] = sorted(
+                    categorized_pages[category] + template_titles
+                )
+
+    work = {category: categorized_pages.get(category, []) for category in category_names()}
+    queue.set_pages(index, sum(len(titles) for titles in work.values()))
+
+    for category, titles in work.items():
+        for i in range(0, len(titles), shard_progress_batch):
+            batch = titles[i : i + shard_progress_batch]
+            updates = await process_category(site, batch, category, wiki_cache)
+            if not queue.push_results(index, worker, len(batch), updates):
+                return False
+    return True
+
+
+async def run_shard_worker(site: pywikibot.Site) -> None:
+    """Claim and process shards until none are left."""
+    queue = ShardQueue(shard_db_path, shard_run_id, shard_count, shard_lease, shard_max_attempts)
+    worker = worker_name()
+    try:
+        while True:
+            index = queue.claim(worker, shard_index)
+            if index is None:
+                print("No shards left to process")
+                break
+
+            print(f"Processing shard {index} of {shard_count} as {worker}")
+            with queue.heartbeat(index, worker):
+                try:
+                    held = await process_shard(site, queue, index, worker)
+                except Exception as e:
+                    print(f"Error processing shard {index}: {e}")
+                    held = queue.finish(index, worker, failed=True)
+                else:
+                    held = held and queue.finish(index, worker)
+            if not held:
+                print(f"Shard {index} was reclaimed by another worker after its lease expired")
+
+            if shard_index is not None:
+                break
+        print_shard_report(queue)
+        diagnostics.print_summary()
+        if pattern_profiling:
+            print_pattern_report()
+        print_quarantine_report()
+        write_quarantine_report(quarantine_report_path)
+        if autotune_log_path:
+            write_tuning_log(autotune_log_path, [fetch_tuner, cpu_tuner])
+    finally:
+        queue.close()
+
+
+def run_shard_saver(site: pywikibot.Site) -> bool:
+    """
+    Save the updates queued by shard workers until every shard has finished.
+
+    Returns:
+        False if a shard failed on its last attempt or the run was left
+        unfinished, so some pages were not processed
+    """
+    complete = True
+    queue = ShardQueue(shard_db_path, shard_run_id, shard_count, shard_lease, shard_max_attempts)
+    try:
+        # Loot modules are not sharded, so the single writer syncs them
+        if enable_loot_orchestrator and dry_run_writer is None:
+            orchestrate_loot(
+                site, parser_output_path, rate_limit, fetch_backend, fetch_concurrency
+            )
+
+        reported = set()
+        while True:
+            # Check before draining, so results queued after the check are not missed
+            finished = queue.all_finished()
+            results = queue.take_results()
+            if results:
+                for result in results:
+                    result["page"] = pywikibot.Page(site, result["title"])
+                save_updates(results)
+                queue.mark_saved([result["id"] for result in results])
+            elif finished:
+                break
+            else:
+                stalled = queue.stalled_shards()
+                for shard in stalled:
+                    if shard["shard"] not in reported:
+                        reported.add(shard["shard"])
+                        print(
+                            f"Shard {shard['shard']} stalled: no update from {shard['worker']} "
+                            f"for {shard['idle']:.0f}s, a worker will reclaim it"
+                        )
+                # Nothing will finish the run unless a worker is started again
+                if stalled and len(stalled) == queue.unfinished_count():
+                    print("Every unfinished shard is stalled; start a worker and the saver again to finish")
+                    complete = False
+                    break
+                time.sleep(5)
+        print_shard_report(queue)
+        for shard in queue.failed_shards():
+            complete = False
+            print(
+                f"Shard {shard['shard']} failed {shard['attempts']} times, last on {shard['worker']}; "
+                f"its {shard['pages']} pages were not processed"
+            )
+        if dry_run_writer is not None:
+            dry_run_writer.write_summary()
+    finally:
+        queue.close()
+    return complete
+
+
+def run_mode() -> str:
+    """Name of the kind of run, so runs are only compared with runs of the same kind."""
+    if test_mode:
+        return "test"
+    if target_titles is not None:
+        return "targeted"
+    # Nothing is saved, so dry runs are not compared with runs that edit
+    if dry_run_writer is not None:
+        return "dry_run"
+    if multi_language:
+        return "multi_language"
+    return "full"
+
+
+def record_run_metrics(results: Dict, timings: Dict) -> None:
+    """Append the run to the metrics database and report regressions against earlier runs."""
+    if not metrics_db_path:
+        return
+    search = results.get("search")
+    if isinstance(search, dict):
+        for partition in search.values():
+            run_metrics.record_pages(partition)
+    elif search:
+        run_metrics.record_pages(search[1])
+    run_metrics.record_phases(timings)
+    if pattern_profiling:
+        for stats in pattern_stats()[:10]:
+            run_metrics.set(f"pattern:{stats.name}", round(stats.seconds, 3))
+    hits, misses = cache_stats()
+    record = run_metrics.to_record(run_mode(), hits, misses)
+
+    try:
+        store = MetricsStore(metrics_db_path)
+    except Exception as e:
+        print(f"Could not open metrics database {metrics_db_path}: {e}")
+        return
+    try:
+        record["id"] = store.append(record)
+        print_report(store, record, metrics_window, metrics_regression_ratio)
+    except Exception as e:
+        print(f"Could not record run metrics: {e}")
+    finally:
+        store.close()
+
+
+async def main(site) -> int:
+    """Run the updater, returning the exit status of the process."""
+    try:
+        return await run_updater(site)
+    finally:
+        close_page_watchdogs()
+
+
+async def run_updater(site) -> int:
+    """The run itself, in whichever mode is configured."""
+    apply_orchestrator_options()
+    apply_tuning_options()
+    diagnostics.log_path = diagnostics_log_path
+    set_profiling(pattern_profiling)
+    reset_pattern_stats()
+    if audit_mode:
+        await run_audit(site)
+        return 0
+
+    start_dry_run()
+
+    if shard_count > 1:
+        if shard_role == "saver":
+            if not run_shard_saver(site):
+                return 1
+        elif shard_role == "status":
+            queue = ShardQueue(shard_db_path, shard_run_id, shard_count, shard_lease, shard_max_attempts)
+            print_shard_report(queue)
+            queue.close()
+        else:
+            mount_parser_pack()
+            connect_parser_cache()
+            build_parser_index(*index_roots(parser_output_path, history_path))
+            refresh_navbox_index()
+            refresh_tile_index()
+            await run_shard_worker(site)
+        return 0
+
+    run_metrics.reset()
+    reset_cache_stats()
+    started = time.time()
+    start_scheduler()
+    # Watch from before the first pass, so files rewritten during it are redone
+    watcher = create_watcher([parser_output_path, history_path], watch_poll_interval) if daemon_mode else None
+
+    # Index the parser output read by the enabled orchestrators, shared by all of them
+    mount_parser_pack()
+    connect_parser_cache()
+    build_parser_index(*index_roots(parser_output_path, history_path))
+    refresh_navbox_index()
+    refresh_tile_index()
+
+    stages = build_stages(site)
+    results, timings = await run_stages(stages, cpu_workers=cpu_threads)
+    print_stage_report(stages, timings)
+    finish_scheduler(started)
+    if dry_run_writer is not None:
+        dry_run_writer.write_summary()
+    diagnostics.print_summary()
+    if pattern_profiling:
+        print_pattern_report()
+    print_quarantine_report()
+    write_quarantine_report(quarantine_report_path)
+    if autotune_log_path:
+        write_tuning_log(autotune_log_path, [fetch_tuner, cpu_tuner])
+    record_run_metrics(results, timings)
+
+    if daemon_mode:
+        if multi_language and not test_mode and target_titles is None:
+            wiki_cache = {
+                title: text
+                for partition in results["search"].values()
+                for title, text in partition.items()
+            }
+        else:
+            wiki_cache = results["search"][1]
+        await watch_parser_output(site, wiki_cache, watcher)
+    return 1 if failed_languages else 0
+
+# ----------------------------------------------------------------------
+# Command line
+# ----------------------------------------------------------------------
+
+
+def parse_arguments(args: List[str]) -> argparse.Namespace:
+    """Parse the updater's own arguments, left over after pywikibot's global ones."""
+    parser = argparse.ArgumentParser(
+        prog="pwb.py updater",
+        description="Update PZwiki pages from the parser output. Without a target every page is processed.",
+    )
+    targets = parser.add_argument_group("targets (combined; only the selected pages are fetched)")
+    targets.add_argument("--title", action="append", default=[], help="Page title, can be repeated")
+    targets.add_argument("--titles-file", help="File with one page title per line")
+    targets.add_argument(
+        "--category",
+        choices=category_names(),
+        help="Only run this orchestrator; without other targets, every page using its infobox",
+    )
+    targets.add_argument("--prefix", help="Pages whose title starts with this prefix")
+    targets.add_argument(
+        "--since", help="Pages changed since this timestamp, e.g. 2025-01-31T00:00:00Z"
+    )
+
+    overrides = parser.add_argument_group("config overrides")
+    overrides.add_argument("--parser-output", help="Override parser_output_path")
+    overrides.add_argument("--history", help="Override history_path")
+    overrides.add_argument("--pack", help="Override parser_pack_path")
+    overrides.add_argument("--cache-server", help="Override cache_server_socket")
+    overrides.add_argument("--deadline", type=float, help="Override run_deadline (minutes)")
+    overrides.add_argument(
+        "--dry-run",
+        nargs="?",
+        const=True,
+        metavar="DIR",
+        help="Write diffs instead of saving, to DIR or dry_run_path",
+    )
+    overrides.add_argument(
+        "--audit",
+        nargs="?",
+        const=True,
+        metavar="FILE",
+        help="Report the drift from the parser output instead of updating, to FILE or audit_report_path",
+    )
+    overrides.add_argument("--priority-titles", help="Override priority_titles_path")
+    overrides.add_argument("--rate-limit", type=float, help="Override rate_limit")
+    overrides.add_argument("--cpu-threads", type=int, help="Override cpu_threads")
+    overrides.add_argument(
+        "--fetch-backend", choices=["pywikibot", "async"], help="Override fetch_backend"
+    )
+    overrides.add_argument("--dump", help="Override dump_path")
+    overrides.add_argument("--fetch-batch-size", type=int, help="Pin fetch_batch_size")
+    overrides.add_argument("--fetch-workers", type=int, help="Pin fetch_workers")
+    overrides.add_argument("--cpu-batch-size", type=int, help="Pin cpu_batch_size")
+    overrides.add_argument("--cpu-workers", type=int, help="Pin cpu_workers")
+    overrides.add_argument(
+        "--no-auto-tune", action="store_true", help="Use the default or pinned settings"
+    )
+    overrides.add_argument(
+        "--language-pages", action="store_true", help="Include language subpages"
+    )
+    overrides.add_argument(
+        "--disable",
+        action="append",
+        default=[],
+        choices=category_names() + ["loot", "formatter"],
+        help="Disable an orchestrator, can be repeated",
+    )
+    overrides.add_argument(
+        "--loot", action="store_true", help="Also sync the loot modules in a targeted run"
+    )
+    overrides.add_argument("--test", action="store_true", help="Only edit the test page")
+    overrides.add_argument("--test-page", help="Override test_page")
+    overrides.add_argument(
+        "--daemon", action="store_true", help="Keep watching the parser output after the run"
+    )
+    overrides.add_argument(
+        "--profile-patterns",
+        action="store_true",
+        help="Time every regular expression and print the costliest",
+    )
+    return parser.parse_args(args)
+
+
+def apply_arguments(options: argparse.Namespace) -> None:
+    """Apply the command line overrides to the config."""
+    global parser_output_path, history_path, parser_pack_path, cache_server_socket
+    global run_deadline, priority_titles_path
+    global rate_limit, dry_run, dry_run_path, audit_mode, audit_report_path, cpu_threads, fetch_backend
+    global dump_path, language_pages, test_mode, test_page, daemon_mode, pattern_profiling
+    global auto_tune, fetch_batch_size, fetch_workers, cpu_batch_size, cpu_workers
+    global enable_loot_orchestrator, enable_text_formatter, enable_item_orchestrator
+    global enable_tile_orchestrator, enable_vehicle_orchestrator
+    global enable_fluid_orchestrator, enable_tag_orchestrator
+
+    if options.parser_output:
+        parser_output_path = options.parser_output
+    if options.history:
+        history_path = options.history
+    if options.pack:
+        parser_pack_path = options.pack
+    if options.cache_server:
+        cache_server_socket = options.cache_server
+    if options.deadline:
+        run_deadline = options.deadline
+    if options.priority_titles:
+        priority_titles_path = options.priority_titles
+    if options.dry_run:
+        dry_run = True
+        if isinstance(options.dry_run, str):
+            dry_run_path = options.dry_run
+    if options.audit:
+        audit_mode = True
+        if isinstance(options.audit, str):
+            audit_report_path = options.audit
+    if options.rate_limit is not None:
+        rate_limit = options.rate_limit
+    if options.cpu_threads:
+        cpu_threads = options.cpu_threads
+    if options.fetch_backend:
+        fetch_backend = options.fetch_backend
+    if options.dump:
+        dump_path = options.dump
+    if options.fetch_batch_size:
+        fetch_batch_size = options.fetch_batch_size
+    if options.fetch_workers:
+        fetch_workers = options.fetch_workers
+    if options.cpu_batch_size:
+        cpu_batch_size = options.cpu_batch_size
+    if options.cpu_workers:
+        cpu_workers = options.cpu_workers
+    if options.no_auto_tune:
+        auto_tune = False
+    if options.language_pages:
+        language_pages = True
+    if options.test:
+        test_mode = True
+    if options.test_page:
+        test_page = options.test_page
+    if options.daemon:
+        daemon_mode = True
+    if options.profile_patterns:
+        pattern_profiling = True
+
+    disabled = set(options.disable)
+    if options.category:
+        disabled.update(name for name in category_names() if name != options.category)
+    enable_loot_orchestrator = enable_loot_orchestrator and "loot" not in disabled
+    enable_text_formatter = enable_text_formatter and "formatter" not in disabled
+    enable_item_orchestrator = enable_item_orchestrator and "item" not in disabled
+    enable_tile_orchestrator = enable_tile_orchestrator and "tile" not in disabled
+    enable_vehicle_orchestrator = enable_vehicle_orchestrator and "vehicle" not in disabled
+    enable_fluid_orchestrator = enable_fluid_orchestrator and "fluid" not in disabled
+    enable_tag_orchestrator = enable_tag_orchestrator and "tag" not in disabled
+
+
+def resolve_targets(site: pywikibot.Site, options: argparse.Namespace) -> Optional[List[str]]:
+    """
+    Collect the titles selected on the command line.
+
+    Args:
+        site: Pywikibot site object
+        options: Parsed command line arguments
+
+    Returns:
+        Sorted list of titles, or None when no target was given (full run)
+    """
+    titles = set(options.title)
+    named = bool(options.title)
+
+    if options.titles_file:
+        named = True
+        try:
+            with open(options.titles_file, "r", encoding="utf-8") as f:
+                titles.update(
+                    line.strip()
+                    for line in f
+                    if line.strip() and not line.startswith("#")
+                )
+        except OSError as e:
+            print(f"Could not read titles file {options.titles_file}: {e}")
+
+    selected = named
+    if options.prefix:
+        selected = True
+        titles.update(
+            page.title()
+            for page in site.allpages(prefix=options.prefix, namespace=0, filterredir=False)
+        )
+
+    if options.since:
+        selected = True
+        if not recent_changes_cover(site, options.since):
+            print(
+                f"Warning: the wiki no longer keeps every change since {options.since}, "
+                "pages changed before its oldest recent change are missed"
+            )
+        titles.update(fetch_changed_titles(site, options.since))
+
+    if options.category and not selected:
+        selected = True
+        plugin = get_plugin(options.category)
+        if plugin.template_scan:
+            titles.update(
+                scan_template_files(
+                    site, parser_output_path, default_language, fetch_backend, fetch_concurrency
+                )
+            )
+        if plugin.template:
+            template_page = pywikibot.Page(site, plugin.template)
+            titles.update(
+                page.title()
+                for page in template_page.embeddedin(filter_redirects=False, namespaces=[0])
+            )
+
+    if not selected:
+        return None
+
+    if not language_pages and not named:
+        # Same language filter as a full run; named titles are always kept
+        titles = {t for t in titles if get_language_code(t, default_language) == default_language}
+    return sorted(titles)
 
 
 if __name__ == "__main__":
+    options = parse_arguments(pywikibot.handle_args())
+    apply_arguments(options)
+    apply_orchestrator_options()
+
     site = pywikibot.Site()
     site.login()
-    asyncio.run(main(site))
+
+    target_titles = resolve_targets(site, options)
+    if target_titles is not None:
+        print(f"Targeted run on {len(target_titles)} pages")
+        # Loot modules are not pages; only sync them when asked to
+        enable_loot_orchestrator = enable_loot_orchestrator and options.loot
+    sys.exit(asyncio.run(main(site)))
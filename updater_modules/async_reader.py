@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+
+import asyncio
+import codecs
+import concurrent.futures
+import json
+from typing import Dict, List, Optional
+
+from .diagnostics import record_event
+
+try:
+    import aiohttp  # type: ignore
+except ImportError:  # Only needed for the async fetch backend
+    aiohttp = None
+
+# Pages per revisions query; the API caps content queries at 50 for normal users
+REVISIONS_BATCH_SIZE = 50
+DEFAULT_CONCURRENCY = 16
+RETRIES = 5
+USER_AGENT = "PZwiki-updater async reader (pywikibot userscript)"
+# Bytes handed to the UTF-8 decoder at a time as a response arrives
+CHUNK_SIZE = 1 << 16
+
+
+def get_api_url(site) -> str:
+    """Return the api.php URL of a pywikibot site."""
+    return site.base_url(site.apipath())
+
+
+class AsyncWikiReader:
+    """
+    Bulk page reader over a pooled, keep-alive, compressed HTTP session.
+
+    Concurrency is the number of requests in flight at once and is
+    independent of the CPU count.
+    """
+
+    def __init__(
+        self,
+        api_url: str,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        batch_size: int = REVISIONS_BATCH_SIZE,
+        maxlag: int = 5,
+    ):
+        if aiohttp is None:
+            raise ImportError(
+                "The async fetch backend requires aiohttp (pip install aiohttp)"
+            )
+        self.api_url = api_url
+        self.concurrency = max(1, concurrency)
+        self.batch_size = batch_size
+        self.maxlag = maxlag
+        self.session = None
+        self.semaphore = None
+        self.failed_batches = 0
+
+    async def __aenter__(self) -> "AsyncWikiReader":
+        connector = aiohttp.TCPConnector(
+            limit=self.concurrency, keepalive_timeout=60, ttl_dns_cache=300
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            headers={"User-Agent": USER_AGENT, "Accept-Encoding": "gzip, deflate"},
+            timeout=aiohttp.ClientTimeout(total=300),
+            auto_decompress=True,
+        )
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+
+    async def _request(self, params: Dict[str, str]) -> Dict:
+        """Send one API request, retrying on server errors, maxlag and rate limits."""
+        params = dict(params, format="json", formatversion="2", maxlag=str(self.maxlag))
+        delay = 1.0
+        for attempt in range(RETRIES):
+            # Only the request holds a slot; backoff sleeps leave it to other requests
+            try:
+                async with self.semaphore:
+                    async with self.session.post(self.api_url, data=params) as resp:
+                        retry_after = resp.headers.get("Retry-After")
+                        if resp.status >= 500:
+                            raise aiohttp.ClientResponseError(
+                                resp.request_info, resp.history, status=resp.status
+                            )
+                        # Chunks are decoded as they arrive, overlapping the transfer;
+                        # the JSON is parsed once complete, its size bounded by batch_size
+                        decoder = codecs.getincrementaldecoder("utf-8")()
+                        parts = []
+                        async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                            parts.append(decoder.decode(chunk))
+                        parts.append(decoder.decode(b"", final=True))
+                data = json.loads("".join(parts))
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+                if attempt == RETRIES - 1:
+                    raise
+                await asyncio.sleep(delay)
+                delay *= 2
+                continue
+
+            error = data.get("error")
+            if error and error.get("code") in ("maxlag", "ratelimited", "readonly"):
+                await asyncio.sleep(float(retry_after or delay))
+                delay *= 2
+                continue
+            return data
+
+        raise RuntimeError(f"API request kept failing: {params.get('action')}")
+
+    async def list_titles(
+        self, namespace: int = 0, prefix: Optional[str] = None
+    ) -> List[str]:
+        """List all non-redirect page titles in a namespace."""
+        params = {
+            "action": "query",
+            "list": "allpages",
+            "apnamespace": str(namespace),
+            "apfilterredir": "nonredirects",
+            "aplimit": "max",
+        }
+        if prefix:
+            params["apprefix"] = prefix
+
+        titles = []
+        while True:
+            data = await self._request(params)
+            titles.extend(p["title"] for p in data.get("query", {}).get("allpages", []))
+            if "continue" not in data:
+                return titles
+            params.update(data["continue"])
+
+    async def _fetch_batch(self, titles: List[str], include_missing: bool = False) -> Dict[str, Optional[str]]:
+        data = await self._request(
+            {
+                "action": "query",
+                "prop": "revisions",
+                "rvprop": "content",
+                "rvslots": "main",
+                "titles": "|".join(titles),
+            }
+        )
+        query = data.get("query", {})
+        pages = query.get("pages", [])
+        if isinstance(pages, dict):
+            pages = pages.values()
+
+        # Key results by the requested title, not the API-normalized one
+        requested = {n["to"]: n["from"] for n in query.get("normalized", [])}
+
+        texts = {}
+        for page in pages:
+            title = requested.get(page["title"], page["title"])
+            revisions = page.get("revisions")
+            if not revisions:
+                if include_missing and "missing" in page:
+                    texts[title] = None
+                continue
+            slot = revisions[0].get("slots", {}).get("main", revisions[0])
+            texts[title] = slot.get("content", slot.get("*", ""))
+        return texts
+
+    async def fetch_texts(
+        self, titles: List[str], progress=None, include_missing: bool = False
+    ) -> Dict[str, Optional[str]]:
+        """
+        Fetch the current text of every title.
+
+        Args:
+            titles: Page titles to fetch
+            progress: Optional tqdm bar updated per finished batch
+            include_missing: Map pages that do not exist to None, so they can
+                be told apart from pages of failed batches
+
+        Returns:
+            Dictionary mapping page titles to page text; missing pages are left
+            out unless include_missing is set, pages of failed batches always
+        """
+        batches = [
+            titles[i : i + self.batch_size]
+            for i in range(0, len(titles), self.batch_size)
+        ]
+        texts = {}
+
+        async def run(batch):
+            try:
+                texts.update(await self._fetch_batch(batch, include_missing))
+            except Exception as e:
+                self.failed_batches += 1
+                record_event(
+                    "batch_failed", "async_reader", detail=str(e), level="error"
+                )
+            if progress is not None:
+                progress.update(len(batch))
+
+        await asyncio.gather(*(run(batch) for batch in batches))
+        return texts
+
+
+async def fetch_pages_async(
+    site,
+    titles: List[str],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    progress=None,
+    include_missing: bool = False,
+) -> Dict[str, Optional[str]]:
+    """Fetch page texts for a pywikibot site with an AsyncWikiReader."""
+    async with AsyncWikiReader(get_api_url(site), concurrency) as reader:
+        return await reader.fetch_texts(titles, progress, include_missing)
+
+
+def fetch_pages_blocking(
+    site, titles: List[str], concurrency: int = DEFAULT_CONCURRENCY, include_missing: bool = False
+) -> Dict[str, Optional[str]]:
+    """
+    Synchronous wrapper around fetch_pages_async.
+
+    Safe to call from inside a running event loop, in which case the fetch
+    runs on its own loop in a helper thread.
+    """
+    coro = fetch_pages_async(site, titles, concurrency, include_missing=include_missing)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
@@ -0,0 +1,277 @@
+#!/usr/bin/env python
+
+"""
+Drift audit.
+
+Measures how far the wiki has drifted from the parser output without
+building any page text. Each block a processor would regenerate is
+fingerprinted and compared with the fingerprint of the parser file it would
+be replaced by:
+
+    item infobox   the key/value pairs taken from the parser file, protected
+                   parameters left out, as process_infobox compares them
+    crafting       content hash of each Crafting, Building and evolved
+                   recipes template against its recipe file
+    history        content hash of each history table against its history file
+    loot           content hash of each Module:Loot page against its lua file
+
+Parser file hashes are computed once per file and shared by every page
+using the file.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from .item.block_utils import find_nested_block, iter_history_tables, iter_nested_blocks
+from .item.file_utils import (
+    read_file_with_subfolders,
+    read_infobox_with_subfolders,
+    read_parser_file,
+)
+from .item.item_infobox import article_file_name, comparable_params
+from .item_orchestrator import find_item_id
+from .patterns import ITEM_CRAFTING_ID, ITEM_CRAFTING_ITEM, ITEM_ID_PARAM, ITEM_INFOBOX_BLOCK
+
+# Outcomes counted per processor
+OUTCOMES = ("checked", "current", "stale", "missing")
+
+
+def fingerprint(text: str) -> str:
+    """Content hash of a block or file."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def loot_sources(parser_output_path: str) -> Dict[str, str]:
+    """
+    The loot module pages and the lua files they are synced from.
+
+    Returns:
+        Page title -> file path, empty if the folder is missing
+    """
+    data_files_path = os.path.join(parser_output_path, "en", "item", "distributions", "data_files")
+    try:
+        filenames = os.listdir(data_files_path)
+    except OSError:
+        return {}
+    return {
+        f"Module:Loot/{filename[:-4]}": os.path.join(data_files_path, filename)
+        for filename in sorted(filenames)
+        if filename.endswith(".lua")
+    }
+
+
+class DriftAudit:
+    """
+    Compares page blocks with the parser files they are generated from.
+
+    Args:
+        parser_output_path: Path to the parser output files
+        history_path: Path to the history files
+    """
+
+    def __init__(self, parser_output_path: str, history_path: str):
+        self.parser_output_path = parser_output_path
+        self.history_path = history_path
+        self._lock = threading.Lock()
+        self._file_hashes: Dict[Tuple[str, bool], Optional[str]] = {}
+        self.pages = 0
+        # category -> processor -> outcome counts
+        self.counts: Dict[str, Dict[str, Counter]] = {}
+        # category -> processor -> titles with a stale block
+        self.stale: Dict[str, Dict[str, List[str]]] = {}
+
+    def file_fingerprint(self, path: str, strip: bool = True) -> Optional[str]:
+        """
+        Hash of a parser file, looked up with its /id and /page subfolders.
+
+        Args:
+            path: Parser file path
+            strip: Hash the content without surrounding whitespace, as the
+                processors insert it
+
+        Returns:
+            The hash, or None if the file is missing or empty
+        """
+        key = (path, strip)
+        try:
+            return self._file_hashes[key]
+        except KeyError:
+            pass
+        if strip:
+            content, _ = read_file_with_subfolders(path)
+            content = content.strip() if content else None
+        else:
+            try:
+                content = read_parser_file(path)
+            except (FileNotFoundError, OSError, UnicodeDecodeError):
+                content = None
+        digest = fingerprint(content) if content else None
+        self._file_hashes[key] = digest
+        return digest
+
+    def _count(self, category: str, processor: str, title: str, outcome: str) -> None:
+        with self._lock:
+            counts = self.counts.setdefault(category, {}).setdefault(processor, Counter())
+            counts["checked"] += 1
+            counts[outcome] += 1
+            if outcome == "stale":
+                self.stale.setdefault(category, {}).setdefault(processor, []).append(title)
+
+    def _compare(self, block: str, digest: Optional[str]) -> str:
+        if digest is None:
+            return "missing"
+        return "current" if fingerprint(block) == digest else "stale"
+
+    def audit_item(self, title: str, text: str, language_code: str, features=None) -> None:
+        """
+        Audit the infobox, crafting and history blocks of an item page.
+
+        Args:
+            title: Page title, the article name of its infobox file
+            text: Page wikitext
+            language_code: Language code of the page
+            features: Processor markers found while categorizing, None to look
+                for every block
+        """
+        with self._lock:
+            self.pages += 1
+        item_id = find_item_id(text)
+        outcome = self._audit_infobox(text, language_code, item_id, title)
+        if outcome:
+            self._count("item", "infobox", title, outcome)
+
+        if features is None or features.has("crafting"):
+            outcome = self._audit_crafting(text, item_id)
+            if outcome:
+                self._count("item", "crafting", title, outcome)
+
+        if features is None or features.has("history"):
+            outcome = self._audit_history(text)
+            if outcome:
+                self._count("item", "history", title, outcome)
+
+    def _audit_infobox(self, text: str, language_code: str, item_id: str, title: str) -> Optional[str]:
+        match = ITEM_INFOBOX_BLOCK.search(text)
+        if not match or not item_id:
+            return None
+        infobox_dict = {}
+        for line in match.group(1).split("\n")[1:-1]:
+            if "=" in line:
+                key, value = line.split("=", 1)
+                infobox_dict[key.strip()] = value.strip()
+
+        infobox_dir = os.path.join(self.parser_output_path, language_code, "item", "infoboxes")
+        file_dict, _ = read_infobox_with_subfolders(
+            os.path.join(infobox_dir, f"{article_file_name(title)}.txt")
+        )
+        if file_dict is None:
+            file_dict, _ = read_infobox_with_subfolders(os.path.join(infobox_dir, f"{item_id}.txt"))
+        if file_dict is None:
+            return "missing"
+        if comparable_params(infobox_dict, item_id) == comparable_params(file_dict, item_id):
+            return "current"
+        return "stale"
+
+    def _audit_crafting(self, text: str, item_id: Optional[str]) -> Optional[str]:
+        outcomes = []
+        if item_id:
+            block = find_nested_block(text, ["{{EvolvedRecipesForItem"])
+            if block:
+                template = text[block[0]:block[1]]
+                id_match = ITEM_CRAFTING_ID.search(template)
+                recipe_id = id_match.group(1).strip() if id_match else item_id
+                path = os.path.join(self.parser_output_path, "evolved_recipes", f"{recipe_id}.txt")
+                outcomes.append(self._compare(template, self.file_fingerprint(path)))
+
+        for start, end in iter_nested_blocks(text, ["{{Crafting/sandbox", "{{Building/sandbox"]):
+            template = text[start:end]
+            item_match = ITEM_CRAFTING_ITEM.search(template)
+            if not item_match:
+                continue
+            recipe_type = "crafting" if "{{Crafting" in template else "building"
+            path = os.path.join(
+                self.parser_output_path, "recipes", recipe_type, f"{item_match.group(1).strip()}.txt"
+            )
+            outcomes.append(self._compare(template, self.file_fingerprint(path)))
+        return _page_outcome(outcomes)
+
+    def _audit_history(self, text: str) -> Optional[str]:
+        outcomes = []
+        for start, end, content_start, content_end in iter_history_tables(text):
+            id_match = ITEM_ID_PARAM.search(text, content_start, content_end)
+            if not id_match:
+                continue
+            path = os.path.join(self.history_path, f"{id_match.group(1).strip()}.txt")
+            outcomes.append(self._compare(text[start:end], self.file_fingerprint(path)))
+        return _page_outcome(outcomes)
+
+    def audit_loot(self, module_texts: Dict[str, str], sources: Dict[str, str]) -> None:
+        """
+        Audit the loot modules.
+
+        Args:
+            module_texts: Page title -> current text, None for a missing page;
+                modules that could not be read are left out and not audited
+            sources: Page title -> lua file, from loot_sources
+        """
+        for title, path in sources.items():
+            digest = self.file_fingerprint(path, strip=False)
+            if digest is None or title not in module_texts:
+                continue
+            self._count("loot", "module", title, self._compare(module_texts[title] or "", digest))
+
+    def report(self) -> Dict:
+        return {
+            "written": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "pages": self.pages,
+            "parser_files": len(self._file_hashes),
+            "categories": {
+                category: {
+                    processor: dict(
+                        {outcome: counts[outcome] for outcome in OUTCOMES},
+                        stale_pages=sorted(self.stale.get(category, {}).get(processor, [])),
+                    )
+                    for processor, counts in sorted(processors.items())
+                }
+                for category, processors in sorted(self.counts.items())
+            },
+        }
+
+    def write_report(self, path: Optional[str]) -> None:
+        """Write the report as JSON and print the drift per category and processor."""
+        report = self.report()
+        if path:
+            try:
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump(report, f, indent=2, ensure_ascii=False)
+            except OSError as e:
+                print(f"Could not write audit report {path}: {e}")
+
+        print(f"\nDrift audit: {self.pages} pages, {len(self._file_hashes)} parser files hashed")
+        print(f"{'Category':<10}{'Processor':<12}{'Checked':>9}{'Stale':>9}{'Missing':>9}{'Drift':>8}")
+        for category, processors in report["categories"].items():
+            for processor, counts in processors.items():
+                compared = counts["current"] + counts["stale"]
+                drift = counts["stale"] / compared if compared else 0.0
+                print(
+                    f"{category:<10}{processor:<12}{counts['checked']:>9}"
+                    f"{counts['stale']:>9}{counts['missing']:>9}{drift:>8.1%}"
+                )
+        if path:
+            print(f"Stale pages listed in {path}")
+
+
+def _page_outcome(outcomes: List[str]) -> Optional[str]:
+    """A page is stale if any of its blocks is, missing if none has a parser file."""
+    if not outcomes:
+        return None
+    if "stale" in outcomes:
+        return "stale"
+    if "current" in outcomes:
+        return "current"
+    return "missing"
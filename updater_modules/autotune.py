@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+
+import concurrent.futures
+import json
+import statistics
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Largest share of a workload spent on calibration trials
+MAX_CALIBRATION_SHARE = 0.25
+# Batches per worker in each trial
+TRIAL_ROUNDS = 2
+# Trials with more failed batches than this are not chosen
+MAX_ERROR_RATE = 0.05
+# Larger values must be this much faster to be chosen, so noise does not pick them
+IMPROVEMENT_RATIO = 1.05
+# Stop trying larger values once throughput falls this far below the best
+GIVE_UP_RATIO = 0.9
+
+
+class AutoTuner:
+    """
+    Chooses the batch size and worker count of one kind of stage.
+
+    The first call to run spends the first part of its workload on short
+    trials: worker counts are tried at one batch size, then batch sizes at
+    the best worker count, measuring pages per second, batch latency and the
+    share of failed batches. The fastest setting with an acceptable error
+    rate is used for the rest of the workload and for every later call.
+    Trial results are kept, so calibration does not cost any extra work.
+    Workloads too small for even the first trial run on the defaults and
+    leave calibration to a later call.
+
+    Args:
+        name: Stage kind, e.g. "fetch" or "cpu"
+        batch_sizes: Batch sizes to try, ascending
+        worker_counts: Worker counts to try, ascending
+        batch_size: Batch size used until calibrated
+        workers: Worker count used until calibrated
+    """
+
+    def __init__(
+        self,
+        name: str,
+        batch_sizes: Sequence[int],
+        worker_counts: Sequence[int],
+        batch_size: int,
+        workers: int,
+    ):
+        self.name = name
+        self.batch_sizes = sorted(set(batch_sizes))
+        self.worker_counts = sorted(set(worker_counts))
+        self.default_batch_size = batch_size
+        self.default_workers = workers
+        self.pinned_batch_size = None
+        self.pinned_workers = None
+        self.enabled = True
+        self.settings: Optional[Dict[str, Any]] = None
+        self.trials: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def pin(self, batch_size: Optional[int] = None, workers: Optional[int] = None) -> None:
+        """Fix the batch size and/or worker count; None leaves it to calibration."""
+        self.pinned_batch_size = batch_size
+        self.pinned_workers = workers
+
+    @property
+    def batch_size(self) -> int:
+        if self.pinned_batch_size:
+            return self.pinned_batch_size
+        if self.settings:
+            return self.settings["batch_size"]
+        return self.default_batch_size
+
+    @property
+    def workers(self) -> int:
+        if self.pinned_workers:
+            return self.pinned_workers
+        if self.settings:
+            return self.settings["workers"]
+        return self.default_workers
+
+    def run(
+        self,
+        items: Iterable[Any],
+        func: Callable[[List[Any]], Any],
+        on_result: Callable[[List[Any], Any], None],
+        on_error: Optional[Callable[[List[Any], Exception], None]] = None,
+    ) -> None:
+        """
+        Run func over batches of items in a thread pool.
+
+        Args:
+            items: Work items, e.g. page titles
+            func: Callable processing one batch of items
+            on_result: Called in this thread with each batch and its result
+            on_error: Called in this thread with each batch that raised
+        """
+        items = list(items)
+        start = 0
+        pinned = self.pinned_batch_size and self.pinned_workers
+        if self.enabled and self.settings is None and not pinned and self._can_calibrate(len(items)):
+            with self._lock:
+                # Another thread may have calibrated while this one waited
+                if self.settings is None:
+                    start = self._calibrate(items, func, on_result, on_error)
+        self._run_batches(items[start:], self.batch_size, self.workers, func, on_result, on_error)
+
+    def _can_calibrate(self, count: int) -> bool:
+        """Whether a workload of count items leaves room for the first trial."""
+        batch_size = self.pinned_batch_size or self.batch_sizes[0]
+        workers = self.pinned_workers or self.worker_counts[0]
+        return batch_size * workers * TRIAL_ROUNDS <= int(count * MAX_CALIBRATION_SHARE)
+
+    def _run_batches(
+        self, items, batch_size, workers, func, on_result, on_error
+    ) -> Tuple[int, List[float]]:
+        """Run the batches, returning the number of failed batches and batch latencies."""
+        batches = [items[i : i + batch_size] for i in range(0, len(items), batch_size)]
+        failed = 0
+        latencies = []
+
+        def timed(batch):
+            start = time.perf_counter()
+            try:
+                return func(batch), None, time.perf_counter() - start
+            except Exception as e:
+                return None, e, time.perf_counter() - start
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(timed, batch): batch for batch in batches}
+            for future in concurrent.futures.as_completed(futures):
+                result, error, seconds = future.result()
+                latencies.append(seconds)
+                if error is None:
+                    on_result(futures[future], result)
+                else:
+                    failed += 1
+                    if on_error is not None:
+                        on_error(futures[future], error)
+        return failed, latencies
+
+    def _trial(self, items, start, batch_size, workers, func, on_result, on_error):
+        size = batch_size * workers * TRIAL_ROUNDS
+        chunk = items[start : start + size]
+        begin = time.perf_counter()
+        failed, latencies = self._run_batches(
+            chunk, batch_size, workers, func, on_result, on_error
+        )
+        seconds = max(time.perf_counter() - begin, 1e-9)
+        trial = {
+            "batch_size": batch_size,
+            "workers": workers,
+            "pages": len(chunk),
+            "pages_per_second": round(len(chunk) / seconds, 1),
+            "latency": round(statistics.median(latencies), 3) if latencies else 0.0,
+            "error_rate": round(failed / len(latencies), 3) if latencies else 0.0,
+        }
+        self.trials.append(trial)
+        return trial
+
+    @staticmethod
+    def _better(trial: Dict[str, Any], best: Dict[str, Any]) -> bool:
+        """Whether trial, using more batch size or workers than best, should replace it."""
+        trial_ok = trial["error_rate"] <= MAX_ERROR_RATE
+        best_ok = best["error_rate"] <= MAX_ERROR_RATE
+        if trial_ok != best_ok:
+            return trial_ok
+        if not trial_ok:
+            return trial["error_rate"] < best["error_rate"]
+        return trial["pages_per_second"] > best["pages_per_second"] * IMPROVEMENT_RATIO
+
+    def _calibrate(self, items, func, on_result, on_error) -> int:
+        """Run the trials on the first items and choose the settings; returns items used."""
+        budget = int(len(items) * MAX_CALIBRATION_SHARE)
+        used = 0
+        measured = {}
+
+        def measure(batch_size, workers):
+            nonlocal used
+            key = (batch_size, workers)
+            if key not in measured:
+                if used + batch_size * workers * TRIAL_ROUNDS > budget:
+                    return None
+                measured[key] = self._trial(
+                    items, used, batch_size, workers, func, on_result, on_error
+                )
+                used += measured[key]["pages"]
+            return measured[key]
+
+        def sweep(candidates, make_key):
+            best = None
+            for value in candidates:
+                trial = measure(*make_key(value))
+                if trial is None:
+                    break
+                if best is None or self._better(trial, best):
+                    best = trial
+                elif trial["pages_per_second"] < best["pages_per_second"] * GIVE_UP_RATIO:
+                    break
+            return best
+
+        # Worker counts first, at the smallest batch size, then batch sizes at the best count
+        batch_size = self.pinned_batch_size or self.batch_sizes[0]
+        workers = self.pinned_workers
+        best = None
+        if workers is None:
+            best = sweep(self.worker_counts, lambda w: (batch_size, w))
+            if best is not None:
+                workers = best["workers"]
+        if workers is not None and self.pinned_batch_size is None:
+            best = sweep(self.batch_sizes, lambda b: (b, workers)) or best
+
+        if best is None:
+            # Keep the defaults rather than trying again on every call
+            self.settings = {"batch_size": self.batch_size, "workers": self.workers}
+            print(f"Auto-tune {self.name}: {len(items)} items are too few to calibrate, keeping the defaults")
+            return used
+
+        self.settings = dict(best)
+        print(
+            f"Auto-tune {self.name}: batch size {best['batch_size']}, {best['workers']} workers "
+            f"({best['pages_per_second']:.0f} pages/s, {best['latency']:.2f}s per batch, "
+            f"{best['error_rate']:.0%} failed) after {len(measured)} trials on {used} items"
+        )
+        return used
+
+    def report(self) -> Dict[str, Any]:
+        """Settings in use and the trials that chose them."""
+        return {
+            "batch_size": self.batch_size,
+            "workers": self.workers,
+            "pinned": {
+                "batch_size": self.pinned_batch_size,
+                "workers": self.pinned_workers,
+            },
+            "chosen": self.settings,
+            "trials": self.trials,
+        }
+
+
+def write_tuning_log(path: str, tuners: Iterable[AutoTuner]) -> None:
+    """Write the settings of each tuner to a JSON file, so they can be pinned later."""
+    report = {tuner.name: tuner.report() for tuner in tuners}
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    except OSError as e:
+        print(f"Could not write auto-tune log {path}: {e}")
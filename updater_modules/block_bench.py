@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+
+"""
+Adversarial benchmark for the item block finders.
+
+Feeds the item processors malformed pages (unclosed templates, stray and
+deeply nested braces, thousands of openers without a close) at doubling
+sizes and fits how their run time grows. A growth exponent well above 1
+means some input makes a processor superlinear, and the run exits non-zero.
+
+Also checks the finders in item/block_utils.py against the regular
+expressions they replaced on random inputs, and can time those old
+expressions on the same inputs for comparison.
+
+Run standalone with:
+    python -m updater_modules.block_bench --size 2000 --steps 5
+    python -m updater_modules.block_bench --check 100000 --legacy
+"""
+
+import argparse
+import math
+import multiprocessing
+import random
+import re
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .item import block_utils
+from .item.item_consumables import process_consumables
+from .item.item_crafting import process_crafting_templates
+from .item.item_fixing import process_fixing
+from .item.item_history import process_history
+
+# Patterns the block finders replaced, with the equivalent finder call
+LEGACY_PATTERNS = {
+    "fixing": (
+        re.compile(r"(\{\{Fixing.*?\n)(.*?\n)*?\}\}", re.DOTALL),
+        lambda text: list(block_utils.iter_line_blocks(text, "{{Fixing")),
+    ),
+    "consumables": (
+        re.compile(r"(\{\{Consumables.*?\n)(.*?\n)*?(\}\})", re.DOTALL),
+        lambda text: list(block_utils.iter_line_blocks(text, "{{Consumables")),
+    ),
+    "evolved_recipes": (
+        re.compile(r"\{\{EvolvedRecipesForItem(?:[^{}]|(?:\{\{[^{}]*\}\}))*\}\}", re.DOTALL),
+        lambda text: list(block_utils.iter_nested_blocks(text, ["{{EvolvedRecipesForItem"])),
+    ),
+    "crafting": (
+        re.compile(
+            r"\{\{(?:Crafting|Building)/sandbox(?:[^{}]|(?:\{\{[^{}]*\}\}))*\}\}", re.DOTALL
+        ),
+        lambda text: list(
+            block_utils.iter_nested_blocks(text, ["{{Crafting/sandbox", "{{Building/sandbox"])
+        ),
+    ),
+    "history": (
+        re.compile(r"(?m)^\s*{{HistoryTable\|(.*?)^\s*}}\s*$", re.MULTILINE | re.DOTALL),
+        lambda text: [span[:2] for span in block_utils.iter_history_tables(text)],
+    ),
+}
+
+# Fragments random check inputs are built from
+CHECK_TOKENS = [
+    "{{Fixing", "{{Consumables", "{{EvolvedRecipesForItem", "{{Crafting/sandbox",
+    "{{Building/sandbox", "{{HistoryTable|", "{{", "}}", "{", "}", "\n", "\n}}",
+    "\n  }} \n", " ", "\t", "\r\n", "\x0b", "a", "|item_id=1",
+]
+
+
+def adversarial_cases() -> Dict[str, Tuple[str, Callable[[int], str]]]:
+    """Malformed inputs by name, as (legacy pattern, generator taking a size)."""
+    return {
+        "fixing_unclosed": ("fixing", lambda n: "{{Fixing|fixing_id=Axe\n" + "|a=b\n" * n + "}"),
+        "fixing_many_openers": ("fixing", lambda n: "{{Fixing\n" * n),
+        "consumables_unclosed": (
+            "consumables",
+            lambda n: "{{Consumables\n" + "|hunger=1 }}\n" * n,
+        ),
+        "crafting_deep_nesting": (
+            "crafting",
+            lambda n: "{{Crafting/sandbox|item=Axe" + "{{" * n + "x" + "}}" * n,
+        ),
+        "crafting_stray_braces": (
+            "crafting",
+            lambda n: "{{Crafting/sandbox|item=Axe" + "{{a}}b{c" * n,
+        ),
+        "crafting_many_openers": ("crafting", lambda n: "{{Building/sandbox|a " * n),
+        "evolved_unclosed": (
+            "evolved_recipes",
+            lambda n: "{{EvolvedRecipesForItem|id=Axe" + "{{a}}" * n + "}",
+        ),
+        "history_unclosed": (
+            "history",
+            lambda n: "{{HistoryTable|\n|item_id=Axe\n" + "  }} x\n" * n,
+        ),
+        "history_many_openers": ("history", lambda n: "\n {{HistoryTable|" * n),
+        "history_whitespace": (
+            "history",
+            lambda n: "{{HistoryTable|\n" + " \n" * n + "}}" + " \t" * n + "x",
+        ),
+    }
+
+
+def run_processors(text: str, parser_output_path: str) -> None:
+    """Run every processor using the block finders on text."""
+    process_fixing(text, parser_output_path, "en")
+    process_consumables(text, parser_output_path, "en", "Base.Axe")
+    process_crafting_templates(text, parser_output_path, "Base.Axe")
+    process_history(text, parser_output_path)
+
+
+def time_call(func: Callable[[], None], repeat: int = 3) -> float:
+    """Best of repeat timings, in seconds."""
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def growth_exponent(sizes: List[int], seconds: List[float]) -> float:
+    """Least squares slope of log(seconds) against log(size)."""
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(max(s, 1e-9)) for s in seconds]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    numerator = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    denominator = sum((x - mean_x) ** 2 for x in xs)
+    return numerator / denominator if denominator else 0.0
+
+
+def check_equivalence(count: int, seed: int = 0) -> int:
+    """
+    Compare the block finders with the legacy patterns on random inputs.
+
+    Returns:
+        Number of inputs where they disagree
+    """
+    rng = random.Random(seed)
+    mismatches = 0
+    for _ in range(count):
+        text = "".join(rng.choice(CHECK_TOKENS) for _ in range(rng.randint(0, 14)))
+        for name, (pattern, finder) in LEGACY_PATTERNS.items():
+            if name == "consumables" or name == "evolved_recipes":
+                match = pattern.search(text)
+                expected = [match.span()] if match else []
+                found = finder(text)[:1]
+            else:
+                expected = [match.span() for match in pattern.finditer(text)]
+                found = finder(text)
+            if expected != found:
+                mismatches += 1
+                if mismatches <= 10:
+                    print(f"Mismatch in {name} for {text!r}: {expected} != {found}")
+    return mismatches
+
+
+def _legacy_worker(pattern, text, conn) -> None:
+    start = time.perf_counter()
+    list(pattern.finditer(text))
+    conn.send(time.perf_counter() - start)
+
+
+def time_legacy(pattern, text: str, timeout: float) -> Optional[float]:
+    """Time a legacy pattern in a separate process, None if it ran past timeout."""
+    context = multiprocessing.get_context("fork")
+    parent_conn, child_conn = context.Pipe()
+    process = context.Process(target=_legacy_worker, args=(pattern, text, child_conn))
+    process.start()
+    seconds = parent_conn.recv() if parent_conn.poll(timeout) else None
+    process.kill()
+    process.join()
+    return seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Adversarial benchmark for the item block finders")
+    parser.add_argument("--size", type=int, default=2000, help="Smallest input size (repetitions)")
+    parser.add_argument("--steps", type=int, default=5, help="Number of doublings")
+    parser.add_argument("--max-exponent", type=float, default=1.3, help="Growth exponent counted as superlinear")
+    parser.add_argument("--check", type=int, default=0, help="Random inputs to compare with the legacy patterns")
+    parser.add_argument("--legacy", action="store_true", help="Also time the legacy patterns on small inputs")
+    parser.add_argument("--legacy-sizes", default="16,20,24", help="Input sizes for --legacy")
+    parser.add_argument("--legacy-timeout", type=float, default=5.0, help="Seconds before a legacy pattern is stopped")
+    args = parser.parse_args()
+
+    failed = False
+
+    if args.check:
+        mismatches = check_equivalence(args.check)
+        print(f"Equivalence: {args.check} random inputs, {mismatches} mismatches")
+        failed = failed or mismatches > 0
+
+    sizes = [args.size * 2**step for step in range(args.steps)]
+    print(f"\n{'Case':<24}" + "".join(f"{size:>10}" for size in sizes) + f"{'Exponent':>10}")
+    with tempfile.TemporaryDirectory() as parser_output_path:
+        for name, (_, generate) in adversarial_cases().items():
+            seconds = []
+            for size in sizes:
+                text = generate(size)
+                seconds.append(time_call(lambda: run_processors(text, parser_output_path)))
+            exponent = growth_exponent(sizes, seconds)
+            marker = "!" if exponent > args.max_exponent else " "
+            failed = failed or exponent > args.max_exponent
+            print(
+                f"{marker}{name:<23}"
+                + "".join(f"{s * 1000:>8.2f}ms" for s in seconds)
+                + f"{exponent:>10.2f}"
+            )
+
+    if args.legacy:
+        legacy_sizes = [int(size) for size in args.legacy_sizes.split(",")]
+        print(f"\nLegacy patterns (seconds, timeout {args.legacy_timeout:g}s)")
+        print(f"{'Case':<24}" + "".join(f"{size:>10}" for size in legacy_sizes))
+        for name, (pattern_name, generate) in adversarial_cases().items():
+            pattern = LEGACY_PATTERNS[pattern_name][0]
+            cells = []
+            for size in legacy_sizes:
+                seconds = time_legacy(pattern, generate(size), args.legacy_timeout)
+                cells.append(f"{seconds:>10.4f}" if seconds is not None else f"{'timeout':>10}")
+            print(f"{name:<24}" + "".join(cells))
+
+    if failed:
+        print("\nSuperlinear or mismatching block finders found")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
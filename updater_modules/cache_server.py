@@ -0,0 +1,428 @@
+#!/usr/bin/env python
+
+"""
+Shared parser cache for the updater processes of one host.
+
+A long-running server holds the file index of the parser output and history
+trees and the decoded contents of every file read, once per host. Updater
+processes (different languages, a loot sync, a test run) connect over a
+Unix socket: the index comes from the server instead of a directory walk,
+and a file read by any process is served from memory to the others.
+
+The server watches its roots and drops the entries of files that change.
+Clients that see changes themselves (daemon mode) forward them, so the
+server never serves a file older than what the client already noticed.
+
+Start a server with:
+    python -m updater_modules.cache_server --socket /tmp/pzwiki-cache.sock --root <parser output> --root <history>
+
+Messages in both directions are a 4-byte big-endian length followed by a
+UTF-8 JSON object:
+    {"op": "index", "root": dir}         -> {"served": bool, "files": [relative path, ...]}
+    {"op": "read", "path": file}         -> {"served": bool, "content": str or null}
+    {"op": "invalidate", "paths": [...]} -> {"invalidated": int}
+    {"op": "stats"}                      -> {"files": int, "cached": int, "hits": int, "misses": int, ...}
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import struct
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .watcher import InotifyWatcher, create_watcher
+
+_LENGTH = struct.Struct(">I")
+
+# Seconds between rescans when inotify is unavailable
+DEFAULT_POLL_INTERVAL = 10.0
+
+
+def _send(sock: socket.socket, message: Dict) -> None:
+    data = json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    sock.sendall(_LENGTH.pack(len(data)) + data)
+
+
+def _receive_exactly(sock: socket.socket, size: int) -> Optional[bytes]:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _receive(sock: socket.socket) -> Optional[Dict]:
+    """The next message, or None once the peer has closed the connection."""
+    header = _receive_exactly(sock, _LENGTH.size)
+    if header is None:
+        return None
+    data = _receive_exactly(sock, _LENGTH.unpack(header)[0])
+    if data is None:
+        return None
+    return json.loads(data.decode("utf-8"))
+
+
+class ParserCache:
+    """
+    The index and file contents held by the server.
+
+    Args:
+        roots: Directories served, e.g. the parser output and history trees
+    """
+
+    def __init__(self, roots: Iterable[str]):
+        self.roots = [os.path.join(os.path.abspath(root), "") for root in roots if root]
+        self._lock = threading.Lock()
+        self._index: Set[str] = set()
+        self._contents: Dict[str, Optional[str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # Bumped by every invalidation, so a read racing one is not cached
+        self._generation = 0
+        for root in self.roots:
+            self._index.update(self._walk(root))
+
+    @staticmethod
+    def _walk(directory: str) -> List[str]:
+        return [
+            os.path.join(dirpath, filename)
+            for dirpath, _, filenames in os.walk(directory)
+            for filename in filenames
+        ]
+
+    def root_of(self, path: str) -> Optional[str]:
+        """The served root a path is below, None if it is not served."""
+        path = os.path.abspath(path)
+        for root in self.roots:
+            if path == root[:-1] or path.startswith(root):
+                return root
+        return None
+
+    def index(self, root: str) -> Optional[List[str]]:
+        """Files below a directory, relative to it, or None if it is not served."""
+        if self.root_of(root) is None:
+            return None
+        prefix = os.path.join(os.path.abspath(root), "")
+        with self._lock:
+            return sorted(path[len(prefix):] for path in self._index if path.startswith(prefix))
+
+    def read(self, path: str) -> Tuple[bool, Optional[str]]:
+        """
+        Content of a file, read from disk on the first request only.
+
+        Returns:
+            (served, content): served is False for paths outside the roots,
+            content is None for files that do not exist
+        """
+        if self.root_of(path) is None:
+            return False, None
+        path = os.path.abspath(path)
+        with self._lock:
+            if path in self._contents:
+                self.hits += 1
+                return True, self._contents[path]
+            self.misses += 1
+            exists = path in self._index
+            generation = self._generation
+
+        content = None
+        if exists:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    content = f.read()
+            except (OSError, UnicodeDecodeError):
+                content = None
+        with self._lock:
+            if generation == self._generation:
+                self._contents[path] = content
+        return True, content
+
+    def invalidate(self, paths: Iterable[str]) -> int:
+        """
+        Drop changed files and refresh the index.
+
+        Args:
+            paths: Changed files; a path ending in a separator invalidates
+                everything below that directory
+
+        Returns:
+            Number of entries dropped
+        """
+        with self._lock:
+            self._generation += 1
+        dropped = 0
+        for path in paths:
+            directory = path.endswith(os.sep)
+            path = os.path.abspath(path)
+            if self.root_of(path) is None:
+                continue
+            if directory:
+                prefix = os.path.join(path, "")
+                found = self._walk(prefix)
+                with self._lock:
+                    stale = [p for p in self._contents if p.startswith(prefix)]
+                    for p in stale:
+                        del self._contents[p]
+                    self._index.difference_update([p for p in self._index if p.startswith(prefix)])
+                    self._index.update(found)
+                dropped += len(stale)
+                continue
+            exists = os.path.isfile(path)
+            with self._lock:
+                if self._contents.pop(path, False) is not False:
+                    dropped += 1
+                if exists:
+                    self._index.add(path)
+                else:
+                    self._index.discard(path)
+        with self._lock:
+            self.invalidations += dropped
+        return dropped
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "roots": self.roots,
+                "files": len(self._index),
+                "cached": len(self._contents),
+                "bytes": sum(len(content) for content in self._contents.values() if content),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self) -> None:
+        cache: ParserCache = self.server.cache
+        while True:
+            try:
+                message = _receive(self.request)
+            except (OSError, ValueError):
+                return
+            if message is None:
+                return
+            op = message.get("op")
+            if op == "read":
+                served, content = cache.read(message.get("path", ""))
+                reply = {"served": served, "content": content}
+            elif op == "index":
+                files = cache.index(message.get("root", ""))
+                reply = {"served": files is not None, "files": files or []}
+            elif op == "invalidate":
+                reply = {"invalidated": cache.invalidate(message.get("paths", []))}
+            elif op == "stats":
+                reply = cache.stats()
+            else:
+                reply = {"error": f"unknown op {op!r}"}
+            try:
+                _send(self.request, reply)
+            except OSError:
+                return
+
+
+class CacheServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Serves a ParserCache on a Unix socket, one thread per connected process.
+
+    Args:
+        socket_path: Socket file, replaced if a stale one is left behind
+        cache: The cache to serve
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, cache: ParserCache):
+        self.cache = cache
+        self.socket_path = socket_path
+        if os.path.exists(socket_path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(socket_path)
+            except OSError:
+                # Left behind by a server that did not shut down cleanly
+                os.remove(socket_path)
+            else:
+                raise OSError(f"A cache server is already listening on {socket_path}")
+            finally:
+                probe.close()
+        super().__init__(socket_path, _Handler)
+        # Only processes of the same user may connect
+        os.chmod(socket_path, 0o600)
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            os.remove(self.socket_path)
+        except OSError:
+            pass
+
+
+def watch_roots(cache: ParserCache, stop: threading.Event, poll_interval: float) -> None:
+    """Invalidate the cache entries of files changing below its roots until stopped."""
+    watcher = create_watcher([root[:-1] for root in cache.roots], poll_interval)
+    # inotify waits are cut short to notice the stop; polling rescans on its interval
+    timeout = 1.0 if isinstance(watcher, InotifyWatcher) else poll_interval
+    try:
+        while not stop.is_set():
+            changed = watcher.read_events(timeout)
+            if changed:
+                dropped = cache.invalidate(changed)
+                print(f"{len(changed)} changed paths, {dropped} cached files dropped")
+    finally:
+        watcher.close()
+
+
+class CacheClient:
+    """
+    Connection of an updater process to a cache server.
+
+    Each thread gets its own connection, and a forked process connects again
+    rather than sharing its parent's. If the server goes away the client
+    stops asking it, and callers read from disk as without a server.
+
+    Args:
+        socket_path: Socket of a running cache server
+
+    Raises:
+        OSError: If the server cannot be reached
+    """
+
+    def __init__(self, socket_path: str):
+        self.socket_path = socket_path
+        self.available = True
+        self._local = threading.local()
+        self._request({"op": "stats"}, raise_errors=True)
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is not None and self._local.pid != os.getpid():
+            # Inherited through a fork, still in use by the parent
+            self._discard()
+            sock = None
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(self.socket_path)
+            except OSError:
+                sock.close()
+                raise
+            self._local.sock = sock
+            self._local.pid = os.getpid()
+        return sock
+
+    def _discard(self) -> None:
+        """Close and forget the connection of the current thread."""
+        sock = getattr(self._local, "sock", None)
+        self._local.sock = None
+        if sock is not None:
+            sock.close()
+
+    def _request(self, message: Dict, raise_errors: bool = False) -> Optional[Dict]:
+        if not self.available:
+            return None
+        try:
+            sock = self._connection()
+            _send(sock, message)
+            reply = _receive(sock)
+            if reply is None:
+                raise ConnectionError("cache server closed the connection")
+            return reply
+        except (OSError, ValueError) as e:
+            # A failed exchange leaves the stream mid-message
+            self._discard()
+            if raise_errors:
+                raise OSError(f"cache server {self.socket_path}: {e}") from e
+            self.available = False
+            print(f"Cache server unavailable, reading parser files directly: {e}")
+            return None
+
+    def index(self, root: str) -> Optional[List[str]]:
+        """Files below a root, relative to it, or None if the server does not serve it."""
+        reply = self._request({"op": "index", "root": os.path.abspath(root)})
+        if not reply or not reply.get("served"):
+            return None
+        return reply["files"]
+
+    def read(self, path: str) -> Tuple[bool, Optional[str]]:
+        """
+        Content of a file from the server.
+
+        Returns:
+            (served, content): served is False when the server does not hold
+            the path or cannot be reached
+        """
+        reply = self._request({"op": "read", "path": os.path.abspath(path)})
+        if not reply:
+            return False, None
+        return reply.get("served", False), reply.get("content")
+
+    def invalidate(self, paths: Iterable[str]) -> None:
+        """Tell the server about changed files, directories ending in a separator."""
+        paths = [os.path.join(os.path.abspath(p), "") if p.endswith(os.sep) else os.path.abspath(p) for p in paths]
+        if paths:
+            self._request({"op": "invalidate", "paths": paths})
+
+    def stats(self) -> Optional[Dict]:
+        return self._request({"op": "stats"})
+
+    def close(self) -> None:
+        self._discard()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve parser output to the updater processes of this host")
+    parser.add_argument("--socket", required=True, help="Unix socket to listen on")
+    parser.add_argument(
+        "--root", action="append", required=True, help="Directory to serve, can be repeated"
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=DEFAULT_POLL_INTERVAL,
+        help="Seconds between rescans when inotify is unavailable",
+    )
+    args = parser.parse_args()
+
+    if not hasattr(socket, "AF_UNIX"):
+        print("Unix sockets are not available on this platform")
+        return
+
+    start = time.perf_counter()
+    cache = ParserCache(args.root)
+    print(f"Indexed {cache.stats()['files']} files in {time.perf_counter() - start:.1f}s")
+
+    stop = threading.Event()
+    watcher = threading.Thread(
+        target=watch_roots, args=(cache, stop, args.poll_interval), name="watcher", daemon=True
+    )
+    watcher.start()
+    server = CacheServer(args.socket, cache)
+    print(f"Serving {', '.join(cache.roots)} on {args.socket}")
+    # Stop cleanly on SIGTERM too; shutdown() waits for serve_forever, so not from its thread
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
+        stats = cache.stats()
+        print(
+            f"Served {stats['hits']} cached and {stats['misses']} uncached reads, "
+            f"{stats['invalidations']} entries invalidated"
+        )
+
+
+if __name__ == "__main__":
+    main()
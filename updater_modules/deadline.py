@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+
+"""
+Deadline-bounded runs.
+
+A run with a wall-clock budget processes and saves pages in priority order
+and stops at the deadline. The pages it did not get to are written to a
+continuation file, and the next run starts with them.
+
+Priority tiers, highest first:
+    changed   pages whose parser files changed since the previous run started
+    pending   pages left over by the previous run, in the order they were left
+    traffic   pages listed in the priority titles file, most important first
+    rest      everything else, alphabetically
+"""
+
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+TIERS = ("changed", "pending", "traffic", "rest")
+
+
+class Deadline:
+    """
+    Wall-clock budget of a run.
+
+    Args:
+        seconds: Seconds from now until the deadline
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.end = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return self.end - time.monotonic()
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+def load_continuation(path: str) -> Dict:
+    """
+    Read the continuation file left by the previous run.
+
+    Returns:
+        {"started": epoch seconds or None, "pending": [[title, category], ...]}
+    """
+    empty = {"started": None, "pending": []}
+    if not path:
+        return empty
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return empty
+    except (OSError, ValueError) as e:
+        print(f"Could not read continuation file {path}: {e}")
+        return empty
+    return {"started": data.get("started"), "pending": data.get("pending", [])}
+
+
+def write_continuation(path: str, started: float, pending: List[Tuple[str, str]]) -> None:
+    """
+    Record when this run started and the pages it left for the next one.
+
+    Args:
+        path: Continuation file
+        started: Epoch seconds at which this run started
+        pending: (title, category) of the pages left, in priority order
+    """
+    if not path:
+        return
+    data = {
+        "written": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "started": started,
+        "pending": [list(entry) for entry in pending],
+    }
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1, ensure_ascii=False)
+    except OSError as e:
+        print(f"Could not write continuation file {path}: {e}")
+
+
+def load_priority_titles(path: Optional[str]) -> List[str]:
+    """Read a titles file (one per line, # for comments), most important first."""
+    if not path:
+        return []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    except OSError as e:
+        print(f"Could not read priority titles {path}: {e}")
+        return []
+
+
+class PriorityScheduler:
+    """
+    Orders the pages of a deadline run and collects the ones left undone.
+
+    Args:
+        deadline: The run's deadline
+        pending: (title, category) left by the previous run
+        traffic: High-traffic titles, most important first
+        inputs_changed: Callable (title, text, category) telling whether the
+            page's parser files changed since the previous run started
+    """
+
+    def __init__(
+        self,
+        deadline: Deadline,
+        pending: List[Tuple[str, str]],
+        traffic: List[str],
+        inputs_changed: Callable[[str, str, str], bool],
+    ):
+        self.deadline = deadline
+        self.inputs_changed = inputs_changed
+        self._pending = {title: index for index, (title, _) in enumerate(pending)}
+        self._traffic = {}
+        for index, title in enumerate(traffic):
+            self._traffic.setdefault(title, index)
+        self._keys: Dict[str, Tuple] = {}
+        self._left: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.tier_counts = {tier: 0 for tier in TIERS}
+
+    def key(self, title: str, text: str = "", category: str = None) -> Tuple:
+        """Sort key of a page, lowest first; computed once per page."""
+        key = self._keys.get(title)
+        if key is not None:
+            return key
+        if text and self.inputs_changed(title, text, category):
+            key = (0, 0, title)
+        elif title in self._pending:
+            key = (1, self._pending[title], title)
+        elif title in self._traffic:
+            key = (2, self._traffic[title], title)
+        else:
+            key = (3, 0, title)
+        with self._lock:
+            if title not in self._keys:
+                self._keys[title] = key
+                self.tier_counts[TIERS[key[0]]] += 1
+        return key
+
+    def order(self, titles: List[str], category: str, texts: Dict[str, str]) -> List[str]:
+        """Sort a category's titles by priority."""
+        return sorted(titles, key=lambda title: self.key(title, texts.get(title, ""), category))
+
+    def leave(self, title: str, category: str) -> None:
+        """Record a page the run did not finish."""
+        with self._lock:
+            self._left[title] = category
+
+    def left(self) -> List[Tuple[str, str]]:
+        """Pages left for the next run, in priority order."""
+        with self._lock:
+            left = list(self._left.items())
+        return sorted(left, key=lambda entry: self.key(entry[0], "", entry[1]))
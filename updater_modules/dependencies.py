@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+
+import os
+import threading
+from typing import Dict, Iterable, List, Set
+
+
+class DependencyMap:
+    """
+    Map between wiki pages and the parser files they were built from.
+
+    Paths are recorded while a page is processed, including probes for files
+    that did not exist, so a file appearing later also maps back to its page.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pages_by_path: Dict[str, Set[str]] = {}
+        self._paths_by_page: Dict[str, Set[str]] = {}
+        self._category_by_page: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._paths_by_page)
+
+    def record(self, title: str, category: str, paths: Iterable[str]) -> None:
+        """Replace the recorded dependencies of a page."""
+        paths = set(paths)
+        with self._lock:
+            for path in self._paths_by_page.get(title, ()):
+                pages = self._pages_by_path.get(path)
+                if pages is not None:
+                    pages.discard(title)
+                    if not pages:
+                        del self._pages_by_path[path]
+            for path in paths:
+                self._pages_by_path.setdefault(path, set()).add(title)
+            self._paths_by_page[title] = paths
+            self._category_by_page[title] = category
+
+    def paths_of(self, title: str) -> Set[str]:
+        """Return the parser paths recorded for a page, empty if it was not processed yet."""
+        with self._lock:
+            return set(self._paths_by_page.get(title, ()))
+
+    def category_of(self, title: str) -> str:
+        """Return the category a page was processed under, or None."""
+        return self._category_by_page.get(title)
+
+    def pages_for(self, changed_paths: Iterable[str]) -> Set[str]:
+        """
+        Find the pages depending on any of the changed paths.
+
+        Args:
+            changed_paths: Changed file paths; a path ending in a separator
+                matches every recorded path below that directory
+
+        Returns:
+            Set of affected page titles
+        """
+        titles = set()
+        directories = []
+        with self._lock:
+            for path in changed_paths:
+                if path.endswith(os.sep):
+                    directories.append(path)
+                else:
+                    titles.update(self._pages_by_path.get(path, ()))
+
+            if directories:
+                prefixes = tuple(directories)
+                for path, pages in self._pages_by_path.items():
+                    if path.startswith(prefixes):
+                        titles.update(pages)
+        return titles
+
+
+def template_titles_for(
+    changed_paths: Iterable[str], parser_output_path: str, language_code: str
+) -> List[str]:
+    """
+    Map changed tag template files to their Template:Tag_ pages.
+
+    Template pages are generated straight from
+    {parser_output_path}/{language_code}/tags/articles/templates/{name}.txt.
+    """
+    templates_folder = os.path.join(
+        parser_output_path, language_code, "tags", "articles", "templates", ""
+    )
+    titles = set()
+    for path in changed_paths:
+        if path.endswith(os.sep):
+            # A whole directory changed, so rescan every template below it
+            if templates_folder.startswith(path) or path.startswith(templates_folder):
+                folder = path if path.startswith(templates_folder) else templates_folder
+                if os.path.isdir(folder):
+                    titles.update(
+                        f"Template:Tag_{f[:-4]}"
+                        for f in os.listdir(folder)
+                        if f.endswith(".txt")
+                    )
+        elif path.startswith(templates_folder) and path.endswith(".txt"):
+            name = path[len(templates_folder) :]
+            if os.sep not in name:
+                titles.add(f"Template:Tag_{name[:-4]}")
+    return sorted(titles)
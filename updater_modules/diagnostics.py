@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+
+import collections
+import json
+import queue
+import threading
+from typing import Dict, List, Optional, Tuple
+
+# Examples kept per event and processor
+SAMPLE_SIZE = 3
+
+
+class DiagnosticsCollector:
+    """
+    Collects diagnostic events (missing files, failed batches, ...) instead
+    of printing each one as it happens.
+
+    Recording only puts the event on a queue; a background thread aggregates
+    counts by event, processor and language, keeps a bounded sample of
+    examples and optionally appends every event to a JSON lines log.
+    In a watchdog worker process events are buffered instead, so the parent
+    can take them over with each page result.
+
+    Args:
+        sample_size: Examples kept per event and processor
+        log_path: Optional file every event is appended to
+    """
+
+    def __init__(self, sample_size: int = SAMPLE_SIZE, log_path: Optional[str] = None):
+        self.sample_size = sample_size
+        self.log_path = log_path
+        self.counts: Dict[Tuple[str, str, str, str], int] = collections.Counter()
+        self.samples: Dict[Tuple[str, str], collections.deque] = {}
+        self._queue = queue.Queue()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._forwarded = None
+
+    def record(
+        self,
+        event: str,
+        processor: Optional[str] = None,
+        language: Optional[str] = None,
+        detail: Optional[str] = None,
+        level: str = "info",
+    ) -> None:
+        """
+        Record one event.
+
+        Args:
+            event: Event type, e.g. "article_file_missing"
+            processor: Processor that raised it, e.g. "item.process_infobox"
+            language: Language code of the page, if any
+            detail: Example detail kept in the sample, e.g. the missing path
+            level: "info" for expected misses, "error" for real failures
+        """
+        item = (event, processor or "-", language or "-", level, detail)
+        if self._forwarded is not None:
+            self._forwarded.append(item)
+            return
+        if self._thread is None:
+            self._start()
+        self._queue.put(item)
+
+    def _start(self) -> None:
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="diagnostics", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        log = None
+        if self.log_path:
+            try:
+                log = open(self.log_path, "a", encoding="utf-8")
+            except OSError as e:
+                print(f"Could not open diagnostics log {self.log_path}: {e}")
+
+        while True:
+            item = self._queue.get()
+            try:
+                if item is not None:
+                    self._aggregate(item)
+                    if log is not None:
+                        event, processor, language, level, detail = item
+                        log.write(
+                            json.dumps(
+                                {
+                                    "event": event,
+                                    "processor": processor,
+                                    "language": language,
+                                    "level": level,
+                                    "detail": detail,
+                                }
+                            )
+                            + "\n"
+                        )
+                elif log is not None:
+                    log.flush()
+            finally:
+                self._queue.task_done()
+
+    def _aggregate(self, item) -> None:
+        event, processor, language, level, detail = item
+        self.counts[(event, processor, language, level)] += 1
+        if detail is not None:
+            key = (event, processor)
+            samples = self.samples.get(key)
+            if samples is None:
+                samples = self.samples[key] = collections.deque(maxlen=self.sample_size)
+            samples.append(detail)
+
+    def flush(self) -> None:
+        """Wait until every recorded event has been aggregated and logged."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._queue.join()
+
+    def reset(self) -> None:
+        self.flush()
+        self.counts.clear()
+        self.samples.clear()
+
+    def forward_in_child(self) -> None:
+        """Buffer events in this worker process for the parent to collect."""
+        self._forwarded = []
+        self._thread = None
+        self._queue = queue.Queue()
+
+    def take_forwarded(self) -> List[Tuple]:
+        """Return and clear the events buffered by forward_in_child."""
+        items, self._forwarded = self._forwarded or [], []
+        return items
+
+    def extend(self, items: List[Tuple]) -> None:
+        """Record events taken over from a worker process."""
+        for event, processor, language, level, detail in items:
+            self.record(event, processor, language, detail, level)
+
+    def print_summary(self, limit: int = 30) -> None:
+        """Print event counts by event and processor, errors first."""
+        self.flush()
+        if not self.counts:
+            return
+
+        rows = {}
+        for (event, processor, language, level), count in list(self.counts.items()):
+            row = rows.setdefault(
+                (event, processor),
+                {"level": level, "count": 0, "languages": collections.Counter()},
+            )
+            row["count"] += count
+            row["languages"][language] += count
+            if level == "error":
+                row["level"] = "error"
+
+        ordered = sorted(
+            rows.items(), key=lambda r: (r[1]["level"] != "error", -r[1]["count"])
+        )
+        print(f"\n{'Event':<28}{'Processor':<32}{'Count':>8}  Languages / sample")
+        for (event, processor), row in ordered[:limit]:
+            marker = "!" if row["level"] == "error" else " "
+            languages = ", ".join(
+                f"{language} {count}" for language, count in row["languages"].most_common(4)
+            )
+            print(f"{marker}{event[:27]:<27}{processor[:31]:<32}{row['count']:>8}  {languages}")
+            for detail in self.samples.get((event, processor), ()):
+                print(f"{'':<68}  e.g. {detail}")
+        if len(ordered) > limit:
+            print(f"... {len(ordered) - limit} more event types")
+
+
+# Collector shared by the whole run
+diagnostics = DiagnosticsCollector()
+
+
+def record_event(
+    event: str,
+    processor: Optional[str] = None,
+    language: Optional[str] = None,
+    detail: Optional[str] = None,
+    level: str = "info",
+) -> None:
+    """Record an event on the shared collector."""
+    diagnostics.record(event, processor, language, detail, level)
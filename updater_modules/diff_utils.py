@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+
+"""
+Line diffs for large pages.
+
+Myers' O((N+M)D) algorithm on lines, after trimming the common prefix and
+suffix, so the cost grows with the size of the change rather than with the
+square of the page. Pages that differ in more than max_edits lines get the
+changed middle reported as one replacement instead, which keeps the worst
+case linear.
+
+The output matches difflib.unified_diff in format.
+"""
+
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Edit distance (in lines) beyond which the changed middle is one replacement
+DEFAULT_MAX_EDITS = 1000
+
+Opcode = Tuple[str, int, int, int, int]
+
+
+def _myers_matches(a: List[int], b: List[int], max_edits: int) -> Optional[List[Tuple[int, int]]]:
+    """
+    Matching line pairs of a shortest edit script between a and b.
+
+    Returns:
+        (i, j) pairs with a[i] == b[j] in increasing order, or None when more
+        than max_edits insertions and deletions are needed
+    """
+    n, m = len(a), len(b)
+    max_d = min(n + m, max_edits)
+    offset = max_d + 1
+    v = [0] * (2 * max_d + 3)
+    trace = []
+
+    for d in range(max_d + 1):
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[x] == b[y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                return _backtrack(trace, d, n, m)
+        trace.append(v[offset - d:offset + d + 1])
+    return None
+
+
+def _backtrack(trace: List[List[int]], edits: int, n: int, m: int) -> List[Tuple[int, int]]:
+    """Walk the saved diagonals back from (n, m), collecting the matched lines."""
+    matches = []
+    x, y = n, m
+    for d in range(edits, 0, -1):
+        previous = trace[d - 1]
+        k = x - y
+        if k == -d or (k != d and previous[k - 1 + d - 1] < previous[k + 1 + d - 1]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = previous[prev_k + d - 1]
+        prev_y = prev_x - prev_k
+        while x > prev_x and y > prev_y:
+            x -= 1
+            y -= 1
+            matches.append((x, y))
+        x, y = prev_x, prev_y
+    while x > 0 and y > 0:
+        x -= 1
+        y -= 1
+        matches.append((x, y))
+    matches.reverse()
+    return matches
+
+
+def diff_opcodes(a: List[str], b: List[str], max_edits: int = DEFAULT_MAX_EDITS) -> List[Opcode]:
+    """
+    Opcodes turning the lines a into the lines b, as SequenceMatcher.get_opcodes returns them.
+
+    Args:
+        a: Old lines
+        b: New lines
+        max_edits: Edit distance beyond which the changed middle is one replacement
+
+    Returns:
+        (tag, i1, i2, j1, j2) tuples, tag being "equal", "replace", "delete" or "insert"
+    """
+    n, m = len(a), len(b)
+    prefix = 0
+    while prefix < n and prefix < m and a[prefix] == b[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < n - prefix and suffix < m - prefix and a[n - 1 - suffix] == b[m - 1 - suffix]:
+        suffix += 1
+
+    # Compare the middle as integers, one per distinct line
+    codes: Dict[str, int] = {}
+    a_mid = [codes.setdefault(line, len(codes)) for line in a[prefix:n - suffix]]
+    b_mid = [codes.setdefault(line, len(codes)) for line in b[prefix:m - suffix]]
+    matches = _myers_matches(a_mid, b_mid, max_edits) if a_mid and b_mid else []
+    if matches is None:
+        matches = []
+
+    opcodes: List[Opcode] = []
+    i = j = 0
+    # A sentinel match at the end flushes the last change
+    for mi, mj in matches + [(len(a_mid), len(b_mid))]:
+        if mi > i or mj > j:
+            tag = "replace" if mi > i and mj > j else ("delete" if mi > i else "insert")
+            opcodes.append((tag, prefix + i, prefix + mi, prefix + j, prefix + mj))
+        if mi < len(a_mid):
+            if opcodes and opcodes[-1][0] == "equal":
+                last = opcodes[-1]
+                opcodes[-1] = ("equal", last[1], prefix + mi + 1, last[3], prefix + mj + 1)
+            else:
+                opcodes.append(("equal", prefix + mi, prefix + mi + 1, prefix + mj, prefix + mj + 1))
+        i, j = mi + 1, mj + 1
+
+    if prefix:
+        if opcodes and opcodes[0][0] == "equal":
+            first = opcodes[0]
+            opcodes[0] = ("equal", 0, first[2], 0, first[4])
+        else:
+            opcodes.insert(0, ("equal", 0, prefix, 0, prefix))
+    if suffix:
+        if opcodes and opcodes[-1][0] == "equal":
+            last = opcodes[-1]
+            opcodes[-1] = ("equal", last[1], n, last[3], m)
+        else:
+            opcodes.append(("equal", n - suffix, n, m - suffix, m))
+    return opcodes
+
+
+def grouped_opcodes(opcodes: List[Opcode], context: int = 3) -> Iterator[List[Opcode]]:
+    """Split opcodes into hunks with up to context lines around each change, like difflib."""
+    if not opcodes:
+        opcodes = [("equal", 0, 1, 0, 1)]
+    codes = list(opcodes)
+    if codes[0][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = tag, max(i1, i2 - context), i2, max(j1, j2 - context), j2
+    if codes[-1][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)
+
+    span = context + context
+    group = []
+    for tag, i1, i2, j1, j2 in codes:
+        # A long unchanged run ends the hunk; its edges become context
+        if tag == "equal" and i2 - i1 > span:
+            group.append((tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)))
+            yield group
+            group = []
+            i1, j1 = max(i1, i2 - context), max(j1, j2 - context)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        yield group
+
+
+def _format_range(start: int, stop: int) -> str:
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return f"{beginning}"
+    if not length:
+        beginning -= 1
+    return f"{beginning},{length}"
+
+
+def unified_diff(
+    old_text: str,
+    new_text: str,
+    fromfile: str = "",
+    tofile: str = "",
+    context: int = 3,
+    max_edits: int = DEFAULT_MAX_EDITS,
+) -> Tuple[str, int, int]:
+    """
+    Unified diff between two texts.
+
+    Args:
+        old_text: Text before the change
+        new_text: Text after the change
+        fromfile: Name on the --- line
+        tofile: Name on the +++ line
+        context: Unchanged lines around each change
+        max_edits: Edit distance beyond which the changed middle is one replacement
+
+    Returns:
+        (diff, lines added, lines removed); the diff is empty for equal texts
+    """
+    a = old_text.splitlines(keepends=True)
+    b = new_text.splitlines(keepends=True)
+    opcodes = diff_opcodes(a, b, max_edits)
+
+    added = removed = 0
+    out = []
+    for group in grouped_opcodes(opcodes, context):
+        if not out:
+            out.append(f"--- {fromfile}\n+++ {tofile}\n")
+        first, last = group[0], group[-1]
+        out.append(
+            f"@@ -{_format_range(first[1], last[2])} +{_format_range(first[3], last[4])} @@\n"
+        )
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                out.extend(" " + line for line in a[i1:i2])
+                continue
+            for line in a[i1:i2]:
+                out.append("-" + line)
+            for line in b[j1:j2]:
+                out.append("+" + line)
+            removed += i2 - i1
+            added += j2 - j1
+    # Lines without a final newline, as in patch output
+    text = "".join(line if line.endswith("\n") else line + "\n\\ No newline at end of file\n" for line in out)
+    return text, added, removed
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+
+import json
+import os
+import threading
+import urllib.parse
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from .diff_utils import unified_diff
+
+
+def diff_file_name(title: str) -> str:
+    """File name of a page's diff; titles are quoted so every title maps to its own file."""
+    return urllib.parse.quote(title.replace(" ", "_"), safe="()',-_.!") + ".diff"
+
+
+class DryRun:
+    """
+    Writes what a run would save instead of saving it.
+
+    Every changed page gets {path}/{category}/{title}.diff holding its edit
+    summary and a unified diff. summary.json holds the totals by category
+    and by process.
+
+    Args:
+        path: Output directory, created if needed
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.pages = 0
+        self.by_category: Dict[str, Counter] = {}
+        self.by_process: Dict[str, Counter] = {}
+
+    def prepare(self) -> None:
+        """Remove the diffs and summary of an earlier dry run into the same directory."""
+        for dirpath, _, filenames in os.walk(self.path):
+            for filename in filenames:
+                if filename.endswith(".diff") or (
+                    dirpath == self.path and filename == "summary.json"
+                ):
+                    try:
+                        os.remove(os.path.join(dirpath, filename))
+                    except OSError as e:
+                        print(f"Could not remove {filename}: {e}")
+
+    def record(self, title: str, category: str, processes: List[str], old_text: str, new_text: str) -> None:
+        """Write the diff of one page and add it to the statistics."""
+        category = category or "other"
+        diff, added, removed = unified_diff(old_text, new_text, f"a/{title}", f"b/{title}")
+        header = f"# {title}\n# Summary: Automated updating: {', '.join(processes)}\n"
+
+        folder = os.path.join(self.path, category)
+        try:
+            os.makedirs(folder, exist_ok=True)
+            with open(os.path.join(folder, diff_file_name(title)), "w", encoding="utf-8") as f:
+                f.write(header + diff)
+        except OSError as e:
+            print(f"Could not write dry run diff for {title}: {e}")
+
+        with self._lock:
+            self.pages += 1
+            totals = self.by_category.setdefault(category, Counter())
+            totals.update(pages=1, added=added, removed=removed, bytes=len(new_text) - len(old_text))
+            for process in processes:
+                self.by_process.setdefault(process, Counter()).update(pages=1)
+                self.by_process[process][category] += 1
+
+    def write_summary(self) -> None:
+        """Write summary.json and print the totals."""
+        summary = {
+            "written": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "pages": self.pages,
+            "categories": {name: dict(totals) for name, totals in sorted(self.by_category.items())},
+            "processes": {name: dict(totals) for name, totals in sorted(self.by_process.items())},
+        }
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            with open(os.path.join(self.path, "summary.json"), "w", encoding="utf-8") as f:
+                json.dump(summary, f, indent=2, ensure_ascii=False)
+        except OSError as e:
+            print(f"Could not write dry run summary: {e}")
+
+        print(f"\nDry run: {self.pages} pages would change, diffs in {self.path}")
+        print(f"{'Category':<16}{'Pages':>8}{'Added':>10}{'Removed':>10}{'Bytes':>12}")
+        for name, totals in sorted(self.by_category.items()):
+            print(
+                f"{name:<16}{totals['pages']:>8}{totals['added']:>10}"
+                f"{totals['removed']:>10}{totals['bytes']:>+12}"
+            )
+        print(f"\n{'Process':<32}{'Pages':>8}")
+        for name, totals in sorted(self.by_process.items(), key=lambda item: -item[1]["pages"]):
+            print(f"{name[:31]:<32}{totals['pages']:>8}")
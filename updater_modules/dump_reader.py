@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+
+import bz2
+import gzip
+import lzma
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterator, Optional, Tuple
+
+from tqdm import tqdm
+
+
+def open_dump(dump_path: str):
+    """Open a MediaWiki XML dump as a binary stream, decompressing by extension."""
+    if dump_path.endswith(".bz2"):
+        return bz2.open(dump_path, "rb")
+    if dump_path.endswith(".gz"):
+        return gzip.open(dump_path, "rb")
+    if dump_path.endswith((".xz", ".lzma")):
+        return lzma.open(dump_path, "rb")
+    return open(dump_path, "rb")
+
+
+def _local(tag: str) -> str:
+    """Strip the export-schema namespace from an element tag."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def iter_dump_pages(
+    dump_path: str, namespaces=(0,), skip_redirects: bool = True
+) -> Iterator[Tuple[str, int, str, str]]:
+    """
+    Stream pages out of a pages-articles XML dump with bounded memory.
+
+    Each <page> element is discarded as soon as it has been yielded, so memory
+    use does not grow with the size of the dump.
+
+    Args:
+        dump_path: Path to the dump, optionally .bz2, .gz or .xz compressed
+        namespaces: Namespace IDs to keep, None for all
+        skip_redirects: Skip redirect pages, like allpages(filterredir=False)
+
+    Yields:
+        (title, revision_id, text, timestamp) for the latest revision of each page
+    """
+    with open_dump(dump_path) as stream:
+        context = ET.iterparse(stream, events=("start", "end"))
+        _, root = next(context)
+
+        title = ns = revid = text = timestamp = None
+        redirect = False
+        in_revision = False
+
+        for event, elem in context:
+            tag = _local(elem.tag)
+
+            if event == "start":
+                if tag == "page":
+                    title = ns = revid = text = timestamp = None
+                    redirect = False
+                elif tag == "revision":
+                    in_revision = True
+                continue
+
+            if tag == "title":
+                title = elem.text
+            elif tag == "ns":
+                ns = int(elem.text or 0)
+            elif tag == "redirect":
+                redirect = True
+            elif tag == "id" and in_revision and revid is None:
+                revid = int(elem.text)
+            elif tag == "timestamp" and in_revision:
+                timestamp = elem.text
+            elif tag == "text" and in_revision:
+                text = elem.text or ""
+            elif tag == "revision":
+                in_revision = False
+            elif tag == "page":
+                if (
+                    title is not None
+                    and (namespaces is None or ns in namespaces)
+                    and not (redirect and skip_redirects)
+                ):
+                    yield title, revid, text or "", timestamp
+                # Release the finished page so memory stays bounded
+                root.clear()
+
+
+def load_dump_cache(
+    dump_path: str, namespaces=(0,)
+) -> Tuple[Dict[str, str], Dict[str, int], Optional[str]]:
+    """
+    Load a dump into a wiki cache.
+
+    Args:
+        dump_path: Path to the dump
+        namespaces: Namespace IDs to keep
+
+    Returns:
+        Tuple containing:
+        - Dictionary mapping page titles to page text
+        - Dictionary mapping page titles to revision IDs
+        - Newest revision timestamp in the dump (ISO 8601), or None if empty
+    """
+    wiki_cache = {}
+    revisions = {}
+    newest = None
+
+    for title, revid, text, timestamp in tqdm(
+        iter_dump_pages(dump_path, namespaces), desc="Reading dump", unit=" pages"
+    ):
+        wiki_cache[title] = text
+        revisions[title] = revid
+        if timestamp and (newest is None or timestamp > newest):
+            newest = timestamp
+
+    return wiki_cache, revisions, newest
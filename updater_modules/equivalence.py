@@ -0,0 +1,492 @@
+#!/usr/bin/env python
+
+"""
+Differential equivalence harness.
+
+Runs the formatter, the categorizer and every orchestrator of two versions
+of the updater over the same corpus of pages and reports any page whose
+output differs, with a minimal diff, next to the speed of each version.
+The baseline is a git ref (HEAD by default), the candidate is the working
+tree or another ref, so a performance rework can be checked before it
+produces a single unwanted edit.
+
+Each version runs in its own process with its own copy of the package, so
+module level caches and patterns of one version cannot leak into the other.
+
+Run standalone with:
+    python -m updater_modules.equivalence --parser-output /path/to/output --synthetic 2000
+    python -m updater_modules.equivalence --dump pages.xml.bz2 --baseline v1.4 --target format
+"""
+
+import argparse
+import difflib
+import importlib
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+PACKAGE = "scripts.userscripts.updater_modules"
+
+# Diff lines shown for each diverging page
+MAX_DIFF_LINES = 20
+# Diverging pages shown in full for each target
+MAX_EXAMPLES = 5
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Orchestrators of versions from before the plugin registry, in their processing order
+LEGACY_ORCHESTRATORS = ("item", "vehicle", "tile", "fluid", "tag")
+
+
+# --------------------------------------------------------------------------
+# Corpus
+# --------------------------------------------------------------------------
+
+
+def mutate(text: str, rng: random.Random) -> str:
+    """Apply a few of the irregularities real pages have, to exercise edge cases."""
+    mutations = [
+        lambda t: t.replace("\n", "\r\n"),
+        lambda t: t.replace("\n", "  \n", rng.randint(1, 5)),
+        lambda t: t.replace("\n\n", "\n\n\n\n", 1),
+        lambda t: t.replace("}}", "}", 1),
+        lambda t: t.replace("{{", "{{{{", 1),
+        lambda t: t.replace("|", " | ", 3),
+        lambda t: t + "\n\n",
+        lambda t: "\n" + t,
+        lambda t: t.replace("==", "== ", 2),
+        lambda t: t.replace("\n", "\n<!-- note -->", 1),
+    ]
+    for mutation in rng.sample(mutations, rng.randint(1, 3)):
+        text = mutation(text)
+    return text
+
+
+def load_corpus(args: argparse.Namespace) -> Dict[str, str]:
+    """Collect the pages to compare from the sources given on the command line."""
+    corpus = {}
+    if args.pages_dir:
+        for dirpath, _, filenames in os.walk(args.pages_dir):
+            for filename in sorted(filenames):
+                if filename.endswith(".txt"):
+                    with open(os.path.join(dirpath, filename), "r", encoding="utf-8") as f:
+                        corpus[filename[:-4].replace("_", " ")] = f.read()
+    if args.dump:
+        from .dump_reader import iter_dump_pages
+
+        for title, _, text, _ in iter_dump_pages(args.dump):
+            corpus[title] = text
+            if args.limit and len(corpus) >= args.limit:
+                break
+    if args.synthetic:
+        from .fake_wiki import synthetic_corpus
+
+        rng = random.Random(args.seed)
+        synthetic = synthetic_corpus(args.synthetic, args.parser_output, args.seed)
+        for title, text in synthetic.items():
+            if title.startswith("Module:"):
+                continue
+            corpus[title] = text
+            corpus[f"{title} (mutated)"] = mutate(text, rng)
+    if args.limit:
+        corpus = dict(list(corpus.items())[: args.limit])
+    return corpus
+
+
+# --------------------------------------------------------------------------
+# Versions
+# --------------------------------------------------------------------------
+
+
+def _package_root(root: str) -> str:
+    """Create the scripts/userscripts packages below root; returns the userscripts folder."""
+    userscripts = os.path.join(root, "scripts", "userscripts")
+    os.makedirs(userscripts, exist_ok=True)
+    for folder in (os.path.join(root, "scripts"), userscripts):
+        open(os.path.join(folder, "__init__.py"), "a").close()
+    return userscripts
+
+
+def prepare_version(ref: Optional[str], root: str) -> str:
+    """
+    Lay out one version of the package below root, importable as PACKAGE.
+
+    Args:
+        ref: Git ref to extract, None for the working tree
+        root: Empty directory to use
+
+    Returns:
+        A label for the version
+    """
+    userscripts = _package_root(root)
+    if ref is None:
+        os.symlink(
+            os.path.join(REPO_ROOT, "updater_modules"),
+            os.path.join(userscripts, "updater_modules"),
+        )
+        return "working tree"
+
+    archive = subprocess.run(
+        ["git", "-C", REPO_ROOT, "archive", "--format=tar", ref, "updater_modules"],
+        check=True,
+        capture_output=True,
+    ).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(userscripts)
+    return ref
+
+
+def run_version(root: str, config: Dict, workdir: str, name: str) -> Dict:
+    """Run the worker for one version in a separate process and return its results."""
+    config = dict(config, root=root, output=os.path.join(workdir, f"{name}.json"))
+    config_path = os.path.join(workdir, f"{name}.config.json")
+    with open(config_path, "w", encoding="utf-8") as f:
+        json.dump(config, f)
+    subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", config_path],
+        check=True,
+        cwd=workdir,
+    )
+    with open(config["output"], "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# --------------------------------------------------------------------------
+# Worker
+# --------------------------------------------------------------------------
+
+
+def read_current_version(parser_output_path: str) -> str:
+    """Game version of the parser output, read the same way as updater.py."""
+    version_file_path = os.path.join(
+        parser_output_path, "en", "item", "infoboxes", "Base.Axe.txt"
+    )
+    try:
+        with open(version_file_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("|infobox_version="):
+                    return line.split("=", 1)[1].strip()
+    except FileNotFoundError:
+        pass
+    return "Unknown"
+
+
+def _legacy_orchestrators(settings: Dict, language_code_of) -> Dict:
+    """
+    Targets of a version without the plugin registry, calling each
+    orchestrator with the arguments its updater.py passed.
+    """
+
+    def orchestrator(name):
+        orchestrate = getattr(importlib.import_module(f"{PACKAGE}.{name}_orchestrator"), f"orchestrate_{name}")
+        paths = (settings["parser_output_path"], settings["history_path"])
+
+        def run(title, text):
+            language_code = language_code_of(title)
+            if name in ("item", "vehicle"):
+                result = orchestrate(text, *paths, language_code, title)
+            elif name in ("tile", "fluid"):
+                result = orchestrate(text, *paths, language_code)
+            else:
+                result = orchestrate(text, *paths, language_code, settings["current_version"], title)
+            # Fluid and tag pages report whether they were edited
+            if len(result) == 3 and not result[2]:
+                return None
+            return [result[0], list(result[1])]
+
+        return run
+
+    return {name: orchestrator(name) for name in LEGACY_ORCHESTRATORS}
+
+
+def _legacy_language_code(title: str) -> str:
+    """Language code of a page as versions without get_language_code derived it."""
+    if title.startswith("User:") or "/" not in title:
+        return "en"
+    return title.rsplit("/", 1)[1]
+
+
+def _load_targets(names: Optional[List[str]], settings: Dict, corpus: Dict[str, str]) -> Dict:
+    """Import the version's modules and return its targets as title, text -> output callables."""
+    try:
+        registry = importlib.import_module(f"{PACKAGE}.registry")
+    except ImportError:
+        # Versions from before the plugin registry
+        registry = None
+    formatter = importlib.import_module(f"{PACKAGE}.formatter")
+    search = importlib.import_module(f"{PACKAGE}.updater_search")
+
+    # Navboxes are rendered from an index built once per run
+    try:
+        navbox = importlib.import_module(f"{PACKAGE}.navbox_index")
+    except ImportError:
+        navbox = None
+    if navbox is not None:
+        navbox.navbox_index.refresh(settings["parser_output_path"])
+
+    # Tile pages resolve their parser files through a reverse index built once per run
+    try:
+        tile = importlib.import_module(f"{PACKAGE}.tile.tile_index")
+    except ImportError:
+        tile = None
+    if tile is not None:
+        root = settings["parser_output_path"]
+        tile.tile_index.refresh(
+            root, sorted(name for name in os.listdir(root) if os.path.isdir(os.path.join(root, name)))
+        )
+
+    # Categorize once up front, as a run does before the orchestrators, so
+    # versions recording page features hand them to the orchestrators
+    try:
+        features = importlib.import_module(f"{PACKAGE}.features")
+    except ImportError:
+        features = None
+    search.process_batch(list(corpus.items()))
+
+    targets = {
+        "categorize": lambda title, text: sorted(search.process_batch([(title, text)])),
+        "format": lambda title, text: formatter.format_wiki_text(text),
+    }
+
+    def language_code_of(title):
+        if hasattr(search, "get_language_code"):
+            return search.get_language_code(title, "en")
+        return _legacy_language_code(title)
+
+    def orchestrator(plugin):
+        def run(title, text):
+            language_code = language_code_of(title)
+            if features is not None:
+                settings["features"] = features.page_features.get(title)
+            result = plugin.entry(title, text, language_code, settings)
+            return None if result is None else [result[0], list(result[1])]
+
+        return run
+
+    if registry is None:
+        targets.update(_legacy_orchestrators(settings, language_code_of))
+    else:
+        for plugin in registry.enabled_plugins():
+            targets[plugin.name] = orchestrator(plugin)
+
+    if names:
+        targets = {name: targets[name] for name in names if name in targets}
+    return targets
+
+
+def run_worker(config_path: str) -> None:
+    """Worker process: run every target of one version over the corpus."""
+    with open(config_path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    # Replace this script's folder, so only the version under root is importable
+    sys.path[0] = config["root"]
+    with open(config["corpus"], "r", encoding="utf-8") as f:
+        corpus = json.load(f)
+
+    settings = {
+        "parser_output_path": config["parser_output_path"],
+        "history_path": config["history_path"],
+        "current_version": read_current_version(config["parser_output_path"]),
+    }
+    targets = _load_targets(config["targets"], settings, corpus)
+
+    outputs = {}
+    timings = {}
+    for name, func in targets.items():
+        results = {}
+        best = None
+        # The first pass records the outputs and warms the caches, later passes are timed
+        for attempt in range(config["repeat"] + 1):
+            start = time.perf_counter()
+            for title, text in corpus.items():
+                try:
+                    output = func(title, text)
+                except Exception as e:
+                    output = f"error: {type(e).__name__}: {e}"
+                if attempt == 0:
+                    results[title] = output
+            seconds = time.perf_counter() - start
+            if attempt > 0 or config["repeat"] == 0:
+                best = seconds if best is None else min(best, seconds)
+        outputs[name] = results
+        timings[name] = best
+
+    with open(config["output"], "w", encoding="utf-8") as f:
+        json.dump({"outputs": outputs, "timings": timings}, f)
+
+
+# --------------------------------------------------------------------------
+# Comparison
+# --------------------------------------------------------------------------
+
+
+def _as_text(output) -> str:
+    """Text used to diff an output."""
+    if output is None:
+        return "<unchanged>\n"
+    if isinstance(output, list) and len(output) == 2 and isinstance(output[0], str):
+        return f"{output[0]}\n<processes: {', '.join(output[1])}>\n"
+    if isinstance(output, str):
+        return output
+    return json.dumps(output) + "\n"
+
+
+def minimal_diff(baseline, candidate, max_lines: int = MAX_DIFF_LINES) -> List[str]:
+    """
+    Shortest readable diff of two outputs.
+
+    Returns:
+        Unified diff lines with one line of context, cut to max_lines; for
+        differences inside a single line, the first differing column is marked
+    """
+    old = _as_text(baseline).splitlines(keepends=True)
+    new = _as_text(candidate).splitlines(keepends=True)
+    lines = [
+        line.rstrip("\n")
+        for line in difflib.unified_diff(old, new, "baseline", "candidate", n=1)
+    ][2:]
+    if not lines:
+        # Only line endings or a trailing newline differ
+        lines = [f"- {_as_text(baseline)[-40:]!r}", f"+ {_as_text(candidate)[-40:]!r}"]
+
+    removed = [line[1:] for line in lines if line.startswith("-")]
+    added = [line[1:] for line in lines if line.startswith("+")]
+    if len(removed) == 1 and len(added) == 1:
+        column = next(
+            (i for i, (a, b) in enumerate(zip(removed[0], added[0])) if a != b),
+            min(len(removed[0]), len(added[0])),
+        )
+        lines.append(f"  first difference at column {column}: "
+                     f"{removed[0][column:column + 20]!r} -> {added[0][column:column + 20]!r}")
+
+    if len(lines) > max_lines:
+        lines = lines[:max_lines] + [f"  ... {len(lines) - max_lines} more lines"]
+    return lines
+
+
+def compare_results(
+    baseline: Dict, candidate: Dict, max_examples: int = MAX_EXAMPLES
+) -> Tuple[List[Tuple[str, int, int, Optional[float], Optional[float]]], bool]:
+    """
+    Print the diverging pages of each target and return the summary rows.
+
+    Returns:
+        Tuple containing:
+        - (target, pages, diverging pages, baseline seconds, candidate seconds) rows
+        - Whether any output diverged
+    """
+    rows = []
+    diverged = False
+    for target, old_outputs in baseline["outputs"].items():
+        new_outputs = candidate["outputs"].get(target)
+        if new_outputs is None:
+            print(f"\n{target}: missing from the candidate")
+            diverged = True
+            continue
+        differing = [
+            title for title in old_outputs if old_outputs[title] != new_outputs.get(title)
+        ]
+        for title in differing[:max_examples]:
+            print(f"\n{target}: {title}")
+            for line in minimal_diff(old_outputs[title], new_outputs.get(title)):
+                print(f"  {line}")
+        if len(differing) > max_examples:
+            print(f"\n{target}: {len(differing) - max_examples} more diverging pages")
+        diverged = diverged or bool(differing)
+        rows.append(
+            (
+                target,
+                len(old_outputs),
+                len(differing),
+                baseline["timings"].get(target),
+                candidate["timings"].get(target),
+            )
+        )
+    for target in candidate["outputs"].keys() - baseline["outputs"].keys():
+        print(f"\n{target}: only in the candidate, not compared")
+    return rows, diverged
+
+
+def print_summary(rows, baseline_label: str, candidate_label: str) -> None:
+    print(f"\nBaseline {baseline_label}, candidate {candidate_label}")
+    print(f"{'Target':<12}{'Pages':>8}{'Diverged':>10}{'Baseline':>11}{'Candidate':>11}{'Speedup':>9}")
+    for target, pages, differing, old_seconds, new_seconds in rows:
+        speedup = old_seconds / new_seconds if old_seconds and new_seconds else 0.0
+        print(
+            f"{'!' if differing else ' '}{target:<11}{pages:>8}{differing:>10}"
+            f"{old_seconds or 0:>10.3f}s{new_seconds or 0:>10.3f}s{speedup:>8.2f}x"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare the outputs and speed of two versions of the updater on a corpus"
+    )
+    parser.add_argument("--baseline", default="HEAD", help="Git ref of the current behavior")
+    parser.add_argument("--candidate", help="Git ref of the candidate, the working tree by default")
+    parser.add_argument("--parser-output", required=True, help="Parser output the orchestrators read")
+    parser.add_argument("--history", default="", help="History files the item orchestrator reads")
+    parser.add_argument("--pages-dir", help="Folder of real pages saved as <title>.txt")
+    parser.add_argument("--dump", help="Pages-articles XML dump to take real pages from")
+    parser.add_argument("--synthetic", type=int, default=0, help="Synthetic pages, each also mutated")
+    parser.add_argument("--limit", type=int, default=0, help="Largest number of pages compared")
+    parser.add_argument("--target", action="append", help="Only compare this target, can be repeated")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed passes, the best one is reported")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args)
+    if not corpus:
+        print("No pages to compare; give --pages-dir, --dump or --synthetic")
+        sys.exit(2)
+    print(f"Comparing {len(corpus)} pages")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        corpus_path = os.path.join(workdir, "corpus.json")
+        with open(corpus_path, "w", encoding="utf-8") as f:
+            json.dump(corpus, f)
+        config = {
+            "corpus": corpus_path,
+            "parser_output_path": os.path.abspath(args.parser_output),
+            "history_path": os.path.abspath(args.history) if args.history else "",
+            "targets": args.target,
+            "repeat": args.repeat,
+        }
+        results = {}
+        labels = {}
+        for name, ref in (("baseline", args.baseline), ("candidate", args.candidate)):
+            root = os.path.join(workdir, name)
+            try:
+                labels[name] = prepare_version(ref, root)
+            except subprocess.CalledProcessError as e:
+                print(f"Could not extract the {name} {ref}: {e.stderr.decode('utf-8', 'replace').strip()}")
+                sys.exit(2)
+            try:
+                results[name] = run_version(root, config, workdir, name)
+            except subprocess.CalledProcessError as e:
+                print(
+                    f"The {name} ({labels[name]}) could not be run, exit code {e.returncode}. "
+                    "The oldest supported refs are the first with updater_modules/formatter.py "
+                    "and the item, vehicle, tile, fluid and tag orchestrators."
+                )
+                sys.exit(2)
+
+    rows, diverged = compare_results(results["baseline"], results["candidate"])
+    print_summary(rows, labels["baseline"], labels["candidate"])
+    if diverged:
+        print("\nOutputs diverged")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--worker":
+        run_worker(sys.argv[2])
+    else:
+        main()
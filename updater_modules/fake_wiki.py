@@ -0,0 +1,767 @@
+#!/usr/bin/env python
+
+"""
+Local stand-in for the PZwiki MediaWiki API.
+
+Serves the subset of api.php that the updater uses (siteinfo, tokens, login,
+allpages, revisions, recentchanges, embeddedin and edit) from an in-memory
+corpus, with configurable latency, error, maxlag and rate-limit injection so
+fetch and save throughput can be measured without touching the live wiki.
+
+Run standalone with:
+    python -m updater_modules.fake_wiki --port 8089 --pages 5000 --latency 0.05
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+NAMESPACES = {
+    -2: "Media",
+    -1: "Special",
+    0: "",
+    1: "Talk",
+    2: "User",
+    3: "User talk",
+    4: "PZwiki",
+    6: "File",
+    8: "MediaWiki",
+    10: "Template",
+    12: "Help",
+    14: "Category",
+    828: "Module",
+}
+
+
+# Modules served, with (group, prefix, parameters, generator capable)
+API_MODULES = {
+    "query": (None, "", ["prop", "list", "meta", "generator", "titles", "pageids", "continue", "redirects"], False),
+    "edit": (None, "", ["title", "text", "summary", "tags", "bot", "minor", "notminor", "basetimestamp", "starttimestamp", "nocreate", "createonly", "recreate", "token", "watchlist", "contentmodel", "contentformat", "baserevid"], False),
+    "login": (None, "lg", ["name", "password", "domain", "token"], False),
+    "clientlogin": (None, "login", ["requests", "messageformat", "returnurl", "continue", "preservestate", "token"], False),
+    "logout": (None, "", ["token"], False),
+    "paraminfo": (None, "", ["modules", "helpformat"], False),
+    "query+siteinfo": ("meta", "si", ["prop", "filteriw", "showalldb", "numberingroup", "inlanguagecode"], False),
+    "query+userinfo": ("meta", "ui", ["prop", "attachedwiki"], False),
+    "query+tokens": ("meta", "", ["type"], False),
+    "query+info": ("prop", "in", ["prop", "testactions", "continue"], False),
+    "query+revisions": ("prop", "rv", ["prop", "slots", "limit", "startid", "endid", "start", "end", "dir", "user", "excludeuser", "tag", "continue", "contentformat"], False),
+    "query+templates": ("prop", "tl", ["namespace", "limit", "continue", "templates", "dir"], True),
+    "query+categoryinfo": ("prop", "ci", ["continue"], False),
+    "query+allpages": ("list", "ap", ["from", "continue", "to", "prefix", "namespace", "filterredir", "limit", "dir"], True),
+    "query+embeddedin": ("list", "ei", ["title", "pageid", "continue", "namespace", "dir", "filterredir", "limit"], True),
+    "query+recentchanges": ("list", "rc", ["start", "end", "dir", "namespace", "user", "excludeuser", "tag", "prop", "show", "limit", "type", "toponly", "title", "continue", "generaterevisions", "slot"], True),
+}
+
+
+TEMPLATE_CALL = re.compile(r"\{\{\s*([^{}|\n#:]+)")
+
+# Seeded infoboxes get a weight no parser file has, so their pages are edited
+STALE_WEIGHT = re.compile(r"^\|weight=.*$", re.MULTILINE)
+STALE_WEIGHT_VALUE = "-1"
+
+
+def _paraminfo_module(path: str) -> Dict:
+    """Describe one API module the way action=paraminfo does."""
+    if path == "main":
+        actions = [p for p in API_MODULES if "+" not in p]
+        return {
+            "name": "main",
+            "classname": "ApiMain",
+            "path": "main",
+            "prefix": "",
+            "source": "MediaWiki",
+            "helpurls": [],
+            "parameters": [
+                {"name": "action", "type": actions, "submodules": {a: a for a in actions}},
+                {"name": "format", "type": ["json"], "submodules": {"json": "json"}},
+                {"name": "maxlag", "type": "integer"},
+                {"name": "assert", "type": ["anon", "bot", "user"]},
+            ],
+        }
+    if path not in API_MODULES:
+        return {"name": path.rsplit("+", 1)[-1], "path": path, "missing": ""}
+
+    group, prefix, names, generator = API_MODULES[path]
+    parameters = []
+    for name in names:
+        if name == "limit":
+            parameters.append({"name": name, "type": "limit", "min": 1, "max": 500, "highmax": 5000, "default": 10})
+        else:
+            parameters.append({"name": name, "type": "string", "multi": "", "limit": 50, "highlimit": 500})
+
+    if path == "query":
+        parameters = [p for p in parameters if p["name"] not in ("prop", "list", "meta", "generator")]
+        for param_group in ("prop", "list", "meta"):
+            subs = [p.split("+", 1)[1] for p, spec in API_MODULES.items() if spec[0] == param_group]
+            parameters.append({"name": param_group, "type": subs, "multi": "", "limit": 50, "highlimit": 500,
+                               "submodules": {s: f"query+{s}" for s in subs}})
+        gens = [p.split("+", 1)[1] for p, spec in API_MODULES.items() if spec[3]]
+        parameters.append({"name": "generator", "type": gens, "submodules": {g: f"query+{g}" for g in gens}})
+    if path == "query+revisions":
+        for param in parameters:
+            if param["name"] == "slots":
+                param["type"] = ["main"]
+    if path == "query+recentchanges":
+        for param in parameters:
+            if param["name"] == "show":
+                flags = ["minor", "bot", "anon", "redirect", "patrolled"]
+                param["type"] = flags + ["!" + f for f in flags]
+
+    module = {
+        "name": path.rsplit("+", 1)[-1],
+        "classname": "ApiFake",
+        "path": path,
+        "prefix": prefix,
+        "source": "MediaWiki",
+        "helpurls": [],
+        "parameters": parameters,
+    }
+    if group:
+        module["group"] = group
+    if generator:
+        module["generator"] = ""
+    if path in ("edit", "login", "clientlogin", "logout"):
+        module["mustbeposted"] = ""
+        module["writerights"] = "" if path == "edit" else None
+        if module["writerights"] is None:
+            del module["writerights"]
+    return module
+
+
+def _timestamp(seconds: float) -> str:
+    return datetime.fromtimestamp(seconds, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _namespace_of(title: str) -> int:
+    if ":" in title:
+        prefix = title.split(":", 1)[0]
+        for ns, name in NAMESPACES.items():
+            if name and name == prefix:
+                return ns
+    return 0
+
+
+def _normalize(title: str) -> str:
+    title = title.replace("_", " ").strip()
+    return title[:1].upper() + title[1:]
+
+
+def synthetic_corpus(
+    pages: int = 1000, parser_output_path: Optional[str] = None, seed: int = 0
+) -> Dict[str, str]:
+    """
+    Build a synthetic corpus of wiki pages.
+
+    When parser_output_path is given, item, tile and fluid pages are seeded
+    from the parser infobox files (with a stale weight so they produce edits),
+    otherwise generic placeholder pages are generated.
+
+    Args:
+        pages: Number of article pages to generate
+        parser_output_path: Optional path to the parser output
+        seed: Random seed for reproducible corpora
+
+    Returns:
+        Dictionary mapping page titles to page text
+    """
+    rng = random.Random(seed)
+    corpus = {}
+
+    sources = []
+    if parser_output_path:
+        for kind, subdir in (
+            ("item", os.path.join("en", "item", "infoboxes")),
+            ("tile", os.path.join("en", "tiles", "infoboxes")),
+            ("fluid", os.path.join("en", "fluid_infoboxes")),
+        ):
+            folder = os.path.join(parser_output_path, subdir)
+            if os.path.isdir(folder):
+                sources.extend(
+                    (kind, os.path.join(folder, f))
+                    for f in sorted(os.listdir(folder))
+                    if f.endswith(".txt")
+                )
+        rng.shuffle(sources)
+
+    for i in range(pages):
+        if i < len(sources):
+            kind, file_path = sources[i]
+            with open(file_path, "r", encoding="utf-8") as f:
+                infobox = f.read().strip()
+            infobox = STALE_WEIGHT.sub(f"|weight={STALE_WEIGHT_VALUE}", infobox, count=1)
+            title = os.path.basename(file_path)[:-4].replace("_", " ")
+            if kind == "item" and title.startswith("Base."):
+                title = title[5:]
+        else:
+            kind = rng.choice(("item", "item", "item", "tile", "fluid", "plain"))
+            title = f"Synthetic {kind} {i}"
+            if kind == "plain":
+                infobox = ""
+            else:
+                infobox = (
+                    f"{{{{Infobox {kind}\n|name={title}\n|weight={rng.randint(1, 9)}\n"
+                    f"|{kind}_id=Base.Synthetic{i}\n}}}}"
+                )
+
+        body = "\n".join(
+            f"Paragraph {n} of {title}." for n in range(rng.randint(3, 40))
+        )
+        corpus[title] = (
+            f"{infobox}\n'''{title}''' is a synthetic page.\n\n==Usage==\n{body}\n"
+        )
+
+    for n in range(max(1, pages // 100)):
+        corpus[f"Module:Loot/synthetic_{n}"] = f"return {{ id = {n} }}\n"
+    corpus["Module:Loot/index"] = "return {}\n"
+
+    return corpus
+
+
+class FakeWiki:
+    """In-memory wiki state plus the fault-injection settings."""
+
+    def __init__(
+        self,
+        corpus: Dict[str, str],
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        maxlag_rate: float = 0.0,
+        edit_rate_limit: int = 0,
+        seed: int = 0,
+    ):
+        """
+        Args:
+            corpus: Dictionary mapping page titles to page text
+            latency: Seconds added to every request
+            jitter: Maximum random seconds added on top of latency
+            error_rate: Probability of an HTTP 503 response
+            maxlag_rate: Probability of a maxlag error response
+            edit_rate_limit: Maximum edits per minute, 0 for unlimited
+            seed: Random seed for fault injection
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.maxlag_rate = maxlag_rate
+        self.edit_rate_limit = edit_rate_limit
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.pages = {}
+        self.revid = 0
+        self.changes = []
+        self.edit_times = []
+        # Title -> number of times its content was read
+        self.reads = Counter()
+        self.stats = {
+            "requests": 0,
+            "errors": 0,
+            "maxlag": 0,
+            "ratelimited": 0,
+            "pages_read": 0,
+            "bytes_sent": 0,
+            "edits": 0,
+        }
+        start = time.time() - 86400
+        for title, text in corpus.items():
+            self._store(_normalize(title), text, start)
+
+    def _store(self, title: str, text: str, when: float) -> int:
+        self.revid += 1
+        page = self.pages.get(title)
+        if page is None:
+            page = {"pageid": len(self.pages) + 1, "ns": _namespace_of(title)}
+            self.pages[title] = page
+        page.update({"text": text, "revid": self.revid, "timestamp": when})
+        self.changes.append((when, title, self.revid))
+        return self.revid
+
+    def inject_fault(self, action: str) -> Optional[Dict]:
+        """Sleep for the configured latency and return an injected fault, if any."""
+        delay = self.latency + (self.rng.random() * self.jitter if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        with self.lock:
+            self.stats["requests"] += 1
+            roll = self.rng.random()
+            if roll < self.error_rate:
+                self.stats["errors"] += 1
+                return {"status": 503}
+            if roll < self.error_rate + self.maxlag_rate:
+                self.stats["maxlag"] += 1
+                return {
+                    "error": {
+                        "code": "maxlag",
+                        "info": "Waiting for fake-db: 5 seconds lagged.",
+                        "host": "fake-db",
+                        "lag": 5,
+                    }
+                }
+            if action == "edit" and self.edit_rate_limit:
+                now = time.time()
+                self.edit_times = [t for t in self.edit_times if now - t < 60]
+                if len(self.edit_times) >= self.edit_rate_limit:
+                    self.stats["ratelimited"] += 1
+                    return {
+                        "error": {
+                            "code": "ratelimited",
+                            "info": "You've exceeded your rate limit. Please wait some time and try again.",
+                        }
+                    }
+                self.edit_times.append(now)
+        return None
+
+    # ------------------------------------------------------------------
+    # API modules
+    # ------------------------------------------------------------------
+
+    def siteinfo(self, server: str) -> Dict:
+        general = {
+            "mainpage": "PZwiki",
+            "base": f"{server}/wiki/PZwiki",
+            "sitename": "PZwiki",
+            "generator": "MediaWiki 1.39.3",
+            "phpversion": "8.1.0",
+            "case": "first-letter",
+            "lang": "en",
+            "dir": "ltr",
+            "rights": "",
+            "server": server,
+            "servername": urlparse(server).hostname,
+            "articlepath": "/wiki/$1",
+            "scriptpath": "/w",
+            "script": "/w/index.php",
+            "variantarticlepath": False,
+            "wikiid": "fakewiki",
+            "time": _timestamp(time.time()),
+            "timezone": "UTC",
+            "timeoffset": 0,
+            "maxarticlesize": 2097152,
+            "legaltitlechars": " %!\"$&'()*,\\-.\\/0-9:;=?@A-Z\\\\^_`a-z~\\x80-\\xFF+",
+            "invalidusernamechars": "@:>=",
+            "readonly": False,
+            "misermode": False,
+            "writeapi": True,
+            "maxuploadsize": 0,
+            "minuploadchunksize": 1024,
+            "categorycollation": "uppercase",
+            "linkprefixcharset": "",
+            "linktrail": "/^([a-z]+)(.*)$/sD",
+            "uploadsenabled": False,
+            "externalimages": [],
+            "thumblimits": {"0": 120, "1": 150, "2": 180, "3": 200, "4": 250, "5": 300},
+            "imagelimits": {"0": {"width": 320, "height": 240}, "1": {"width": 640, "height": 480}},
+            "magiclinks": {"ISBN": False, "PMID": False, "RFC": False},
+        }
+        namespaces = {}
+        for ns, name in NAMESPACES.items():
+            entry = {"id": ns, "case": "first-letter", "name": name, "*": name}
+            if ns >= 0:
+                entry["subpages"] = ""
+            if ns == 0:
+                entry["content"] = ""
+            if ns == 828:
+                entry["defaultcontentmodel"] = "Scribunto"
+            if ns != 0:
+                entry["canonical"] = name
+            namespaces[str(ns)] = entry
+        return {
+            "general": general,
+            "namespaces": namespaces,
+            "namespacealiases": [],
+            "extensions": [
+                {"name": "Scribunto", "type": "parserhook", "version": "1.0"},
+            ],
+            "interwikimap": [],
+            "magicwords": [],
+            "restrictions": {
+                "types": ["create", "edit", "move", "upload"],
+                "levels": ["", "autoconfirmed", "sysop"],
+                "cascadinglevels": ["sysop"],
+                "semiprotectedlevels": ["autoconfirmed"],
+            },
+            "fileextensions": [{"ext": "png"}, {"ext": "jpg"}],
+        }
+
+    def userinfo(self, logged_in: bool) -> Dict:
+        if not logged_in:
+            return {"id": 0, "name": "127.0.0.1", "anon": "", "groups": ["*"], "rights": ["read", "edit"]}
+        return {
+            "id": 1,
+            "name": "Bot",
+            "groups": ["*", "user", "bot"],
+            "rights": ["read", "edit", "bot", "writeapi", "apihighlimits"],
+            "editcount": self.stats["edits"],
+            "messages": False,
+        }
+
+    def page_info(self, title: str, props: List[str], rvprops: List[str]) -> Dict:
+        page = self.pages.get(title)
+        ns = _namespace_of(title)
+        if page is None:
+            return {"ns": ns, "title": title, "missing": ""}
+
+        result = {"pageid": page["pageid"], "ns": page["ns"], "title": title}
+        if "info" in props:
+            result.update(
+                {
+                    "contentmodel": "Scribunto" if page["ns"] == 828 else "wikitext",
+                    "pagelanguage": "en",
+                    "touched": _timestamp(page["timestamp"]),
+                    "lastrevid": page["revid"],
+                    "length": len(page["text"].encode("utf-8")),
+                }
+            )
+        if "revisions" in props:
+            revision = {
+                "revid": page["revid"],
+                "parentid": 0,
+                "user": "Bot",
+                "timestamp": _timestamp(page["timestamp"]),
+                "comment": "",
+                "contentformat": "text/x-wiki",
+                "contentmodel": "wikitext",
+            }
+            if "content" in rvprops:
+                revision["slots"] = {
+                    "main": {
+                        "contentmodel": "wikitext",
+                        "contentformat": "text/x-wiki",
+                        "*": page["text"],
+                    }
+                }
+                revision["*"] = page["text"]
+                revision["slots"]["main"]["content"] = page["text"]
+                self.stats["pages_read"] += 1
+                self.reads[title] += 1
+            result["revisions"] = [revision]
+        if "templates" in props:
+            names = sorted(
+                {m.strip() for m in TEMPLATE_CALL.findall(page["text"]) if m.strip()}
+            )
+            result["templates"] = [
+                {"ns": 10, "title": "Template:" + _normalize(name)} for name in names
+            ]
+        return result
+
+    def query(self, params: Dict[str, str], server: str, logged_in: bool) -> Dict:
+        # Edits change the pages from other handler threads
+        with self.lock:
+            return self._query(params, server, logged_in)
+
+    def _query(self, params: Dict[str, str], server: str, logged_in: bool) -> Dict:
+        result = {"batchcomplete": ""}
+        query = {}
+
+        for meta in filter(None, params.get("meta", "").split("|")):
+            if meta == "siteinfo":
+                info = self.siteinfo(server)
+                props = params.get("siprop", "general").split("|")
+                unknown = [p for p in props if p not in info]
+                if unknown:
+                    return {
+                        "error": {
+                            "code": "siunknown_siprop",
+                            "info": f"Unrecognized value for parameter \"siprop\": {unknown[0]}.",
+                        }
+                    }
+                query.update({p: info[p] for p in props})
+            elif meta == "userinfo":
+                query["userinfo"] = self.userinfo(logged_in)
+            elif meta == "tokens":
+                types = params.get("type", "csrf").split("|")
+                query["tokens"] = {f"{t}token": "fake+\\" for t in types}
+
+        props = list(filter(None, params.get("prop", "").split("|")))
+        rvprops = params.get("rvprop", "").split("|")
+        titles = []
+        cont = None
+
+        generator = params.get("generator")
+        list_module = params.get("list")
+        if generator == "allpages" or list_module == "allpages":
+            prefix = "gap" if generator else "ap"
+            titles, cont = self.allpages(params, prefix)
+            if list_module == "allpages":
+                query["allpages"] = [
+                    {"pageid": self.pages[t]["pageid"], "ns": self.pages[t]["ns"], "title": t}
+                    for t in titles
+                ]
+                titles = []
+        elif generator == "embeddedin" or list_module == "embeddedin":
+            prefix = "gei" if generator else "ei"
+            titles = self.embeddedin(params, prefix)
+            if list_module == "embeddedin":
+                query["embeddedin"] = [
+                    {"pageid": self.pages[t]["pageid"], "ns": self.pages[t]["ns"], "title": t}
+                    for t in titles
+                ]
+                titles = []
+        elif list_module == "recentchanges":
+            query["recentchanges"] = self.recentchanges(params)
+
+        if "titles" in params:
+            requested = [t for t in params["titles"].split("|") if t]
+            titles = [_normalize(t) for t in requested]
+            normalized = [
+                {"from": t, "to": _normalize(t)} for t in requested if t != _normalize(t)
+            ]
+            if normalized:
+                query["normalized"] = normalized
+        elif "pageids" in params:
+            wanted = {int(p) for p in params["pageids"].split("|") if p}
+            titles = [t for t, p in self.pages.items() if p["pageid"] in wanted]
+
+        if titles:
+            pages = {}
+            missing = -1
+            for title in titles:
+                info = self.page_info(title, props, rvprops)
+                if "missing" in info:
+                    pages[str(missing)] = info
+                    missing -= 1
+                else:
+                    pages[str(info["pageid"])] = info
+            query["pages"] = list(pages.values()) if params.get("formatversion") == "2" else pages
+
+        if query:
+            result["query"] = query
+        if cont:
+            result["continue"] = cont
+        return result
+
+    def allpages(self, params: Dict[str, str], prefix: str):
+        namespace = int(params.get(f"{prefix}namespace", "0"))
+        start = _normalize(params.get(f"{prefix}continue", params.get(f"{prefix}from", "")))
+        title_prefix = _normalize(params.get(f"{prefix}prefix", ""))
+        limit = params.get(f"{prefix}limit", "500")
+        limit = 5000 if limit == "max" else int(limit)
+
+        titles = sorted(
+            t
+            for t, p in self.pages.items()
+            if p["ns"] == namespace
+            and t >= start
+            and t.startswith(title_prefix)
+        )
+        if len(titles) > limit:
+            return titles[:limit], {f"{prefix}continue": titles[limit], "continue": "-||"}
+        return titles, None
+
+    def embeddedin(self, params: Dict[str, str], prefix: str) -> List[str]:
+        template = params.get(f"{prefix}title", "")
+        name = template.split(":", 1)[-1].replace("_", " ")
+        marker = "{{" + name.lower()
+        return sorted(
+            t for t, p in self.pages.items() if marker in p["text"].lower()
+        )
+
+    def recentchanges(self, params: Dict[str, str]) -> List[Dict]:
+        start = params.get("rcstart") if params.get("rcdir") == "newer" else params.get("rcend")
+        namespaces = params.get("rcnamespace")
+        namespaces = {int(n) for n in namespaces.split("|")} if namespaces else None
+        changes = []
+        for when, title, revid in self.changes:
+            if start and _timestamp(when) < start:
+                continue
+            if namespaces is not None and _namespace_of(title) not in namespaces:
+                continue
+            changes.append(
+                {
+                    "type": "edit",
+                    "ns": _namespace_of(title),
+                    "title": title,
+                    "revid": revid,
+                    "timestamp": _timestamp(when),
+                }
+            )
+        if params.get("rcdir") != "newer":
+            changes.reverse()
+        return changes
+
+    def edit(self, params: Dict[str, str]) -> Dict:
+        title = _normalize(params.get("title", ""))
+        if "text" not in params:
+            return {"error": {"code": "missingparam", "info": "The text parameter must be set."}}
+        with self.lock:
+            old = self.pages.get(title)
+            if old is not None and old["text"] == params["text"]:
+                return {
+                    "edit": {
+                        "result": "Success",
+                        "pageid": old["pageid"],
+                        "title": title,
+                        "nochange": "",
+                        "contentmodel": "wikitext",
+                    }
+                }
+            old_revid = old["revid"] if old else 0
+            new_revid = self._store(title, params["text"], time.time())
+            self.stats["edits"] += 1
+            page = self.pages[title]
+        return {
+            "edit": {
+                "result": "Success",
+                "pageid": page["pageid"],
+                "title": title,
+                "contentmodel": "wikitext",
+                "oldrevid": old_revid,
+                "newrevid": new_revid,
+                "newtimestamp": _timestamp(page["timestamp"]),
+            }
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    wiki: FakeWiki = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _params(self) -> Dict[str, str]:
+        parsed = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            body = self.rfile.read(length).decode("utf-8")
+            params.update({k: v[-1] for k, v in parse_qs(body, keep_blank_values=True).items()})
+        return params
+
+    def _send(self, status: int, payload: Dict, headers: Dict[str, str] = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Set-Cookie", "fakewiki_session=1; Path=/")
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+        with self.wiki.lock:
+            self.wiki.stats["bytes_sent"] += len(body)
+
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+    def _handle(self):
+        if not urlparse(self.path).path.endswith("api.php"):
+            self._send(404, {"error": {"code": "notfound", "info": self.path}})
+            return
+
+        params = self._params()
+        action = params.get("action", "query")
+        fault = self.wiki.inject_fault(action)
+        if fault and "status" in fault:
+            self._send(fault["status"], {"error": {"code": "internal_api_error_fake", "info": "Injected"}})
+            return
+        if fault:
+            self._send(200, fault, {"Retry-After": "5", "X-Database-Lag": "5"})
+            return
+
+        server = f"http://{self.headers.get('Host', 'localhost')}"
+        logged_in = "fakewiki_session" in (self.headers.get("Cookie") or "")
+
+        if action == "query":
+            payload = self.wiki.query(params, server, logged_in)
+        elif action == "login":
+            payload = {"login": {"result": "Success", "lguserid": 1, "lgusername": params.get("lgname", "Bot")}}
+        elif action == "clientlogin":
+            payload = {"clientlogin": {"status": "PASS", "username": params.get("username", "Bot")}}
+        elif action == "logout":
+            payload = {}
+        elif action == "edit":
+            payload = self.wiki.edit(params)
+        elif action == "paraminfo":
+            modules = params.get("modules", "").split("|")
+            payload = {"paraminfo": {"modules": [_paraminfo_module(m) for m in modules if m]}}
+        elif action == "fakestats":
+            with self.wiki.lock:
+                payload = {"fakestats": dict(self.wiki.stats)}
+        else:
+            payload = {"error": {"code": "badvalue", "info": f"Unrecognized value for parameter \"action\": {action}."}}
+
+        self._send(200, payload)
+
+
+class FakeWikiServer:
+    """Run a FakeWiki over HTTP on localhost in a background thread."""
+
+    def __init__(self, wiki: FakeWiki, host: str = "127.0.0.1", port: int = 0):
+        handler = type("FakeWikiHandler", (_Handler,), {"wiki": wiki})
+        self.wiki = wiki
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def api_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/w/api.php"
+
+    def start(self) -> "FakeWikiServer":
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local fake MediaWiki API for the updater")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--pages", type=int, default=1000, help="Number of synthetic pages")
+    parser.add_argument("--parser-output", help="Seed item/tile/fluid pages from this parser output")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of HTTP 503")
+    parser.add_argument("--maxlag-rate", type=float, default=0.0, help="Probability of maxlag errors")
+    parser.add_argument("--edit-rate-limit", type=int, default=0, help="Edits allowed per minute")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    wiki = FakeWiki(
+        synthetic_corpus(args.pages, args.parser_output, args.seed),
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        maxlag_rate=args.maxlag_rate,
+        edit_rate_limit=args.edit_rate_limit,
+        seed=args.seed,
+    )
+    server = FakeWikiServer(wiki, args.host, args.port)
+    print(f"Serving {len(wiki.pages)} pages at {server.api_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(json.dumps(wiki.stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+
+"""
+Throughput regression check against the fake wiki.
+
+Serves a synthetic corpus seeded from the parser output with fake_wiki.py,
+runs the updater against it twice in a subprocess and checks the edit and
+read counts the fake wiki recorded:
+
+    first run    every page seeded with a stale weight is edited, and no
+                 page is read again except by the save of its edit
+    second run   nothing is left to edit
+
+Read and edit counts can also be pinned exactly, and the pages per second
+of the first run compared with a saved baseline.
+
+Run from the directory holding updater.py with:
+    python -m updater_modules.fake_wiki_bench --parser-output /path/to/output --pages 2000
+    python -m updater_modules.fake_wiki_bench --parser-output /path/to/output --baseline bench.json --save-baseline
+
+Arguments not known to the benchmark are passed on to the updater, e.g.
+--fetch-backend async or --disable loot.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from .fake_wiki import STALE_WEIGHT_VALUE, FakeWiki, FakeWikiServer, synthetic_corpus
+
+# Directory holding the scripts package, where the updater is imported from
+PYWIKIBOT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+USER_CONFIG = """family_files['fakewiki'] = {api_url!r}
+family = 'fakewiki'
+mylang = 'fakewiki'
+usernames['fakewiki']['fakewiki'] = 'Bot'
+put_throttle = 0
+"""
+
+
+def run_updater(wiki: FakeWiki, work_dir: str, config_dir: str, updater_args: List[str]) -> Dict:
+    """
+    Run the updater once and collect what the fake wiki saw.
+
+    Args:
+        wiki: The served wiki; its read counts are reset first
+        work_dir: Working directory of the updater, for its state files
+        config_dir: Pywikibot config directory pointing at the fake wiki
+        updater_args: Command line of the updater
+
+    Returns:
+        Seconds taken, edits, reads and pages read
+    """
+    with wiki.lock:
+        before = dict(wiki.stats)
+        wiki.reads.clear()
+    env = dict(os.environ, PYWIKIBOT_DIR=config_dir)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [PYWIKIBOT_ROOT, env.get("PYTHONPATH")]))
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-m", "scripts.userscripts.updater", *updater_args],
+        cwd=work_dir,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    seconds = time.perf_counter() - start
+    with wiki.lock:
+        after = dict(wiki.stats)
+        pages = len(wiki.reads)
+    if process.returncode:
+        print(process.stdout[-4000:])
+    return {
+        "returncode": process.returncode,
+        "seconds": seconds,
+        "edits": after["edits"] - before["edits"],
+        "reads": after["pages_read"] - before["pages_read"],
+        "pages": pages,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Throughput regression check against the fake wiki")
+    parser.add_argument("--parser-output", required=True, help="Parser output to seed pages from and update with")
+    parser.add_argument("--history", help="History files passed to the updater")
+    parser.add_argument("--pages", type=int, default=1000, help="Number of synthetic pages")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--expect-edits", type=int, help="Exact edits of the first run")
+    parser.add_argument("--expect-reads", type=int, help="Exact page reads of the first run")
+    parser.add_argument("--baseline", help="JSON file with the pages per second of an earlier run")
+    parser.add_argument("--save-baseline", action="store_true", help="Write this run's throughput to --baseline")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.7, help="Fraction of the baseline throughput still passing"
+    )
+    args, passed_on = parser.parse_known_args()
+
+    corpus = synthetic_corpus(args.pages, args.parser_output, args.seed)
+    stale_titles = {title for title, text in corpus.items() if f"|weight={STALE_WEIGHT_VALUE}\n" in text}
+    wiki = FakeWiki(corpus, latency=args.latency, seed=args.seed)
+
+    updater_args = ["--parser-output", os.path.abspath(args.parser_output), "--no-auto-tune"]
+    if args.history:
+        updater_args += ["--history", os.path.abspath(args.history)]
+    updater_args += passed_on
+
+    failures = []
+    with FakeWikiServer(wiki) as server, tempfile.TemporaryDirectory() as work_dir:
+        config_dir = os.path.join(work_dir, "pywikibot")
+        os.makedirs(config_dir)
+        with open(os.path.join(config_dir, "user-config.py"), "w", encoding="utf-8") as f:
+            f.write(USER_CONFIG.format(api_url=server.api_url))
+        print(f"Serving {len(wiki.pages)} pages ({len(stale_titles)} stale) at {server.api_url}")
+
+        runs = []
+        for _ in range(2):
+            runs.append(run_updater(wiki, work_dir, config_dir, updater_args))
+            if runs[-1]["returncode"]:
+                break
+
+    print(f"\n{'Run':<8}{'Seconds':>10}{'Reads':>8}{'Pages':>8}{'Edits':>8}{'Pages/s':>10}")
+    for number, run in enumerate(runs, 1):
+        rate = run["pages"] / run["seconds"] if run["seconds"] else 0.0
+        print(f"{number:<8}{run['seconds']:>10.2f}{run['reads']:>8}{run['pages']:>8}{run['edits']:>8}{rate:>10.1f}")
+
+    first = runs[0]
+    if any(run["returncode"] for run in runs):
+        failures.append(f"updater exited with {[run['returncode'] for run in runs]}")
+    else:
+        second = runs[1]
+        # Saving reads the page once more for its base revision
+        if first["reads"] > first["pages"] + first["edits"]:
+            failures.append(f"{first['reads']} reads of {first['pages']} pages with {first['edits']} edits")
+        if second["reads"] != second["pages"]:
+            failures.append(f"second run read {second['reads'] - second['pages']} pages more than once")
+        if first["edits"] < len(stale_titles):
+            failures.append(f"{first['edits']} edits for {len(stale_titles)} stale pages")
+        if second["edits"]:
+            failures.append(f"second run made {second['edits']} edits")
+        if args.expect_edits is not None and first["edits"] != args.expect_edits:
+            failures.append(f"{first['edits']} edits, expected {args.expect_edits}")
+        if args.expect_reads is not None and first["reads"] != args.expect_reads:
+            failures.append(f"{first['reads']} reads, expected {args.expect_reads}")
+
+    rate = first["pages"] / first["seconds"] if first["seconds"] else 0.0
+    if args.baseline and not failures:
+        if args.save_baseline:
+            with open(args.baseline, "w", encoding="utf-8") as f:
+                json.dump({"pages": first["pages"], "pages_per_second": rate}, f, indent=2)
+            print(f"Baseline written to {args.baseline}")
+        else:
+            try:
+                with open(args.baseline, "r", encoding="utf-8") as f:
+                    baseline = json.load(f)["pages_per_second"]
+            except (OSError, ValueError, KeyError) as e:
+                failures.append(f"could not read baseline {args.baseline}: {e}")
+            else:
+                print(f"Baseline {baseline:.1f} pages/s, this run {rate / baseline:.0%} of it")
+                if rate < baseline * args.tolerance:
+                    failures.append(f"{rate:.1f} pages/s is below {args.tolerance:.0%} of {baseline:.1f}")
+
+    if failures:
+        print("\n" + "\n".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
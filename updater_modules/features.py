@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+# Literal markers per processor. A processor can only change a page that
+# contains one of its markers, so orchestrators skip it otherwise. Processors
+# whose pattern starts with the marker also start searching at its offset.
+# Processors matched case-insensitively or with flexible whitespace (the
+# infoboxes of items, tiles and vehicles) have no marker and always run.
+MARKERS: Dict[str, Tuple[str, ...]] = {
+    "body_parts": ("{{Body part",),
+    "consumables": ("{{Consumables",),
+    "fixing": ("{{Fixing",),
+    "condition": ("{{Durability weapon",),
+    "teached_recipes": ("Bot flag|TeachedRecipes",),
+    "contents": ('{| class="wikitable theme-red sortable mw-collapsible',),
+    "crafting": ("{{EvolvedRecipesForItem", "{{Crafting/sandbox", "{{Building/sandbox"),
+    "history": ("{{HistoryTable|",),
+    "code": ("{{CodeSnip",),
+    "navbox": ("Bot flag|Navbox",),
+    "tile_crafting": ("===Breakage===", "===Dismantling==="),
+    "tile_code": ("==Code==",),
+    "fluid_infobox": ("{{Infobox fluid",),
+    "tag_article": (
+        "{{Page version|",
+        '{| class="wikitable theme-blue sortable" style="text-align: center;"',
+    ),
+}
+
+FEATURE_BITS = {name: 1 << index for index, name in enumerate(MARKERS)}
+
+# Features each orchestrator asks about, so categorization only scans those
+CATEGORY_FEATURES: Dict[str, Tuple[str, ...]] = {
+    "item": (
+        "body_parts", "consumables", "fixing", "condition", "teached_recipes",
+        "contents", "crafting", "history", "code", "navbox",
+    ),
+    "tile": ("tile_crafting", "tile_code", "navbox"),
+    "fluid": ("fluid_infobox", "navbox"),
+    "tag": ("tag_article",),
+}
+
+
+class PageFeatures:
+    """
+    Processor markers found in one page text.
+
+    Features are scanned on first use unless the whole page was scanned up
+    front, as categorization does, so a changed page only pays for the
+    markers that are still asked about.
+
+    Args:
+        text: The page text
+        bits: Bitmap of FEATURE_BITS present in the text
+        offsets: Offset of the first marker per present feature
+        known: Bitmap of FEATURE_BITS already scanned
+    """
+
+    __slots__ = ("text", "bits", "offsets", "known")
+
+    def __init__(self, text: str, bits: int = 0, offsets: Dict[str, int] = None, known: int = 0):
+        self.text = text
+        self.bits = bits
+        self.offsets = offsets if offsets is not None else {}
+        self.known = known
+
+    def _scan(self, name: str) -> None:
+        found = [
+            index
+            for index in (self.text.find(marker) for marker in MARKERS[name])
+            if index != -1
+        ]
+        if found:
+            self.bits |= FEATURE_BITS[name]
+            self.offsets[name] = min(found)
+        self.known |= FEATURE_BITS[name]
+
+    def has(self, name: str) -> bool:
+        if not self.known & FEATURE_BITS[name]:
+            self._scan(name)
+        return bool(self.bits & FEATURE_BITS[name])
+
+    def offset(self, name: str) -> int:
+        """Offset of the first marker of a feature, 0 if it is absent."""
+        if not self.known & FEATURE_BITS[name]:
+            self._scan(name)
+        return self.offsets.get(name, 0)
+
+
+def scan_features(text: str, categories: Iterable[str] = None) -> PageFeatures:
+    """
+    Find the first occurrence of processor markers in a page.
+
+    Args:
+        text: The page text
+        categories: Only scan the features of these categories, all if None
+
+    Returns:
+        The page features; features not scanned are looked up on first use
+    """
+    if categories is None:
+        names = MARKERS
+    else:
+        names = {name for category in categories for name in CATEGORY_FEATURES.get(category, ())}
+    features = PageFeatures(text)
+    for name in names:
+        features._scan(name)
+    return features
+
+
+def features_for(text: str, features: Optional[PageFeatures] = None) -> PageFeatures:
+    """
+    Return features matching text, reusing the given ones when they were scanned from it.
+
+    Orchestrators call this again after a processor changed the page, so
+    later processors never act on offsets of an older text.
+    """
+    if features is not None and (features.text is text or features.text == text):
+        return features
+    return PageFeatures(text)
+
+
+class FeatureIndex:
+    """Features of every categorized page, by title, kept for the orchestrators."""
+
+    def __init__(self):
+        self._features: Dict[str, PageFeatures] = {}
+        self._lock = threading.Lock()
+
+    def record(self, title: str, features: PageFeatures) -> None:
+        with self._lock:
+            self._features[title] = features
+
+    def get(self, title: str) -> Optional[PageFeatures]:
+        return self._features.get(title)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._features.clear()
+
+
+# Features recorded during categorization, shared by the whole run
+page_features = FeatureIndex()
@@ -1,17 +1,17 @@
-import re
 import os
+from ..item.file_utils import read_parser_file
+from ..patterns import FLUID_ID, FLUID_INFOBOX
 
-def update_fluid_infobox(text, parser_output_path, history_path, language_code):
-    """Update the fluid infobox with content from the parser output file."""
+def update_fluid_infobox(text, parser_output_path, history_path, language_code, start=0):
+    """Update the fluid infobox with content from the parser output file, searching from start."""
     
     # Find the infobox
-    infobox_pattern = r'\{\{Infobox fluid.*?\n\}\}'
-    infobox_match = re.search(infobox_pattern, text, re.DOTALL)
+    infobox_match = FLUID_INFOBOX.search(text, start)
     if not infobox_match:
         return text, [], False
     
     # Find the fluid_id
-    fluid_id_match = re.search(r'\|fluid_id=(.*?)$', infobox_match.group(0), re.MULTILINE)
+    fluid_id_match = FLUID_ID.search(infobox_match.group(0))
     if not fluid_id_match:
         return text, [], False
     
@@ -24,8 +24,7 @@ def update_fluid_infobox(text, parser_output_path, history_path, language_code):
     
     # Read the new infobox content
     try:
-        with open(infobox_path, 'r', encoding='utf-8') as f:
-            new_infobox = f.read().strip()
+        new_infobox = read_parser_file(infobox_path).strip()
     except FileNotFoundError:
         return text, [], False
     
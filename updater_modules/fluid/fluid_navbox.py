@@ -1,4 +1,7 @@
+from ..navbox_index import render_navboxes
+
+
 def update_fluid_navbox(text, parser_output_path, history_path, language_code):
-    """Update the fluid navbox with content from the parser output file."""
-    # TODO: Implement navbox updating logic
-    return text, [], False 
\ No newline at end of file
+    """Render the navboxes between navbox bot flags from the navbox index."""
+    text, edited = render_navboxes(text, "fluid", language_code)
+    return text, ["Navbox"] if edited else [], edited
@@ -1,26 +1,50 @@
+import os
 from scripts.userscripts.updater_modules.fluid.fluid_infobox import update_fluid_infobox # type: ignore
 from scripts.userscripts.updater_modules.fluid.fluid_navbox import update_fluid_navbox # type: ignore
+from scripts.userscripts.updater_modules.watchdog import mark_processor # type: ignore
+from scripts.userscripts.updater_modules.features import features_for # type: ignore
+from scripts.userscripts.updater_modules.patterns import FLUID_ID, FLUID_INFOBOX # type: ignore
 
-def orchestrate_fluid(text, parser_output_path, history_path, language_code):
-    """Orchestrate the updating of fluid pages."""
+def prefetch_fluid_paths(text, parser_output_path, history_path, language_code):
+    """Parser files the fluid processors are likely to read for a page, for the prefetcher."""
+    paths = []
+    for infobox in FLUID_INFOBOX.finditer(text):
+        fluid_id_match = FLUID_ID.search(infobox.group(0))
+        if fluid_id_match:
+            fluid_id = fluid_id_match.group(1).strip()
+            if fluid_id.startswith('Base.'):
+                fluid_id = fluid_id[5:]
+            paths.append(os.path.join(parser_output_path, language_code, 'fluid_infoboxes', f'{fluid_id}.txt'))
+    return paths
+
+def orchestrate_fluid(text, parser_output_path, history_path, language_code, features=None):
+    """Orchestrate the updating of fluid pages, skipping processors whose markers are absent."""
     processes = []
     original_text = text
     
     # Update infobox
-    try:
-        text, infobox_processes, infobox_edited = update_fluid_infobox(text, parser_output_path, history_path, language_code)
-        if infobox_edited:
-            processes.extend(infobox_processes)
-    except (FileNotFoundError, OSError):
-        pass
+    features = features_for(text, features)
+    if features.has("fluid_infobox"):
+        mark_processor("fluid.update_fluid_infobox")
+        try:
+            text, infobox_processes, infobox_edited = update_fluid_infobox(
+                text, parser_output_path, history_path, language_code, features.offset("fluid_infobox")
+            )
+            if infobox_edited:
+                processes.extend(infobox_processes)
+        except (FileNotFoundError, OSError):
+            pass
     
     # Update navbox
-    try:
-        text, navbox_processes, navbox_edited = update_fluid_navbox(text, parser_output_path, history_path, language_code)
-        if navbox_edited:
-            processes.extend(navbox_processes)
-    except (FileNotFoundError, OSError):
-        pass
+    features = features_for(text, features)
+    if features.has("navbox"):
+        mark_processor("fluid.update_fluid_navbox")
+        try:
+            text, navbox_processes, navbox_edited = update_fluid_navbox(text, parser_output_path, history_path, language_code)
+            if navbox_edited:
+                processes.extend(navbox_processes)
+        except (FileNotFoundError, OSError):
+            pass
     
     # Check if any changes were made
     was_edited = text != original_text
@@ -0,0 +1,192 @@
+from typing import Iterator, List, Optional, Tuple
+
+from ..patterns import NON_BRACE, WHITESPACE
+
+# Block finders with a linear worst case, replacing the regular expressions the
+# processors used to locate their templates. Each finder returns exactly the
+# spans the old pattern matched (noted above each one), but scans every
+# character a bounded number of times, so malformed pages (an unclosed
+# template, thousands of stray braces) cannot make a processor backtrack.
+# The character class scans below cannot backtrack and run in linear time.
+
+HISTORY_OPENER = "{{HistoryTable|"
+
+
+def find_line_block(text: str, opener: str, pos: int = 0) -> Optional[Tuple[int, int]]:
+    """
+    Find a template whose closing braces start a line.
+
+    Same span as ``re.search(r"(\\{\\{Name.*?\\n)(.*?\\n)*?\\}\\}", text, re.DOTALL)``
+    for opener "{{Name": the block runs from the opener to the first "\\n}}"
+    after it.
+
+    Args:
+        text: Text to search
+        opener: Literal start of the template, e.g. "{{Fixing"
+        pos: Index to start searching from
+
+    Returns:
+        (start, end) of the block, or None if there is none
+    """
+    start = text.find(opener, pos)
+    if start == -1:
+        return None
+    close = text.find("\n}}", start + len(opener))
+    if close == -1:
+        # No later opener can be closed either
+        return None
+    return start, close + 3
+
+
+def iter_line_blocks(text: str, opener: str, pos: int = 0) -> Iterator[Tuple[int, int]]:
+    """Yield the non-overlapping (start, end) spans find_line_block finds from pos, in order."""
+    while True:
+        span = find_line_block(text, opener, pos)
+        if span is None:
+            return
+        yield span
+        pos = span[1]
+
+
+def _nested_end(text: str, pos: int) -> int:
+    """
+    End of a template body starting at pos, or -1.
+
+    The body is any run of characters other than braces and of "{{...}}"
+    groups without braces inside, and must be followed by "}}".
+    """
+    while True:
+        pos = NON_BRACE.match(text, pos).end()
+        if not text.startswith("{{", pos):
+            break
+        inner = NON_BRACE.match(text, pos + 2).end()
+        if not text.startswith("}}", inner):
+            break
+        pos = inner + 2
+    if text.startswith("}}", pos):
+        return pos + 2
+    return -1
+
+
+def find_nested_block(
+    text: str, openers: List[str], pos: int = 0
+) -> Optional[Tuple[int, int]]:
+    """
+    Find a template that may contain one level of nested templates.
+
+    Same span as ``re.search(r"\\{\\{(?:A|B)(?:[^{}]|(?:\\{\\{[^{}]*\\}\\}))*\\}\\}",
+    text, re.DOTALL)`` for openers ["{{A", "{{B"].
+
+    Args:
+        text: Text to search
+        openers: Literal starts of the template, e.g. ["{{EvolvedRecipesForItem"]
+        pos: Index to start searching from
+
+    Returns:
+        (start, end) of the block, or None if there is none
+    """
+    for start, end in iter_nested_blocks(text, openers, pos):
+        return start, end
+    return None
+
+
+def iter_nested_blocks(
+    text: str, openers: List[str], pos: int = 0
+) -> Iterator[Tuple[int, int]]:
+    """Yield the non-overlapping (start, end) spans find_nested_block finds, in order."""
+    # Next occurrence of each opener, kept so every opener is searched for once per position
+    found = {opener: text.find(opener, pos) for opener in openers}
+    while True:
+        candidates = [(index, opener) for opener, index in found.items() if index != -1]
+        if not candidates:
+            return
+        start, opener = min(candidates)
+        end = _nested_end(text, start + len(opener))
+        if end != -1:
+            yield start, end
+            pos = end
+        else:
+            pos = start + 1
+        for name, index in found.items():
+            if index != -1 and index < pos:
+                found[name] = text.find(name, pos)
+
+
+def _is_line_start(text: str, index: int) -> bool:
+    return index == 0 or text[index - 1] == "\n"
+
+
+def _whitespace_start(text: str, index: int, floor: int) -> int:
+    """Start of the whitespace run ending at index, not before floor."""
+    while index > floor and text[index - 1].isspace():
+        index -= 1
+    return index
+
+
+def _history_close(text: str, pos: int) -> Optional[Tuple[int, int]]:
+    """
+    Find the first line of only "}}" (with surrounding whitespace) at or after pos.
+
+    Returns:
+        (start of the closing line, end of the match), or None if there is none
+    """
+    while True:
+        braces = text.find("}}", pos)
+        if braces == -1:
+            return None
+        pos = braces + 1
+
+        # Whitespace before the braces has to include a line break
+        run_start = _whitespace_start(text, braces, 0)
+        newline = text.find("\n", run_start, braces)
+        if newline == -1 and not _is_line_start(text, run_start):
+            continue
+        line_start = run_start if _is_line_start(text, run_start) else newline + 1
+
+        # Whitespace after the braces has to reach a line end
+        run_end = WHITESPACE.match(text, braces + 2).end()
+        if run_end == len(text):
+            return line_start, run_end
+        newline = text.rfind("\n", braces + 2, run_end)
+        if newline != -1:
+            return line_start, newline
+
+
+def iter_history_tables(text: str) -> Iterator[Tuple[int, int, int, int]]:
+    """
+    Yield the history table blocks in text.
+
+    Same spans as ``re.finditer(r"(?m)^\\s*{{HistoryTable\\|(.*?)^\\s*}}\\s*$",
+    text, re.MULTILINE | re.DOTALL)``: a block starts on a line beginning with
+    "{{HistoryTable|" and runs to the next line holding only "}}".
+
+    Yields:
+        (start, end, content_start, content_end), the content being group 1
+    """
+    pos = 0
+    close = None
+    while True:
+        opener = text.find(HISTORY_OPENER, pos)
+        if opener == -1:
+            return
+
+        # The block starts at the first line start in the whitespace before the opener
+        run_start = _whitespace_start(text, opener, pos)
+        if _is_line_start(text, run_start):
+            start = run_start
+        else:
+            newline = text.find("\n", run_start, opener)
+            if newline == -1:
+                pos = opener + 1
+                continue
+            start = newline + 1
+
+        content_start = opener + len(HISTORY_OPENER)
+        if close is None or close[0] < content_start:
+            close = _history_close(text, content_start)
+            if close is None:
+                # No later opener can be closed either
+                return
+        content_end, end = close
+        yield start, end, content_start, content_end
+        pos = end
@@ -1,4 +1,401 @@
+import contextlib
 import os
+import threading
+
+from ..parser_pack import parse_infobox_lines
+
+# --------------------------------------------------------------------------
+# Shared parser-output index and content cache
+# --------------------------------------------------------------------------
+# The index holds every file path found under the indexed roots, so existence
+# checks become a set lookup instead of a filesystem probe. The content cache
+# holds decoded file contents (or None for files known to be missing) and is
+# shared by every orchestrator and every language partition of a run.
+_parser_index = set()
+_indexed_roots = []
+_content_cache = {}
+_cache_lock = threading.Lock()
+
+# Per-thread set of paths probed or read while processing a page, used to map
+# changed parser files back to the pages that consume them
+_recorder = threading.local()
+
+# Content cache lookups of the run, reported by the run metrics
+_cache_stats = {"hits": 0, "misses": 0}
+
+# Mounted parser packs as (directory prefix, pack, root name): files below the
+# prefix are read from the pack instead of the filesystem. Paths that changed
+# on disk since mounting are read from the filesystem again.
+_pack_mounts = []
+_unpacked_paths = set()
+_unpacked_prefixes = []
+
+# Parsed infobox files, shared like the content cache
+_infobox_cache = {}
+
+# Cache server shared by the updater processes of the host (a CacheClient):
+# the index of the roots it serves and the files not cached yet are asked
+# from it before the filesystem
+_cache_server = None
+
+
+def mount_pack(pack, roots):
+    """
+    Serve the files below some directories from a parser pack.
+
+    Args:
+        pack (ParserPack): The opened pack
+        roots (dict): Directory -> root name in the pack, e.g.
+            {parser_output_path: "parser", history_path: "history"}
+    """
+    with _cache_lock:
+        for directory, root_name in roots.items():
+            if not directory:
+                continue
+            prefix = os.path.join(directory, "")
+            _pack_mounts[:] = [m for m in _pack_mounts if m[0] != prefix]
+            _pack_mounts.append((prefix, pack, root_name))
+            # Longest prefix first, so nested mounts take precedence
+            _pack_mounts.sort(key=lambda m: len(m[0]), reverse=True)
+
+
+def unmount_packs():
+    """Stop reading from parser packs and close them."""
+    with _cache_lock:
+        packs = {id(pack): pack for _, pack, _ in _pack_mounts}
+        _pack_mounts.clear()
+        _unpacked_paths.clear()
+        _unpacked_prefixes.clear()
+        _content_cache.clear()
+        _infobox_cache.clear()
+    for pack in packs.values():
+        pack.close()
+
+
+def connect_cache_server(client):
+    """
+    Take the index and file contents from a cache server.
+
+    Args:
+        client (CacheClient): Connection to a running cache server
+    """
+    global _cache_server
+    _cache_server = client
+
+
+def disconnect_cache_server():
+    """Stop asking the cache server and close the connection."""
+    global _cache_server
+    client, _cache_server = _cache_server, None
+    if client is not None:
+        client.close()
+
+
+def _pack_location(path):
+    """
+    Find the pack serving a path.
+
+    Returns:
+        tuple: (pack, key) or None if the path is read from the filesystem
+    """
+    if not _pack_mounts or path in _unpacked_paths:
+        return None
+    for prefix in _unpacked_prefixes:
+        if path.startswith(prefix):
+            return None
+    for prefix, pack, root_name in _pack_mounts:
+        if path.startswith(prefix) or path == prefix[:-1]:
+            relative = path[len(prefix):].rstrip(os.sep).replace(os.sep, "/")
+            return pack, f"{root_name}/{relative}" if relative else root_name
+    return None
+
+
+def is_directory(path):
+    """Check whether a parser output directory exists, in a pack or on disk."""
+    located = _pack_location(path)
+    if located is not None:
+        return located[0].has_directory(located[1])
+    return os.path.isdir(path)
+
+
+def list_directory(path):
+    """
+    List a parser output directory, in a pack or on disk.
+
+    Raises:
+        OSError: If the directory cannot be listed
+    """
+    located = _pack_location(path)
+    if located is not None:
+        return located[0].list_directory(located[1])
+    return os.listdir(path)
+
+
+def build_parser_index(*roots):
+    """
+    Walk the given roots once and index every file path found below them.
+
+    Args:
+        *roots (str): Directories to index, e.g. parser_output_path and history_path
+
+    Returns:
+        int: Number of indexed files
+    """
+    found = set()
+    for root in roots:
+        if not root or not is_directory(root):
+            continue
+        located = _pack_location(root)
+        if located is not None:
+            pack, key = located
+            prefix = os.path.join(root, "")
+            for file_key in pack.keys(key):
+                relative = file_key[len(key) + 1:]
+                found.add(prefix + relative.replace("/", os.sep))
+            continue
+        served = _cache_server.index(root) if _cache_server is not None else None
+        if served is not None:
+            found.update(os.path.join(root, relative) for relative in served)
+            continue
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                found.add(os.path.join(dirpath, filename))
+
+    with _cache_lock:
+        _parser_index.update(found)
+        for root in roots:
+            if root and is_directory(root):
+                prefix = os.path.join(root, "")
+                if prefix not in _indexed_roots:
+                    _indexed_roots.append(prefix)
+
+    return len(found)
+
+
+def parser_index_state():
+    """
+    The parser index, to hand to another process instead of walking the
+    trees there again.
+
+    Returns:
+        dict: Indexed paths and roots, and the paths read from disk despite a
+            mounted pack; picklable
+    """
+    with _cache_lock:
+        return {
+            "index": list(_parser_index),
+            "roots": list(_indexed_roots),
+            "unpacked_paths": list(_unpacked_paths),
+            "unpacked_prefixes": list(_unpacked_prefixes),
+        }
+
+
+def load_parser_index_state(state):
+    """
+    Replace the parser index with one taken by parser_index_state.
+
+    Args:
+        state (dict): The state returned by parser_index_state
+    """
+    with _cache_lock:
+        _parser_index.clear()
+        _parser_index.update(state["index"])
+        _indexed_roots[:] = state["roots"]
+        _unpacked_paths.clear()
+        _unpacked_paths.update(state["unpacked_paths"])
+        _unpacked_prefixes[:] = state["unpacked_prefixes"]
+
+
+def clear_parser_cache():
+    """Drop the parser-output index and every cached file content."""
+    with _cache_lock:
+        _parser_index.clear()
+        _indexed_roots.clear()
+        _content_cache.clear()
+        _infobox_cache.clear()
+
+
+def invalidate_paths(paths):
+    """
+    Refresh the index and drop cached contents for paths that changed on disk.
+
+    Changed paths below a mounted pack are read from the filesystem from
+    then on.
+
+    Args:
+        paths (Iterable[str]): Changed file paths; a path ending in a separator
+            invalidates everything below that directory
+    """
+    paths = list(paths)
+    with _cache_lock:
+        for path in paths:
+            if path.endswith(os.sep):
+                if _pack_mounts and path not in _unpacked_prefixes:
+                    _unpacked_prefixes.append(path)
+                stale = [p for p in _content_cache if p.startswith(path)]
+                for p in stale:
+                    del _content_cache[p]
+                    _infobox_cache.pop(p, None)
+                _parser_index.difference_update(
+                    [p for p in _parser_index if p.startswith(path)]
+                )
+                for dirpath, _, filenames in os.walk(path):
+                    for filename in filenames:
+                        _parser_index.add(os.path.join(dirpath, filename))
+                continue
+
+            if _pack_mounts:
+                _unpacked_paths.add(path)
+            _content_cache.pop(path, None)
+            _infobox_cache.pop(path, None)
+            if os.path.isfile(path):
+                _parser_index.add(path)
+            else:
+                _parser_index.discard(path)
+
+    # Other processes sharing the cache server read the changed files again too
+    if _cache_server is not None:
+        _cache_server.invalidate(paths)
+
+
+@contextlib.contextmanager
+def recording_reads():
+    """
+    Record every parser path probed or read by the current thread.
+
+    Yields:
+        set: The recorded paths, filled in as the block runs
+    """
+    previous = getattr(_recorder, "paths", None)
+    _recorder.paths = set()
+    try:
+        yield _recorder.paths
+    finally:
+        _recorder.paths = previous
+
+
+def path_exists(file_path):
+    """
+    Check whether a parser file exists, using the index when the path is
+    below an indexed root.
+    """
+    paths = getattr(_recorder, "paths", None)
+    if paths is not None:
+        paths.add(file_path)
+
+    for root in _indexed_roots:
+        if file_path.startswith(root):
+            return file_path in _parser_index
+    return os.path.exists(file_path)
+
+
+def file_mtime(file_path):
+    """
+    Modification time of a parser file on disk.
+
+    Returns:
+        float|None: Epoch seconds, or None if the file is missing or read
+            from a pack, which keeps no modification times
+    """
+    if _pack_location(file_path) is not None or not path_exists(file_path):
+        return None
+    try:
+        return os.stat(file_path).st_mtime
+    except OSError:
+        return None
+
+
+def read_parser_file(file_path, encoding="utf-8"):
+    """
+    Read a parser file through the shared content cache.
+
+    Args:
+        file_path (str): Path of the file to read
+        encoding (str): File encoding, defaults to 'utf-8'
+
+    Returns:
+        str: The file content
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+    """
+    paths = getattr(_recorder, "paths", None)
+    if paths is not None:
+        paths.add(file_path)
+
+    try:
+        content = _content_cache[file_path]
+        _cache_stats["hits"] += 1
+    except KeyError:
+        _cache_stats["misses"] += 1
+        located = _pack_location(file_path)
+        if located is not None:
+            content = located[0].read(located[1], encoding)
+        elif not path_exists(file_path):
+            content = None
+        else:
+            served = False
+            if _cache_server is not None and encoding == "utf-8":
+                served, content = _cache_server.read(file_path)
+            if not served:
+                try:
+                    with open(file_path, "r", encoding=encoding) as f:
+                        content = f.read()
+                except FileNotFoundError:
+                    content = None
+        _content_cache[file_path] = content
+
+    if content is None:
+        raise FileNotFoundError(file_path)
+    return content
+
+
+def read_infobox_file(file_path, encoding="utf-8"):
+    """
+    Read an infobox file as its key=value parameters, using the pre-parsed
+    copy of a mounted pack when it holds one.
+
+    Args:
+        file_path (str): Path of the file to read
+        encoding (str): File encoding, defaults to 'utf-8'
+
+    Returns:
+        dict|None: Parameters in file order, shared between callers so not to
+            be modified, or None if the file has no non-blank line
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+    """
+    paths = getattr(_recorder, "paths", None)
+    if paths is not None:
+        paths.add(file_path)
+
+    try:
+        return _infobox_cache[file_path]
+    except KeyError:
+        pass
+
+    located = _pack_location(file_path)
+    params = located[0].infobox(located[1]) if located is not None else None
+    if params is None:
+        params = parse_infobox_lines(read_parser_file(file_path, encoding))
+    _infobox_cache[file_path] = params
+    return params
+
+
+def cache_stats():
+    """
+    Content cache lookups since the last reset.
+
+    Returns:
+        tuple: (hits, misses)
+    """
+    return _cache_stats["hits"], _cache_stats["misses"]
+
+
+def reset_cache_stats():
+    """Reset the content cache lookup counters."""
+    _cache_stats["hits"] = _cache_stats["misses"] = 0
 
 
 def find_file_with_subfolders(base_file_path):
@@ -12,7 +409,7 @@ def find_file_with_subfolders(base_file_path):
         str: The first valid file path found, or the original path if none exist
     """
     # First, try the original path
-    if os.path.exists(base_file_path):
+    if path_exists(base_file_path):
         return base_file_path
 
     # Extract directory and filename
@@ -21,12 +418,12 @@ def find_file_with_subfolders(base_file_path):
 
     # Check for /id subfolder
     id_path = os.path.join(directory, "id", filename)
-    if os.path.exists(id_path):
+    if path_exists(id_path):
         return id_path
 
     # Check for /page subfolder
     page_path = os.path.join(directory, "page", filename)
-    if os.path.exists(page_path):
+    if path_exists(page_path):
         return page_path
 
     # Return original path if nothing found (for error handling by calling code)
@@ -47,7 +444,30 @@ def read_file_with_subfolders(base_file_path, encoding="utf-8"):
     found_path = find_file_with_subfolders(base_file_path)
 
     try:
-        with open(found_path, "r", encoding=encoding) as f:
-            return f.read(), found_path
+        return read_parser_file(found_path, encoding), found_path
     except FileNotFoundError:
         return None, None
+
+
+def read_infobox_with_subfolders(base_file_path, encoding="utf-8"):
+    """
+    Read an infobox file's parameters, checking the base path and potential
+    /id and /page subfolders.
+
+    Args:
+        base_file_path (str): The original file path to check
+        encoding (str): File encoding, defaults to 'utf-8'
+
+    Returns:
+        tuple: (params, found_path) or (None, None) if the file is not found
+            or has no non-blank line
+    """
+    found_path = find_file_with_subfolders(base_file_path)
+
+    try:
+        params = read_infobox_file(found_path, encoding)
+    except FileNotFoundError:
+        return None, None
+    if params is None:
+        return None, None
+    return params, found_path
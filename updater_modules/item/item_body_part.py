@@ -1,14 +1,13 @@
-import re
 import os
 from .file_utils import read_file_with_subfolders
+from ..patterns import ITEM_BODY_PART, ITEM_BODY_PART_ID
 
 
-def process_body_parts(text, parser_output_path, language_code):
+def process_body_parts(text, parser_output_path, language_code, start=0):
     """
-    Process body part templates in the text.
+    Process body part templates in the text, searching from start.
     """
-    pattern = re.compile(r"\{\{Body part.*?\}\}", re.DOTALL)
-    matches = list(re.finditer(pattern, text))
+    matches = list(ITEM_BODY_PART.finditer(text, start))
     if not matches:
         return text, False
 
@@ -17,7 +16,7 @@ def process_body_parts(text, parser_output_path, language_code):
 
     for match in matches:
         template = match.group(0)
-        id_match = re.search(r"\|id\s*=\s*([^\|\n]+)", template)
+        id_match = ITEM_BODY_PART_ID.search(template)
         if not id_match:
             continue
 
@@ -1,18 +1,16 @@
 import os
-import re
 from .file_utils import read_file_with_subfolders
+from ..patterns import ITEM_CODE_PARAM, ITEM_CODESNIP, ITEM_FILENAME_UNSAFE
 
 
 def process_code(text, parser_output_path):
     updated = False
     # match entire {{CodeSnip block
-    pattern = re.compile(r"(?m)^\s*{{CodeSnip[\s\S]*?^\}\}\s*$", re.MULTILINE)
-
-    for match in re.finditer(pattern, text):
+    for match in ITEM_CODESNIP.finditer(text):
         snippet = match.group(0)
 
         # find the |code= parameter value
-        m_code = re.search(r"\|\s*code\s*=\s*\n(.*?)\n", snippet, re.DOTALL)
+        m_code = ITEM_CODE_PARAM.search(snippet)
 
         raw_name = m_code.group(1).strip()
 
@@ -20,7 +18,7 @@ def process_code(text, parser_output_path):
         item_name = raw_name[5:] if raw_name.startswith("item ") else raw_name
 
         # sanitize filename
-        sanitized = re.sub(r"[^A-Za-z0-9_.-]", "_", item_name)
+        sanitized = ITEM_FILENAME_UNSAFE.sub("_", item_name)
 
         file_path = os.path.join(
             parser_output_path, "en", "item", "codesnips", f"{sanitized}.txt"
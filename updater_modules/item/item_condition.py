@@ -1,14 +1,13 @@
-import re
 import os
 from .file_utils import read_file_with_subfolders
+from ..patterns import ITEM_DURABILITY, item_infobox_value
 
 
-def process_condition(text, parser_output_path, language_code, item_id):
+def process_condition(text, parser_output_path, language_code, item_id, start=0):
     """
-    Process condition/durability templates in the text.
+    Process condition/durability templates in the text, searching from start.
     """
-    pattern = r"(\{\{Durability weapon.*?\}\})"
-    match = re.search(pattern, text, flags=re.DOTALL)
+    match = ITEM_DURABILITY.search(text, start)
     if not match:
         return text, False
 
@@ -28,7 +27,7 @@ def process_condition(text, parser_output_path, language_code, item_id):
             return text, False
 
     def extract_value(key):
-        m = re.search(rf"\|{key}\s*=\s*(.*)", infobox_text)
+        m = item_infobox_value(key).search(infobox_text)
         return m.group(1).strip() if m else ""
 
     skill_type = extract_value("skill_type")
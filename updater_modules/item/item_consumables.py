@@ -1,18 +1,17 @@
-import re
 import os
 from .file_utils import read_file_with_subfolders
+from .block_utils import find_line_block
 
 
-def process_consumables(text, parser_output_path, language_code, item_id):
+def process_consumables(text, parser_output_path, language_code, item_id, start=0):
     """
-    Process consumables templates in the text.
+    Process consumables templates in the text, searching from start.
     """
-    pattern = re.compile(r"(\{\{Consumables.*?\n)(.*?\n)*?(\}\})", re.DOTALL)
-    match = pattern.search(text)
-    if not match:
+    block = find_line_block(text, "{{Consumables", start)
+    if not block:
         return text, False
 
-    consumables_template = match.group(0)
+    consumables_template = text[block[0] : block[1]]
     file_path = os.path.join(
         parser_output_path,
         language_code,
@@ -1,15 +1,14 @@
-import re
 import os
 from .file_utils import read_file_with_subfolders
+from ..patterns import ITEM_CONTENTS_TABLE, ITEM_TABLE_END
 
 
-def process_contents(text, parser_output_path, language_code, item_id):
+def process_contents(text, parser_output_path, language_code, item_id, start=0):
     """
-    Process container contents tables in the text.
+    Process container contents tables in the text, searching from start.
     """
     # Find the table with either collapsible or collapsed class
-    pattern = r'{\| class="wikitable theme-red sortable mw-collapsible(?: mw-collapsed)?" id="contents-([^"]+)"'
-    match = re.search(pattern, text)
+    match = ITEM_CONTENTS_TABLE.search(text, start)
     if not match:
         return text, False
 
@@ -30,15 +29,14 @@ def process_contents(text, parser_output_path, language_code, item_id):
     new_content = new_content.strip()
 
     # Find the table to replace (from start to first |})
-    start_pattern = r'{\| class="wikitable theme-red sortable mw-collapsible(?: mw-collapsed)?" id="contents-[^"]+"'
-    start_match = re.search(start_pattern, text)
+    start_match = ITEM_CONTENTS_TABLE.search(text, start)
 
     if not start_match:
         return text, False
 
     # Find the end of the table
     remaining_text = text[start_match.start() :]
-    end_match = re.search(r"\|\}", remaining_text)
+    end_match = ITEM_TABLE_END.search(remaining_text)
 
     if not end_match:
         return text, False
@@ -1,7 +1,8 @@
 import os
-import re
 from typing import Tuple
 from .file_utils import read_file_with_subfolders
+from .block_utils import find_nested_block, iter_nested_blocks
+from ..patterns import ITEM_CRAFTING_ID, ITEM_CRAFTING_ITEM
 
 
 def process_evolved_recipes(
@@ -21,17 +22,16 @@ def process_evolved_recipes(
         - Boolean flag indicating if any changes were made
     """
     # Find evolved recipes template with proper nesting handling
-    template_pattern = r"\{\{EvolvedRecipesForItem(?:[^{}]|(?:\{\{[^{}]*\}\}))*\}\}"
-    template_match = re.search(template_pattern, page_text, re.DOTALL)
+    template_block = find_nested_block(page_text, ["{{EvolvedRecipesForItem"])
 
-    if not template_match:
+    if not template_block:
         return page_text, False
 
-    template = template_match.group(0)
-    template_start = template_match.start()
+    template_start, template_end = template_block
+    template = page_text[template_start:template_end]
 
     # Try to find ID parameter in template
-    id_match = re.search(r"\|id=([^\n|]+)", template)
+    id_match = ITEM_CRAFTING_ID.search(template)
     recipe_id = id_match.group(1).strip() if id_match else item_id
 
     # Construct the evolved recipes file path
@@ -82,21 +82,19 @@ def process_crafting_templates(
         evolved_changes = False
 
     # Find all crafting and building templates with proper nesting handling
-    template_pattern = (
-        r"\{\{(?:Crafting|Building)/sandbox(?:[^{}]|(?:\{\{[^{}]*\}\}))*\}\}"
+    templates = list(
+        iter_nested_blocks(page_text, ["{{Crafting/sandbox", "{{Building/sandbox"])
     )
-    templates = list(re.finditer(template_pattern, page_text, re.DOTALL))
 
     changes_made = False
     updated_text = page_text
 
     # Process templates in reverse order to maintain correct positions
-    for template_match in reversed(templates):
-        template = template_match.group(0)
-        template_start = template_match.start()
+    for template_start, template_end in reversed(templates):
+        template = page_text[template_start:template_end]
 
         # Find the item ID
-        item_match = re.search(r"\|item=([^\n|]+)", template)
+        item_match = ITEM_CRAFTING_ITEM.search(template)
         if not item_match:
             continue
 
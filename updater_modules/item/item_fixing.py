@@ -1,23 +1,23 @@
-import re
 import os
 from .file_utils import read_file_with_subfolders
+from .block_utils import iter_line_blocks
+from ..patterns import ITEM_FIXING_ID
 
 
-def process_fixing(text, parser_output_path, language_code):
+def process_fixing(text, parser_output_path, language_code, start=0):
     """
-    Process fixing templates in the text.
+    Process fixing templates in the text, searching from start.
     """
-    pattern = re.compile(r"(\{\{Fixing.*?\n)(.*?\n)*?\}\}", re.DOTALL)
-    matches = list(re.finditer(pattern, text))
-    if not matches:
+    blocks = list(iter_line_blocks(text, "{{Fixing", start))
+    if not blocks:
         return text, False
 
     updated = text
     has_changes = False
 
-    for match in matches:
-        fixing_template = match.group(0)
-        fixing_id_match = re.search(r"\|fixing_id\s*=\s*([^\|\n]+)", fixing_template)
+    for start, end in blocks:
+        fixing_template = text[start:end]
+        fixing_id_match = ITEM_FIXING_ID.search(fixing_template)
         if not fixing_id_match:
             continue
 
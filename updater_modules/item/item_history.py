@@ -1,6 +1,7 @@
 import os
-import re
 from .file_utils import read_file_with_subfolders
+from .block_utils import iter_history_tables
+from ..patterns import ITEM_BLANK_LINES, ITEM_ID_PARAM
 
 
 def process_history(
@@ -21,20 +22,16 @@ def process_history(
     updated = False
     result = text
 
-    # Find all history table blocks
-    pattern = re.compile(
-        r"(?m)^\s*{{HistoryTable\|(.*?)^\s*}}\s*$", re.MULTILINE | re.DOTALL
-    )
-
     # Keep track of processed blocks to handle spacing
     processed_blocks = []
 
-    for match in re.finditer(pattern, text):
-        history_block = match.group(0)
-        block_content = match.group(1)
+    # Find all history table blocks
+    for start, end, content_start, content_end in iter_history_tables(text):
+        history_block = text[start:end]
+        block_content = text[content_start:content_end]
 
         # Extract item_id from the history block
-        id_match = re.search(r"\|\s*item_id\s*=\s*([^\|\n]+)", block_content)
+        id_match = ITEM_ID_PARAM.search(block_content)
         if not id_match:
             continue
 
@@ -62,6 +59,6 @@ def process_history(
             result = result.replace(old_block, f"\n{new_block}\n")
 
         # Clean up any potential multiple consecutive newlines
-        result = re.sub(r"\n{3,}", "\n\n", result)
+        result = ITEM_BLANK_LINES.sub("\n\n", result)
 
     return result, updated
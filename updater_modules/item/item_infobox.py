@@ -1,6 +1,7 @@
 import os
-import re
-from .file_utils import read_file_with_subfolders
+from .file_utils import read_infobox_with_subfolders
+from ..diagnostics import record_event
+from ..patterns import ITEM_INFOBOX_BLOCK
 
 # --------------------------------------------------------------------------
 # Order in which infobox parameters should appear
@@ -267,6 +268,43 @@ SORT_ORDER = [
 ]
 
 
+# --------------------------------------------------------------------------
+# Parameters kept from the page rather than taken from the parser file
+# --------------------------------------------------------------------------
+PROTECTED_PREFIXES = (
+    "|icon",
+    "|icon_name",
+    "|model",
+    "|boredom_change",
+    "|itemdisplayname",
+    "|media_title",
+    "|recipes",
+    "|cooking_change",
+    "|carpentry_change",
+    "|farming_change",
+    "|first_aid_change",
+    "|electrical_change",
+    "|metalworking_change",
+    "|mechanics_change",
+    "|tailoring_change",
+    "|aiming_change",
+    "|reloading_change",
+    "|fishing_change",
+    "|trapping_change",
+    "|foraging_change",
+    "|long_blunt_change",
+    "|short_blade_change",
+    "|lightfooted_change",
+    "|unhappy_change",
+    "|boredom_change",
+    "|stress_change",
+    "panic_change",
+    "|fatigue_change",
+    "|endurance_change",
+    "|fitness_change",
+)
+
+
 def sort_infobox(infobox: str) -> str:
     lines = infobox.split("\n")
     body = lines[1:-1]
@@ -279,6 +317,36 @@ def sort_infobox(infobox: str) -> str:
     return "{{Infobox item\n" + "\n".join(sorted_body) + "\n}}"
 
 
+def article_file_name(article_name: str) -> str:
+    """Escape an article name the way the parser names its infobox files."""
+    article_name = article_name.replace(" ", "_")
+    article_name = article_name.replace("'", "%27")
+    article_name = article_name.replace(":", "%3A")
+    article_name = article_name.replace('"', "%22")
+    article_name = article_name.replace(",", "%2C")
+    article_name = article_name.replace("!", "%21")
+    article_name = article_name.replace(";", "%3B")
+    article_name = article_name.replace("&", "%26")
+    article_name = article_name.replace("?", "%3F")
+    return article_name
+
+
+def comparable_params(params: dict, item_id: str) -> frozenset:
+    """
+    The key/value pairs of an infobox that process_infobox takes from the
+    parser file, leaving out the protected ones kept from the page.
+
+    Two infoboxes with the same comparable pairs need no update.
+    """
+    keep_name = bool(item_id) and item_id.startswith(("Base.VHS_", "Base.Disc_"))
+    return frozenset(
+        (key, value)
+        for key, value in params.items()
+        if not any(key.startswith(prefix) for prefix in PROTECTED_PREFIXES)
+        and not (keep_name and key.startswith("|name"))
+    )
+
+
 def process_infobox(
     text, parser_output_path, language_code, item_id, article_name=None
 ):
@@ -295,7 +363,7 @@ def process_infobox(
     """
 
     # 1) Extract the first {{Infobox item…}} block
-    match = re.search(r"(\{\{Infobox\s*item[\s\S]*?\n\}\})", text, re.IGNORECASE)
+    match = ITEM_INFOBOX_BLOCK.search(text)
     if not match:
         return text, False
     infobox_block = match.group(1)
@@ -310,19 +378,12 @@ def process_infobox(
             k, v = line.split("=", 1)
             infobox_dict[k.strip()] = v.strip()
 
-    file_lines = []
+    # 3) Read the parameters of the parser infobox file
+    file_dict = None
 
     # Try with article name first if available
     if article_name:
-        article_name = article_name.replace(" ", "_")
-        article_name = article_name.replace("'", "%27")
-        article_name = article_name.replace(":", "%3A")
-        article_name = article_name.replace('"', "%22")
-        article_name = article_name.replace(",", "%2C")
-        article_name = article_name.replace("!", "%21")
-        article_name = article_name.replace(";", "%3B")
-        article_name = article_name.replace("&", "%26")
-        article_name = article_name.replace("?", "%3F")
+        article_name = article_file_name(article_name)
         article_file_path = os.path.join(
             parser_output_path,
             language_code,
@@ -330,74 +391,36 @@ def process_infobox(
             "infoboxes",
             f"{article_name}.txt",
         )
-        file_content, found_path = read_file_with_subfolders(article_file_path)
-        if file_content:
-            file_lines = [ln.strip() for ln in file_content.splitlines() if ln.strip()]
-        else:
+        file_dict, found_path = read_infobox_with_subfolders(article_file_path)
+        if file_dict is None:
             infobox_version = infobox_dict.get("infobox_version")
             if "41.78.16" in infobox_block:
                 pass
             else:
-                print(f"Article file not found: {article_file_path}")
+                record_event(
+                    "article_file_missing",
+                    "item.process_infobox",
+                    language_code,
+                    article_file_path,
+                )
                 pass
 
     # If article name file doesn't exist or no article name provided, use item_id
-    if not file_lines:
+    if file_dict is None:
         item_id_file_path = os.path.join(
             parser_output_path, language_code, "item", "infoboxes", f"{item_id}.txt"
         )
-        file_content, found_path = read_file_with_subfolders(item_id_file_path)
-        if file_content:
-            file_lines = [ln.strip() for ln in file_content.splitlines() if ln.strip()]
-        else:
+        file_dict, found_path = read_infobox_with_subfolders(item_id_file_path)
+        if file_dict is None:
             return text, False
 
-    # 4) Parse the file lines into a dict
-    file_dict = {}
-    for ln in file_lines:
-        if "=" in ln:
-            k, v = ln.split("=", 1)
-            file_dict[k.strip()] = v.strip()
-
-    # 5) Create a new infobox dict starting fresh with the file data
+    # 4) Create a new infobox dict starting fresh with the file data
     new_infobox_dict = {}
     changed = False
 
     # First, copy over protected parameters from the original infobox
-    protected_prefixes = (
-        "|icon",
-        "|icon_name",
-        "|model",
-        "|boredom_change",
-        "|itemdisplayname",
-        "|media_title",
-        "|recipes",
-        "|cooking_change",
-        "|carpentry_change",
-        "|farming_change",
-        "|first_aid_change",
-        "|electrical_change",
-        "|metalworking_change",
-        "|mechanics_change",
-        "|tailoring_change",
-        "|aiming_change",
-        "|reloading_change",
-        "|fishing_change",
-        "|trapping_change",
-        "|foraging_change",
-        "|long_blunt_change",
-        "|short_blade_change",
-        "|lightfooted_change",
-        "|unhappy_change",
-        "|boredom_change",
-        "|stress_change",
-        "panic_change",
-        "|fatigue_change",
-        "|endurance_change",
-        "|fitness_change",
-    )
     for key, value in infobox_dict.items():
-        if any(key.startswith(prefix) for prefix in protected_prefixes):
+        if any(key.startswith(prefix) for prefix in PROTECTED_PREFIXES):
             new_infobox_dict[key] = value
         # Special handling for name parameter with VHS/Disc items
         elif (
@@ -410,7 +433,7 @@ def process_infobox(
     # Then add all parameters from the file_dict
     for key, value in file_dict.items():
         # Skip if it's a protected parameter
-        if any(key.startswith(prefix) for prefix in protected_prefixes):
+        if any(key.startswith(prefix) for prefix in PROTECTED_PREFIXES):
             continue
         # Skip name parameter for VHS/Disc items
         if (
@@ -432,7 +455,7 @@ def process_infobox(
     if not changed:
         return text, False
 
-    # 6) Rebuild, sort, and replace the infobox block
+    # 5) Rebuild, sort, and replace the infobox block
     rebuilt = (
         "{{Infobox item\n"
         + "\n".join(f"{k}={v}" for k, v in new_infobox_dict.items())
@@ -1,5 +1,8 @@
-def process_navbox(text):
+from ..navbox_index import render_navboxes
+
+
+def process_navbox(text, language_code):
     """
-    Purely a placeholder for now
+    Render the navboxes between navbox bot flags from the navbox index.
     """
-    return text, False
+    return render_navboxes(text, "item", language_code)
@@ -1,6 +1,6 @@
-import re
 import os
 from .file_utils import read_file_with_subfolders
+from ..patterns import ITEM_TEACHED_RECIPES
 
 
 def process_teached_recipes(text, parser_output_path, language_code, item_id):
@@ -8,14 +8,7 @@ def process_teached_recipes(text, parser_output_path, language_code, item_id):
     Process teached recipes templates in the text.
     """
     # Single regex: capture the start-flag, the id, the body, and the end-flag
-    pattern = re.compile(
-        r"(?P<start><!--\s*Bot flag\|TeachedRecipes\|id=(?P<id>[^>]+)\s*-->)"
-        r".*?"
-        r"(?P<end><!--\s*Bot flag end\|TeachedRecipes\|id=(?P=id)\s*-->)",
-        re.DOTALL,
-    )
-
-    m = pattern.search(text)
+    m = ITEM_TEACHED_RECIPES.search(text)
     if not m:
         return text, False
 
@@ -32,5 +25,5 @@ def process_teached_recipes(text, parser_output_path, language_code, item_id):
     new_content = new_content.strip()
 
     # Replace the entire matched section with just the new content
-    updated_text = pattern.sub(new_content, text)
+    updated_text = ITEM_TEACHED_RECIPES.sub(new_content, text)
     return updated_text, True
@@ -1,7 +1,7 @@
 #!/usr/bin/env python
 
-import re, os
-from scripts.userscripts.updater_modules.item.item_infobox   import process_infobox # type: ignore
+import os
+from scripts.userscripts.updater_modules.item.item_infobox   import article_file_name, process_infobox # type: ignore
 from scripts.userscripts.updater_modules.item.item_body_part import process_body_parts # type: ignore
 from scripts.userscripts.updater_modules.item.item_consumables import process_consumables # type: ignore
 from scripts.userscripts.updater_modules.item.item_fixing import process_fixing # type: ignore
@@ -12,8 +12,76 @@ from scripts.userscripts.updater_modules.item.item_crafting  import process_craf
 from scripts.userscripts.updater_modules.item.item_history   import process_history # type: ignore
 from scripts.userscripts.updater_modules.item.item_code      import process_code # type: ignore
 from scripts.userscripts.updater_modules.item.item_navbox    import process_navbox # type: ignore
+from scripts.userscripts.updater_modules.watchdog import mark_processor # type: ignore
+from scripts.userscripts.updater_modules.features import features_for # type: ignore
+from scripts.userscripts.updater_modules.patterns import ( # type: ignore
+    ITEM_BODY_PART_ID,
+    ITEM_CODE_PARAM,
+    ITEM_CONTENTS_TABLE,
+    ITEM_CRAFTING_ID,
+    ITEM_CRAFTING_ITEM,
+    ITEM_FILENAME_UNSAFE,
+    ITEM_FIXING_ID,
+    ITEM_ID_PARAM,
+    ITEM_INFOBOX_BODY,
+    ITEM_TEACHED_RECIPES,
+)
 
-def orchestrate_item(text, parser_output_path, history_path, language_code, article_name=None):
+def find_item_id(text):
+    """Return the item_id of the page's Infobox item, or None."""
+    m = ITEM_INFOBOX_BODY.search(text)
+    if not m:
+        return None
+    id_match = ITEM_ID_PARAM.search(m.group(1))
+    return id_match.group(1).strip() if id_match else None
+
+def prefetch_item_paths(text, parser_output_path, history_path, language_code, article_name=None):
+    """
+    Parser files the item processors are likely to read for a page, derived
+    from the IDs in its text, for the prefetcher. Reading a file that turns
+    out unused only costs the read.
+
+    Returns:
+        list[str]: Candidate paths, before /id and /page subfolder lookup
+    """
+    item_id = find_item_id(text)
+    item_dir = os.path.join(parser_output_path, language_code, "item")
+    en_item_dir = os.path.join(parser_output_path, "en", "item")
+    paths = []
+    if article_name:
+        paths.append(os.path.join(item_dir, "infoboxes", f"{article_file_name(article_name)}.txt"))
+    if item_id:
+        paths += [
+            os.path.join(item_dir, "infoboxes", f"{item_id}.txt"),
+            os.path.join(en_item_dir, "infoboxes", f"{item_id}.txt"),
+            os.path.join(item_dir, "consumable_properties", f"{item_id}.txt"),
+            os.path.join(en_item_dir, "consumable_properties", f"{item_id}.txt"),
+            os.path.join(parser_output_path, "evolved_recipes", f"{item_id}.txt"),
+        ]
+    for m in ITEM_BODY_PART_ID.finditer(text):
+        paths.append(os.path.join(item_dir, "body_parts", f"{m.group(1).strip()}.txt"))
+    for m in ITEM_FIXING_ID.finditer(text):
+        paths.append(os.path.join(parser_output_path, language_code, "fixing", f"{m.group(1).strip()}.txt"))
+    for m in ITEM_CONTENTS_TABLE.finditer(text):
+        paths.append(os.path.join(item_dir, "container_contents", f"contents-{m.group(1).strip()}.txt"))
+    for m in ITEM_TEACHED_RECIPES.finditer(text):
+        paths.append(os.path.join(parser_output_path, "recipes", "teachedrecipes", f"{m.group('id').strip()}_Teached.txt"))
+    if "{{EvolvedRecipesForItem" in text:
+        for m in ITEM_CRAFTING_ID.finditer(text):
+            paths.append(os.path.join(parser_output_path, "evolved_recipes", f"{m.group(1).strip()}.txt"))
+    for m in ITEM_CRAFTING_ITEM.finditer(text):
+        for recipe_type in ("crafting", "building"):
+            paths.append(os.path.join(parser_output_path, "recipes", recipe_type, f"{m.group(1).strip()}.txt"))
+    # History tables name their item like the infobox does
+    for m in ITEM_ID_PARAM.finditer(text):
+        paths.append(os.path.join(history_path, f"{m.group(1).strip()}.txt"))
+    for m in ITEM_CODE_PARAM.finditer(text):
+        raw_name = m.group(1).strip()
+        item_name = raw_name[5:] if raw_name.startswith("item ") else raw_name
+        paths.append(os.path.join(en_item_dir, "codesnips", f"{ITEM_FILENAME_UNSAFE.sub('_', item_name)}.txt"))
+    return paths
+
+def orchestrate_item(text, parser_output_path, history_path, language_code, article_name=None, features=None):
     """
     Args:
         text (str): Original wikitext.
@@ -21,22 +89,19 @@ def orchestrate_item(text, parser_output_path, history_path, language_code, arti
         history_path (str)
         language_code (str)
         article_name (str|None): The name of the article, passed from the main bot system
+        features (PageFeatures|None): Processor markers found while categorizing;
+            processors whose markers are absent are skipped
     Returns:
         (updated_text (str), processes (list[str]))
     """
-    # 1) Extract the Infobox item block
-    m = re.search(r'\{\{Infobox\s*item(.*?)\}\}', text, re.DOTALL | re.IGNORECASE)
-    if m:
-        infobox_body = m.group(1)
-        id_match = re.search(r'\|\s*item_id\s*=\s*([^\|\n]+)', infobox_body)
-        item_id = id_match.group(1).strip() if id_match else None
-    else:
-        item_id = None
+    # 1) Extract the item_id of the Infobox item block
+    item_id = find_item_id(text)
 
     updated = text
     processes = []
 
-    # 2) Run through each processor
+    # 2) Run through each processor whose markers the page contains
+    mark_processor('item.process_infobox')
     try:
         new_text, changed = process_infobox(updated, parser_output_path, language_code, item_id, article_name)
         if changed:
@@ -45,84 +110,114 @@ def orchestrate_item(text, parser_output_path, history_path, language_code, arti
     except (FileNotFoundError, OSError):
         pass
 
-    try:
-        new_text, changed = process_body_parts(updated, parser_output_path, language_code)
-        if changed:
-            updated = new_text
-            processes.append('Body Parts')
-    except (FileNotFoundError, OSError):
-        pass
+    features = features_for(updated, features)
+    if features.has("body_parts"):
+        mark_processor('item.process_body_parts')
+        try:
+            new_text, changed = process_body_parts(updated, parser_output_path, language_code, features.offset('body_parts'))
+            if changed:
+                updated = new_text
+                processes.append('Body Parts')
+        except (FileNotFoundError, OSError):
+            pass
 
-    try:
-        new_text, changed = process_consumables(updated, parser_output_path, language_code, item_id)
-        if changed:
-            updated = new_text
-            processes.append('Consumables')
-    except (FileNotFoundError, OSError):
-        pass
+    features = features_for(updated, features)
+    if features.has("consumables"):
+        mark_processor('item.process_consumables')
+        try:
+            new_text, changed = process_consumables(updated, parser_output_path, language_code, item_id, features.offset('consumables'))
+            if changed:
+                updated = new_text
+                processes.append('Consumables')
+        except (FileNotFoundError, OSError):
+            pass
 
-    try:
-        new_text, changed = process_fixing(updated, parser_output_path, language_code)
-        if changed:
-            updated = new_text
-            processes.append('Fixing')
-    except (FileNotFoundError, OSError):
-        pass
+    features = features_for(updated, features)
+    if features.has("fixing"):
+        mark_processor('item.process_fixing')
+        try:
+            new_text, changed = process_fixing(updated, parser_output_path, language_code, features.offset('fixing'))
+            if changed:
+                updated = new_text
+                processes.append('Fixing')
+        except (FileNotFoundError, OSError):
+            pass
 
-    try:
-        new_text, changed = process_condition(updated, parser_output_path, language_code, item_id)
-        if changed:
-            updated = new_text
-            processes.append('Condition')
-    except (FileNotFoundError, OSError):
-        pass
+    features = features_for(updated, features)
+    if features.has("condition"):
+        mark_processor('item.process_condition')
+        try:
+            new_text, changed = process_condition(updated, parser_output_path, language_code, item_id, features.offset('condition'))
+            if changed:
+                updated = new_text
+                processes.append('Condition')
+        except (FileNotFoundError, OSError):
+            pass
 
-    try:
-        new_text, changed = process_teached_recipes(updated, parser_output_path, language_code, item_id)
-        if changed:
-            updated = new_text
-            processes.append('Teached Recipes')
-    except (FileNotFoundError, OSError):
-        pass
+    features = features_for(updated, features)
+    if features.has("teached_recipes"):
+        mark_processor('item.process_teached_recipes')
+        try:
+            new_text, changed = process_teached_recipes(updated, parser_output_path, language_code, item_id)
+            if changed:
+                updated = new_text
+                processes.append('Teached Recipes')
+        except (FileNotFoundError, OSError):
+            pass
 
-    try:
-        new_text, changed = process_contents(updated, parser_output_path, language_code, item_id)
-        if changed:
-            updated = new_text
-            processes.append('Container Contents')
-    except (FileNotFoundError, OSError):
-        pass
+    features = features_for(updated, features)
+    if features.has("contents"):
+        mark_processor('item.process_contents')
+        try:
+            new_text, changed = process_contents(updated, parser_output_path, language_code, item_id, features.offset('contents'))
+            if changed:
+                updated = new_text
+                processes.append('Container Contents')
+        except (FileNotFoundError, OSError):
+            pass
 
-    try:
-        new_text, changed = process_crafting_templates(updated, parser_output_path, item_id)
-        if changed:
-            updated = new_text
-            processes.append('Crafting')
-    except (FileNotFoundError, OSError):
-        pass
+    features = features_for(updated, features)
+    if features.has("crafting"):
+        mark_processor('item.process_crafting_templates')
+        try:
+            new_text, changed = process_crafting_templates(updated, parser_output_path, item_id)
+            if changed:
+                updated = new_text
+                processes.append('Crafting')
+        except (FileNotFoundError, OSError):
+            pass
 
-    try:
-        new_text, changed = process_history(updated, history_path)
-        if changed:
-            updated = new_text
-            processes.append('History')
-    except (FileNotFoundError, OSError):
-        pass
+    features = features_for(updated, features)
+    if features.has("history"):
+        mark_processor('item.process_history')
+        try:
+            new_text, changed = process_history(updated, history_path)
+            if changed:
+                updated = new_text
+                processes.append('History')
+        except (FileNotFoundError, OSError):
+            pass
 
-    try:
-        new_text, changed = process_code(updated, parser_output_path)
-        if changed:
-            updated = new_text
-            processes.append('Code')
-    except (FileNotFoundError, OSError):
-        pass
+    features = features_for(updated, features)
+    if features.has("code"):
+        mark_processor('item.process_code')
+        try:
+            new_text, changed = process_code(updated, parser_output_path)
+            if changed:
+                updated = new_text
+                processes.append('Code')
+        except (FileNotFoundError, OSError):
+            pass
 
-    try:
-        new_text, changed = process_navbox(updated)
-        if changed:
-            updated = new_text
-            processes.append('Navbox')
-    except (FileNotFoundError, OSError):
-        pass
+    features = features_for(updated, features)
+    if features.has("navbox"):
+        mark_processor('item.process_navbox')
+        try:
+            new_text, changed = process_navbox(updated, language_code)
+            if changed:
+                updated = new_text
+                processes.append('Navbox')
+        except (FileNotFoundError, OSError):
+            pass
 
     return updated, processes
@@ -3,10 +3,29 @@
 import os
 import time
 import pywikibot # type: ignore
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from tqdm import tqdm
+from .async_reader import DEFAULT_CONCURRENCY, fetch_pages_blocking
 
-def orchestrate_loot(site: pywikibot.Site, parser_output_path: str, rate_limit: int) -> None:
+def current_text(page: pywikibot.Page, title: str, page_texts: Dict[str, Optional[str]]) -> str:
+    """
+    Current text of a loot module, "" if the page does not exist.
+
+    Args:
+        page (pywikibot.Page): The module page
+        title (str): Title the module was requested by, the key of page_texts;
+            page.title() is normalized ("_" becomes " ") and would not match
+        page_texts (dict): Texts read up front, None for pages that do not exist
+
+    Returns:
+        str: The text read up front, or read now if the bulk read failed for it
+    """
+    if title not in page_texts:
+        return page.text
+    return page_texts[title] or ""
+
+def orchestrate_loot(site: pywikibot.Site, parser_output_path: str, rate_limit: int,
+                     fetch_backend: str = "pywikibot", fetch_concurrency: int = None) -> None:
     """
     Updates the Module:Loot pages with lua files from the distributions/data_files directory.
     
@@ -14,9 +33,20 @@ def orchestrate_loot(site: pywikibot.Site, parser_output_path: str, rate_limit:
         site (pywikibot.Site): The wiki site to update
         parser_output_path (str): Path to parser output directory
         rate_limit (int): Number of seconds to wait between saves
+        fetch_backend (str): "pywikibot" to fetch modules one by one, "async" to bulk read them
+        fetch_concurrency (int): Connections used by the async backend
     """
     data_files_path = os.path.join(parser_output_path, 'en', 'item', "distributions", "data_files")
-    
+    lua_files = [f for f in os.listdir(data_files_path) if f.endswith('.lua') and f != 'index.lua']
+
+    # Bulk read every loot module up front with the async backend
+    page_texts = {}
+    if fetch_backend == "async":
+        titles = ["Module:Loot/index"] + [f"Module:Loot/{f[:-4]}" for f in lua_files]
+        page_texts = fetch_pages_blocking(
+            site, titles, fetch_concurrency or DEFAULT_CONCURRENCY, include_missing=True
+        )
+
     # First process the index file
     index_file_path = os.path.join(data_files_path, "index.lua")
     if os.path.exists(index_file_path):
@@ -24,13 +54,12 @@ def orchestrate_loot(site: pywikibot.Site, parser_output_path: str, rate_limit:
             index_content = f.read()
             
         index_page = pywikibot.Page(site, "Module:Loot/index")
-        if index_page.text != index_content:
+        current = current_text(index_page, "Module:Loot/index", page_texts)
+        if current != index_content:
             index_page.text = index_content
             index_page.save(summary="Automated updating: Update Loot index module", tags="bot")
     
     # Then process all other lua files
-    lua_files = [f for f in os.listdir(data_files_path) if f.endswith('.lua') and f != 'index.lua']
-    
     for filename in tqdm(lua_files, desc="Updating loot modules"):
         file_path = os.path.join(data_files_path, filename)
         module_name = filename[:-4]  # Remove .lua extension
@@ -38,7 +67,9 @@ def orchestrate_loot(site: pywikibot.Site, parser_output_path: str, rate_limit:
         with open(file_path, 'r', encoding='utf-8') as f:
             file_content = f.read()
             
-        page = pywikibot.Page(site, f"Module:Loot/{module_name}")
-        if page.text != file_content:
+        title = f"Module:Loot/{module_name}"
+        page = pywikibot.Page(site, title)
+        current = current_text(page, title, page_texts)
+        if current != file_content:
             page.text = file_content
             page.save(summary=f"Automated updating: Update Loot {module_name} module", tags="bot")
\ No newline at end of file
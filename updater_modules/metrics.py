@@ -0,0 +1,311 @@
+#!/usr/bin/env python
+
+"""
+Run history metrics.
+
+Every run appends one compact record (phase durations, throughput, cache hit
+rate, edits per category, peak memory) to a local SQLite database, and is
+compared against the trailing median of earlier runs of the same mode so a
+throughput regression shows up the day it happens.
+
+Print the report for the latest run, or a given one, with:
+    python -m updater_modules.metrics --db updater_metrics.sqlite [--run 42]
+"""
+
+import argparse
+import collections
+import json
+import os
+import sqlite3
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; peak memory is not recorded there
+    resource = None
+
+# Runs compared against by default, and the slowdown counted as a regression
+DEFAULT_WINDOW = 10
+DEFAULT_THRESHOLD = 1.5
+
+# Metrics compared against the trailing median: name -> True if higher is better
+COMPARED_METRICS = {
+    "seconds": False,
+    "pages_per_second": True,
+    "bytes_per_second": True,
+    "cache_hit_rate": True,
+    "peak_rss_mb": False,
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    seconds REAL,
+    pages INTEGER,
+    bytes INTEGER,
+    pages_per_second REAL,
+    bytes_per_second REAL,
+    edits INTEGER,
+    cache_hit_rate REAL,
+    peak_rss_mb REAL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_mode ON runs (mode, id);
+"""
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident memory of this process in MB, if known."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class RunMetrics:
+    """Numbers collected during one run, turned into a record at the end."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.started = datetime.now(timezone.utc)
+        self._start = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.pages = 0
+        self.bytes = 0
+        self.edits = collections.Counter()
+        self.extra: Dict[str, float] = {}
+
+    def record_phases(self, timings: Dict[str, Tuple[float, float]]) -> None:
+        """Record stage durations from run_stages timings."""
+        for name, (start, end) in timings.items():
+            self.phases[name] = round(end - start, 3)
+
+    def record_pages(self, wiki_cache: Dict[str, str]) -> None:
+        """Count the pages and bytes loaded from the wiki."""
+        self.pages += len(wiki_cache)
+        self.bytes += sum(len(text.encode("utf-8")) for text in wiki_cache.values())
+
+    def record_edit(self, category: Optional[str]) -> None:
+        with self._lock:
+            self.edits[category or "other"] += 1
+
+    def set(self, name: str, value: float) -> None:
+        """Record any other number, e.g. a cache counter."""
+        self.extra[name] = value
+
+    def add(self, name: str, value: float) -> None:
+        """Add to another number, e.g. a counter kept per category."""
+        with self._lock:
+            self.extra[name] = self.extra.get(name, 0) + value
+
+    def to_record(self, mode: str, cache_hits: int = 0, cache_misses: int = 0) -> Dict:
+        """Summarise the run; throughput is measured over the search phase."""
+        seconds = time.perf_counter() - self._start
+        fetch_seconds = self.phases.get("search") or seconds
+        lookups = cache_hits + cache_misses
+        return {
+            "started": self.started.isoformat(timespec="seconds"),
+            "mode": mode,
+            "seconds": round(seconds, 2),
+            "pages": self.pages,
+            "bytes": self.bytes,
+            "pages_per_second": round(self.pages / fetch_seconds, 1) if fetch_seconds else None,
+            "bytes_per_second": round(self.bytes / fetch_seconds, 1) if fetch_seconds else None,
+            "edits": sum(self.edits.values()),
+            "cache_hits": cache_hits,
+            "cache_misses": cache_misses,
+            "cache_hit_rate": round(cache_hits / lookups, 4) if lookups else None,
+            "peak_rss_mb": peak_rss_mb(),
+            "phases": dict(self.phases),
+            "edits_by_category": dict(self.edits),
+            "extra": dict(self.extra),
+        }
+
+
+# Metrics of the current run
+run_metrics = RunMetrics()
+
+
+class MetricsStore:
+    """
+    SQLite database of run records.
+
+    Args:
+        path: Database file, created on first use
+    """
+
+    COLUMNS = (
+        "started", "mode", "seconds", "pages", "bytes", "pages_per_second",
+        "bytes_per_second", "edits", "cache_hit_rate", "peak_rss_mb",
+    )
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def append(self, record: Dict) -> int:
+        """Store a run record and return its id."""
+        with self.conn:
+            cursor = self.conn.execute(
+                f"INSERT INTO runs ({', '.join(self.COLUMNS)}, data) "
+                f"VALUES ({', '.join('?' for _ in self.COLUMNS)}, ?)",
+                [record.get(column) for column in self.COLUMNS] + [json.dumps(record)],
+            )
+        return cursor.lastrowid
+
+    def _record(self, row) -> Dict:
+        record = json.loads(row["data"])
+        record["id"] = row["id"]
+        return record
+
+    def get(self, run_id: Optional[int] = None) -> Optional[Dict]:
+        """Return a run record, the latest one if run_id is None."""
+        if run_id is None:
+            row = self.conn.execute("SELECT id, data FROM runs ORDER BY id DESC LIMIT 1").fetchone()
+        else:
+            row = self.conn.execute("SELECT id, data FROM runs WHERE id = ?", (run_id,)).fetchone()
+        return self._record(row) if row else None
+
+    def previous(self, record: Dict, window: int = DEFAULT_WINDOW) -> List[Dict]:
+        """Return up to window earlier runs of the same mode, newest first."""
+        rows = self.conn.execute(
+            "SELECT id, data FROM runs WHERE mode = ? AND id < ? ORDER BY id DESC LIMIT ?",
+            (record["mode"], record["id"], window),
+        ).fetchall()
+        return [self._record(row) for row in rows]
+
+
+def _metric_values(record: Dict) -> Dict[str, float]:
+    """The compared metrics of a record, phases included as phase:<name> durations."""
+    values = {name: record.get(name) for name in COMPARED_METRICS}
+    for phase, seconds in record.get("phases", {}).items():
+        values[f"phase:{phase}"] = seconds
+    return {name: value for name, value in values.items() if value is not None}
+
+
+def compare(
+    record: Dict, history: List[Dict], threshold: float = DEFAULT_THRESHOLD
+) -> List[Dict]:
+    """
+    Compare a run with the trailing median of earlier runs.
+
+    Args:
+        record: The run to check
+        history: Earlier runs of the same mode
+        threshold: Ratio to the median counted as a regression, e.g. 1.5
+
+    Returns:
+        One row per metric with value, median, ratio (>1 means worse) and regression flag
+    """
+    rows = []
+    past = [_metric_values(run) for run in history]
+    for name, value in _metric_values(record).items():
+        samples = [values[name] for values in past if name in values]
+        if not samples:
+            continue
+        median = statistics.median(samples)
+        higher_is_better = COMPARED_METRICS.get(name, False)
+        if value == median:
+            ratio = 1.0
+        elif higher_is_better:
+            ratio = median / value if value else float("inf")
+        else:
+            ratio = value / median if median else float("inf")
+        # Durations under a second are too noisy to flag
+        is_duration = name == "seconds" or name.startswith("phase:")
+        significant = not is_duration or max(value, median) >= 1.0
+        rows.append(
+            {
+                "metric": name,
+                "value": value,
+                "median": median,
+                "ratio": ratio,
+                "regression": significant and ratio >= threshold,
+            }
+        )
+    return rows
+
+
+def print_report(
+    store: MetricsStore,
+    record: Dict,
+    window: int = DEFAULT_WINDOW,
+    threshold: float = DEFAULT_THRESHOLD,
+) -> bool:
+    """
+    Print a run against the trailing median of earlier runs of its mode.
+
+    Returns:
+        True if any metric regressed by threshold or more
+    """
+    history = store.previous(record, window)
+    print(
+        f"\nRun {record['id']} ({record['mode']}, {record['started']}): "
+        f"{record['pages']} pages, {record['edits']} edits in {record['seconds']:.1f}s, "
+        f"peak {record.get('peak_rss_mb') or 0:.0f} MB"
+    )
+    if record.get("edits_by_category"):
+        print(
+            "Edits: "
+            + ", ".join(f"{c} {n}" for c, n in sorted(record["edits_by_category"].items()))
+        )
+    if not history:
+        print("No earlier runs of this mode to compare with")
+        return False
+
+    rows = compare(record, history, threshold)
+    print(f"Compared with the median of {len(history)} earlier runs")
+    print(f"{'Metric':<28}{'Value':>12}{'Median':>12}{'Ratio':>11}")
+    for row in rows:
+        marker = "!" if row["regression"] else " "
+        print(
+            f"{marker}{row['metric'][:27]:<27}{row['value']:>12.4g}{row['median']:>12.4g}"
+            f"{row['ratio']:>10.2f}x"
+        )
+    regressions = [row["metric"] for row in rows if row["regression"]]
+    if regressions:
+        print(f"Regression ({threshold:g}x or worse): {', '.join(regressions)}")
+    return bool(regressions)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare updater runs with their trailing median")
+    parser.add_argument("--db", default="updater_metrics.sqlite", help="Metrics database")
+    parser.add_argument("--run", type=int, help="Run id, the latest run by default")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="Earlier runs compared with")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Ratio counted as a regression")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"No metrics database at {args.db}")
+        sys.exit(2)
+    store = MetricsStore(args.db)
+    try:
+        record = store.get(args.run)
+        if record is None:
+            print("No such run")
+            sys.exit(2)
+        if print_report(store, record, args.window, args.threshold):
+            sys.exit(1)
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+#!/usr/bin/env python
+
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import unquote
+
+from .item.block_utils import find_line_block
+from .item.file_utils import file_mtime, is_directory, list_directory, read_parser_file
+from .patterns import NAVBOX_FLAG, NAVBOX_PARAM
+
+# Infobox folders per page kind (below the language folder), and whether the
+# file names are article names (items, tiles) or ids (fluids, titled by |name=)
+NAVBOX_SOURCES = {
+    "item": (("item", "infoboxes"), True),
+    "tile": (("tiles", "infoboxes"), True),
+    "fluid": (("fluid_infoboxes",), False),
+}
+
+# Infobox parameters pages are grouped by; numbered variants (tag2, tag3...) share a group
+GROUP_FIELDS = ("category", "type", "tag")
+
+# Parameters holding the id an infobox file may also be named after
+ID_FIELDS = ("item_id", "fluid_id")
+
+INDEX_VERSION = 2
+
+_LINK_SEPARATOR = " • "
+
+
+def parse_infobox_file(text: str, stem: str, title_from_file: bool) -> Optional[Dict]:
+    """
+    Extract what the navbox index keeps from a parser output infobox.
+
+    Args:
+        text: Infobox file content
+        stem: File name without extension
+        title_from_file: Whether the file is named after the article
+
+    Returns:
+        Entry with title, name and group values, or None if the file is only
+        an id-named duplicate of an article-named one
+    """
+    params = {}
+    groups = {field: [] for field in GROUP_FIELDS}
+    for key, number, value in NAVBOX_PARAM.findall(text):
+        if not value:
+            continue
+        if key in groups:
+            groups[key].append(value)
+        elif not number:
+            params.setdefault(key, value)
+
+    if title_from_file and any(params.get(field) == stem for field in ID_FIELDS):
+        return None
+
+    name = params.get("name")
+    if title_from_file:
+        title = unquote(stem.replace("_", " "))
+    else:
+        title = name
+    if not title:
+        return None
+
+    return {
+        "title": title,
+        "name": name or title,
+        "groups": {field: values for field, values in groups.items() if values},
+    }
+
+
+def _infobox_files(root: str, relative: str = "") -> List[str]:
+    """Paths of the .txt files below a parser output folder relative to it, in a pack or on disk."""
+    directory = os.path.join(root, relative) if relative else root
+    if not is_directory(directory):
+        return []
+    try:
+        names = list_directory(directory)
+    except OSError:
+        return []
+    files = []
+    for name in sorted(names):
+        path = os.path.join(relative, name) if relative else name
+        if is_directory(os.path.join(root, path)):
+            files.extend(_infobox_files(root, path))
+        elif name.endswith(".txt"):
+            files.append(path)
+    return files
+
+
+class NavboxIndex:
+    """
+    Pages grouped by infobox category, type and tags, per language and kind.
+
+    Built from the parser output infoboxes once per run, so rendering a
+    page's navbox is a dictionary lookup instead of a scan over every other
+    page. Entries are persisted with the modification time of their file (a
+    content hash for files read from a parser pack) and only changed files
+    are parsed again on the next run.
+
+    Args:
+        path: JSON file the index is persisted to, None to keep it in memory
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        # language -> kind -> relative path -> {"mtime", "title", "name", "groups"}
+        self._entries: Dict[str, Dict[str, Dict[str, Dict]]] = {}
+        # (language, kind, field, value) -> sorted [(name, title)]
+        self._groups: Dict[Tuple[str, str, str, str], List[Tuple[str, str]]] = {}
+        self._rendered: Dict[Tuple[str, str, str, str], str] = {}
+
+    def load(self) -> None:
+        """Load the persisted index, if any."""
+        if not self.path:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Could not load navbox index {self.path}: {e}")
+            return
+        if data.get("version") == INDEX_VERSION:
+            self._entries = data.get("languages", {})
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        try:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump({"version": INDEX_VERSION, "languages": self._entries}, f)
+        except OSError as e:
+            print(f"Could not write navbox index {self.path}: {e}")
+
+    def refresh(
+        self, parser_output_path: str, language_codes: Optional[Iterable[str]] = None
+    ) -> Tuple[int, int]:
+        """
+        Bring the index up to date with the parser output.
+
+        Args:
+            parser_output_path: Path to the parser output files
+            language_codes: Languages to index, None for every language folder
+
+        Returns:
+            (number of indexed pages, number of files parsed again)
+        """
+        if language_codes is None:
+            try:
+                language_codes = sorted(
+                    name
+                    for name in list_directory(parser_output_path)
+                    if is_directory(os.path.join(parser_output_path, name))
+                )
+            except OSError:
+                language_codes = []
+
+        parsed = removed = 0
+        with self._lock:
+            for language_code in language_codes:
+                kinds = self._entries.setdefault(language_code, {})
+                for kind, (folders, title_from_file) in NAVBOX_SOURCES.items():
+                    root = os.path.join(parser_output_path, language_code, *folders)
+                    previous = kinds.get(kind, {})
+                    current = {}
+                    for relative in _infobox_files(root):
+                        file_path = os.path.join(root, relative)
+                        text = None
+                        mtime = file_mtime(file_path)
+                        if mtime is None:
+                            # Packed files keep no modification time
+                            try:
+                                text = read_parser_file(file_path)
+                            except (FileNotFoundError, OSError, UnicodeDecodeError):
+                                continue
+                            mtime = hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+                        entry = previous.get(relative)
+                        if entry is None or entry["mtime"] != mtime:
+                            if text is None:
+                                try:
+                                    text = read_parser_file(file_path)
+                                except (FileNotFoundError, OSError, UnicodeDecodeError):
+                                    continue
+                            stem = os.path.basename(relative)[:-4]
+                            entry = parse_infobox_file(text, stem, title_from_file)
+                            entry = dict(entry or {"skip": True}, mtime=mtime)
+                            parsed += 1
+                        current[relative] = entry
+                    removed += len(previous.keys() - current.keys())
+                    kinds[kind] = current
+            self._build_groups()
+            pages = sum(
+                1
+                for kinds in self._entries.values()
+                for entries in kinds.values()
+                for entry in entries.values()
+                if not entry.get("skip")
+            )
+        if parsed or removed:
+            self.save()
+        return pages, parsed
+
+    def state(self) -> Dict[str, Dict[str, Dict[str, Dict]]]:
+        """The indexed entries, to hand to another process with load_state."""
+        with self._lock:
+            return self._entries
+
+    def load_state(self, entries: Dict[str, Dict[str, Dict[str, Dict]]]) -> None:
+        """Take over entries returned by state instead of refreshing from the parser output."""
+        with self._lock:
+            self._entries = entries
+            self._build_groups()
+
+    def _build_groups(self) -> None:
+        groups = {}
+        for language_code, kinds in self._entries.items():
+            for kind, entries in kinds.items():
+                for entry in entries.values():
+                    if entry.get("skip"):
+                        continue
+                    for field, values in entry["groups"].items():
+                        for value in set(values):
+                            groups.setdefault((language_code, kind, field, value), set()).add(
+                                (entry["name"], entry["title"])
+                            )
+        self._groups = {key: sorted(members) for key, members in groups.items()}
+        self._rendered = {}
+
+    def members(
+        self, language_code: str, kind: str, field: str, value: str
+    ) -> List[Tuple[str, str]]:
+        """Return the (name, title) pairs of the pages in a group, sorted by name."""
+        return self._groups.get((language_code, kind, field, value), [])
+
+    def render(self, language_code: str, kind: str, field: str, value: str) -> Optional[str]:
+        """Render the navbox of a group, None if the group is unknown."""
+        key = (language_code, kind, field, value)
+        rendered = self._rendered.get(key)
+        if rendered is None:
+            members = self._groups.get(key)
+            if not members:
+                return None
+            suffix = "" if language_code == "en" else f"/{language_code}"
+            links = []
+            for name, title in members:
+                target = f"{title}{suffix}"
+                links.append(f"[[{target}]]" if target == name else f"[[{target}|{name}]]")
+            rendered = f"{{{{Navbox\n|title={value}\n|list1={_LINK_SEPARATOR.join(links)}\n}}}}"
+            self._rendered[key] = rendered
+        return rendered
+
+
+# Index shared by the whole run
+navbox_index = NavboxIndex()
+
+
+def _page_values(text: str, field: str) -> List[str]:
+    """Values of an infobox parameter (and its numbered variants) on the page."""
+    block = find_line_block(text, "{{Infobox")
+    if not block:
+        return []
+    return [
+        value
+        for key, _, value in NAVBOX_PARAM.findall(text, block[0], block[1])
+        if key == field and value
+    ]
+
+
+def render_navboxes(text: str, kind: str, language_code: str) -> Tuple[str, bool]:
+    """
+    Replace the content between navbox bot flags with the rendered navbox.
+
+    The flag id names the group: a field such as "category", using the
+    page's own infobox value, or "field=value", e.g.
+    <!--Bot flag|Navbox|id=tag=Hammer--> ... <!--Bot flag end|Navbox|id=tag=Hammer-->
+
+    Args:
+        text: The wiki text to process
+        kind: Page kind, a key of NAVBOX_SOURCES
+        language_code: Language code for the page
+
+    Returns:
+        Tuple containing:
+        - Updated text
+        - Boolean flag indicating if any changes were made
+    """
+    if "Bot flag|Navbox" not in text:
+        return text, False
+
+    def replace(match):
+        group_id = match.group("id").strip()
+        field, _, value = group_id.partition("=")
+        field = field.strip()
+        values = [value.strip()] if value else _page_values(text, field)
+        for candidate in values:
+            navbox = navbox_index.render(language_code, kind, field, candidate)
+            if navbox is not None:
+                return f"{match.group('start')}\n{navbox}\n{match.group('end')}"
+        return match.group(0)
+
+    updated = NAVBOX_FLAG.sub(replace, text)
+    return updated, updated != text
@@ -0,0 +1,311 @@
+#!/usr/bin/env python
+
+"""
+Packed parser output.
+
+Compiles the parser output and history trees into one indexed file so a run
+opens a single file instead of tens of thousands of small ones. The file is
+memory-mapped; a lookup is a dict probe in the key table plus a slice of the
+mapping.
+
+Layout:
+    header   magic, then offset and length of the index (little-endian)
+    payload  UTF-8 file contents, back to back
+    index    UTF-8 JSON: build info, a stamp of each root's directories,
+             key -> [offset, length] and, with --infoboxes, the item
+             infobox files already parsed into dicts
+
+Keys are "<root>/<path relative to the root>" with forward slashes, the roots
+being "parser" and "history".
+
+Build a pack with:
+    python -m updater_modules.parser_pack --parser-output <dir> --history <dir> --output parser_output.pack [--infoboxes]
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+MAGIC = b"PZPACK01"
+_HEADER = struct.Struct("<8sQQ")
+
+
+def parse_infobox_lines(content: str) -> Optional[Dict[str, str]]:
+    """
+    Parse an infobox file into its key=value parameters.
+
+    Args:
+        content: The file content
+
+    Returns:
+        Parameters in file order, or None if the file has no non-blank line
+    """
+    lines = [line.strip() for line in content.splitlines() if line.strip()]
+    if not lines:
+        return None
+    params = {}
+    for line in lines:
+        if "=" in line:
+            key, value = line.split("=", 1)
+            params[key.strip()] = value.strip()
+    return params
+
+
+def _is_item_infobox(key: str) -> bool:
+    """Whether a key is an item infobox file: parser/<lang>/item/infoboxes/..."""
+    parts = key.split("/")
+    return len(parts) > 4 and parts[0] == "parser" and parts[2:4] == ["item", "infoboxes"]
+
+
+def _walk(root_name: str, root: str) -> Iterator[Tuple[str, str]]:
+    """Yield (key, file path) for every file below root, in a stable order."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            file_path = os.path.join(dirpath, filename)
+            relative = os.path.relpath(file_path, root).replace(os.sep, "/")
+            yield f"{root_name}/{relative}", file_path
+
+
+def tree_stamp(root: str) -> Dict[str, List[int]]:
+    """
+    Modification time and entry count of every directory below root.
+
+    Adding, removing or renaming a file changes its directory's stamp. Only
+    directories are stat'ed, so this stays cheap on trees of many small files.
+
+    Returns:
+        Relative directory ("." for root) -> [mtime in ns, number of entries]
+    """
+    stamp = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        try:
+            mtime = os.stat(dirpath).st_mtime_ns
+        except OSError:
+            continue
+        relative = os.path.relpath(dirpath, root).replace(os.sep, "/")
+        stamp[relative] = [mtime, len(dirnames) + len(filenames)]
+    return stamp
+
+
+def build_pack(roots: Dict[str, str], output: str, infoboxes: bool = False) -> Dict:
+    """
+    Compile directory trees into a pack file.
+
+    The pack is written next to output and moved into place once complete,
+    so a run never maps a partial pack.
+
+    Args:
+        roots: Root name -> directory, e.g. {"parser": ..., "history": ...}
+        output: Path of the pack file
+        infoboxes: Store item infobox files pre-parsed as well
+
+    Returns:
+        The pack index without the file table, plus files and bytes counts
+    """
+    files: Dict[str, List[int]] = {}
+    parsed: Dict[str, Dict[str, str]] = {}
+    stamps: Dict[str, Dict[str, List[int]]] = {}
+    offset = _HEADER.size
+    temp_path = f"{output}.tmp"
+
+    with open(temp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, 0, 0))
+        for root_name, root in roots.items():
+            if not root or not os.path.isdir(root):
+                print(f"Skipping missing {root_name} directory: {root}")
+                continue
+            # Taken first, so a file added while packing makes the pack stale
+            stamps[root_name] = tree_stamp(root)
+            for key, file_path in _walk(root_name, root):
+                try:
+                    with open(file_path, "rb") as source:
+                        data = source.read()
+                except OSError as e:
+                    print(f"Error reading {file_path}: {e}")
+                    continue
+                f.write(data)
+                files[key] = [offset, len(data)]
+                offset += len(data)
+                if infoboxes and _is_item_infobox(key):
+                    params = parse_infobox_lines(data.decode("utf-8"))
+                    if params is not None:
+                        parsed[key] = params
+
+        info = {
+            "built": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "roots": {name: os.path.abspath(root) for name, root in roots.items() if root},
+            "stamps": stamps,
+        }
+        index = json.dumps(
+            dict(info, files=files, infoboxes=parsed), ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+        f.write(index)
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, offset, len(index)))
+
+    os.replace(temp_path, output)
+    return dict(info, files=len(files), bytes=offset, infoboxes=len(parsed))
+
+
+class ParserPack:
+    """
+    Read-only view of a pack file.
+
+    Args:
+        path: Pack file built by build_pack
+
+    Raises:
+        OSError: If the file cannot be opened or mapped
+        ValueError: If the file is not a pack
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, index_offset, index_length = _HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a parser pack")
+            index = json.loads(self._map[index_offset:index_offset + index_length].decode("utf-8"))
+        except (struct.error, ValueError, OSError):
+            self.close()
+            raise
+
+        self.built: str = index["built"]
+        self.roots: Dict[str, str] = index["roots"]
+        # Root name -> tree_stamp of the root when packed; empty for packs
+        # built before stamps were recorded
+        self.stamps: Dict[str, Dict[str, List[int]]] = index.get("stamps", {})
+        self._files: Dict[str, List[int]] = index["files"]
+        self._infoboxes: Dict[str, Dict[str, str]] = index["infoboxes"]
+        self._directories = set()
+        for key in self._files:
+            parent = key.rpartition("/")[0]
+            while parent and parent not in self._directories:
+                self._directories.add(parent)
+                parent = parent.rpartition("/")[0]
+
+    def close(self) -> None:
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    @property
+    def file_count(self) -> int:
+        return len(self._files)
+
+    def has_file(self, key: str) -> bool:
+        return key in self._files
+
+    def has_directory(self, key: str) -> bool:
+        return key in self._directories
+
+    def keys(self, prefix: str = "") -> List[str]:
+        """Keys of every file below a directory key, all keys if prefix is empty."""
+        if not prefix:
+            return list(self._files)
+        prefix = prefix.rstrip("/") + "/"
+        return [key for key in self._files if key.startswith(prefix)]
+
+    def list_directory(self, key: str) -> List[str]:
+        """Names of the files and directories directly below a directory key."""
+        prefix = key.rstrip("/") + "/"
+        names = set()
+        for candidate in self._files:
+            if candidate.startswith(prefix):
+                names.add(candidate[len(prefix):].split("/", 1)[0])
+        return sorted(names)
+
+    def read(self, key: str, encoding: str = "utf-8") -> Optional[str]:
+        """
+        The content of a file, or None if the pack does not hold it.
+
+        Line endings are translated as open() does in text mode, so the
+        content matches reading the original file.
+        """
+        entry = self._files.get(key)
+        if entry is None:
+            return None
+        offset, length = entry
+        content = self._map[offset:offset + length].decode(encoding)
+        if "\r" in content:
+            content = content.replace("\r\n", "\n").replace("\r", "\n")
+        return content
+
+    def infobox(self, key: str) -> Optional[Dict[str, str]]:
+        """The pre-parsed parameters of an item infobox file, None if not stored."""
+        return self._infoboxes.get(key)
+
+    def stale_roots(self, roots: Dict[str, str], verify: bool = False) -> List[str]:
+        """
+        Roots changed since the pack was built.
+
+        Compares the directory stamps, which catches added, removed and
+        renamed files. Files rewritten in place leave the stamps as they were;
+        verify also compares the name and size of every file, at the cost of
+        a stat per file.
+
+        Args:
+            roots: Directory -> root name in the pack, as passed to mount_pack
+            verify: Also compare every file
+
+        Returns:
+            Names of the changed roots; roots missing on disk or without a
+            recorded stamp are not compared
+        """
+        stale = []
+        for directory, root_name in roots.items():
+            stamp = self.stamps.get(root_name)
+            if stamp is None or not directory or not os.path.isdir(directory):
+                continue
+            if tree_stamp(directory) != stamp or (verify and not self._files_match(directory, root_name)):
+                stale.append(root_name)
+        return stale
+
+    def _files_match(self, directory: str, root_name: str) -> bool:
+        """Whether a directory holds the files packed under root_name, with the same sizes."""
+        count = 0
+        for key, file_path in _walk(root_name, directory):
+            entry = self._files.get(key)
+            try:
+                if entry is None or os.stat(file_path).st_size != entry[1]:
+                    return False
+            except OSError:
+                return False
+            count += 1
+        return count == len(self.keys(root_name))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pack parser output into one memory-mapped file")
+    parser.add_argument("--parser-output", required=True, help="Parser output directory")
+    parser.add_argument("--history", help="History directory")
+    parser.add_argument("--output", default="parser_output.pack", help="Pack file to write")
+    parser.add_argument(
+        "--infoboxes", action="store_true", help="Also store item infobox files pre-parsed"
+    )
+    args = parser.parse_args()
+
+    roots = {"parser": args.parser_output}
+    if args.history:
+        roots["history"] = args.history
+
+    start = time.perf_counter()
+    info = build_pack(roots, args.output, args.infoboxes)
+    print(
+        f"Packed {info['files']} files ({info['bytes'] / 1e6:.1f} MB, "
+        f"{info['infoboxes']} parsed infoboxes) into {args.output} "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
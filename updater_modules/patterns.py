@@ -0,0 +1,332 @@
+#!/usr/bin/env python
+
+"""
+Every regular expression the updater uses, compiled once at import.
+
+Processors use the patterns below instead of passing strings to re.search,
+re.sub and friends, so nothing is compiled during a run and re's small
+internal cache is not churned by dozens of patterns. Each pattern has the
+methods of a compiled pattern; while profiling is on they record calls,
+time spent and characters scanned per pattern, so the pattern dominating
+CPU on a real run can be found with print_pattern_report().
+"""
+
+import re
+import threading
+import time
+from typing import Dict, List, Tuple
+
+# Pattern methods that are wrapped while profiling
+_METHODS = ("search", "match", "fullmatch", "finditer", "findall", "sub", "subn", "split")
+
+# Methods taking the replacement before the string
+_STRING_SECOND = ("sub", "subn")
+
+_lock = threading.Lock()
+_profiling = False
+
+
+class PatternStats:
+    """Calls, time and characters scanned of one named pattern."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.seconds = 0.0
+        self.scanned = 0
+
+    def add(self, seconds: float, scanned: int) -> None:
+        with _lock:
+            self.calls += 1
+            self.seconds += seconds
+            self.scanned += scanned
+
+
+def _scanned(string, args: Tuple) -> int:
+    """Characters a call scans, honouring pos and endpos."""
+    try:
+        length = len(string)
+    except TypeError:
+        return 0
+    if not args:
+        return length
+    pos = args[0] if isinstance(args[0], int) else 0
+    endpos = args[1] if len(args) > 1 and isinstance(args[1], int) else length
+    return max(0, min(endpos, length) - pos)
+
+
+class TrackedPattern:
+    """
+    A compiled pattern with optional cost accounting.
+
+    While profiling is off the methods are the compiled pattern's own, so
+    tracking costs nothing; set_profiling() swaps in timed wrappers.
+
+    Args:
+        name: Name the pattern is reported under
+        regex: Compiled pattern
+        stats: Counters, shared by the patterns of one dynamic family
+    """
+
+    def __init__(self, name: str, regex: "re.Pattern", stats: PatternStats):
+        self.name = name
+        self.regex = regex
+        self.pattern = regex.pattern
+        self.flags = regex.flags
+        self.stats = stats
+        self._bind(_profiling)
+
+    def _bind(self, profiling: bool) -> None:
+        for method in _METHODS:
+            func = getattr(self.regex, method)
+            if profiling:
+                func = self._timed(method, func)
+            setattr(self, method, func)
+
+    def _timed(self, method: str, func):
+        stats = self.stats
+
+        if method == "finditer":
+            def wrapper(string, *args):
+                return self._timed_iter(func(string, *args), _scanned(string, args))
+        elif method in _STRING_SECOND:
+            def wrapper(repl, string, *args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(repl, string, *args, **kwargs)
+                finally:
+                    stats.add(time.perf_counter() - start, _scanned(string, ()))
+        else:
+            def wrapper(string, *args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(string, *args, **kwargs)
+                finally:
+                    stats.add(time.perf_counter() - start, _scanned(string, args))
+
+        return wrapper
+
+    def _timed_iter(self, iterator, scanned: int):
+        """Time the matching done while an iterator is consumed."""
+        seconds = 0.0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    match = next(iterator)
+                except StopIteration:
+                    seconds += time.perf_counter() - start
+                    return
+                seconds += time.perf_counter() - start
+                yield match
+        finally:
+            self.stats.add(seconds, scanned)
+
+
+# Registered patterns by name, dynamic families included
+PATTERNS: Dict[str, TrackedPattern] = {}
+_STATS: Dict[str, PatternStats] = {}
+_dynamic: Dict[Tuple[str, str, int], TrackedPattern] = {}
+
+
+def _stats_for(name: str) -> PatternStats:
+    if name not in _STATS:
+        _STATS[name] = PatternStats(name)
+    return _STATS[name]
+
+
+def register(name: str, pattern: str, flags: int = 0) -> TrackedPattern:
+    """
+    Compile and register a pattern.
+
+    Args:
+        name: Unique name, "<module>.<purpose>"
+        pattern: Regular expression
+        flags: re flags
+
+    Returns:
+        The compiled pattern
+    """
+    if name in PATTERNS:
+        raise ValueError(f"Pattern {name} is already registered")
+    tracked = TrackedPattern(name, re.compile(pattern, flags), _stats_for(name))
+    PATTERNS[name] = tracked
+    return tracked
+
+
+def dynamic(name: str, pattern: str, flags: int = 0) -> TrackedPattern:
+    """
+    Return a pattern built at run time, compiled on first use and then cached.
+
+    For patterns that depend on a value, e.g. a parameter name. Every
+    pattern of the family is accounted under name.
+    """
+    key = (name, pattern, flags)
+    tracked = _dynamic.get(key)
+    if tracked is None:
+        with _lock:
+            tracked = _dynamic.get(key)
+            if tracked is None:
+                tracked = TrackedPattern(name, re.compile(pattern, flags), _stats_for(name))
+                _dynamic[key] = tracked
+    return tracked
+
+
+def set_profiling(enabled: bool) -> None:
+    """Turn cost accounting of every pattern on or off."""
+    global _profiling
+    with _lock:
+        _profiling = enabled
+        tracked = list(PATTERNS.values()) + list(_dynamic.values())
+    for pattern in tracked:
+        pattern._bind(enabled)
+
+
+def reset_pattern_stats() -> None:
+    with _lock:
+        for stats in _STATS.values():
+            stats.calls = 0
+            stats.seconds = 0.0
+            stats.scanned = 0
+
+
+def pattern_stats() -> List[PatternStats]:
+    """Counters of every pattern that was called, costliest first."""
+    return sorted(
+        (stats for stats in _STATS.values() if stats.calls),
+        key=lambda stats: stats.seconds,
+        reverse=True,
+    )
+
+
+def print_pattern_report(limit: int = 20) -> None:
+    """Print the costliest patterns of the run."""
+    rows = pattern_stats()
+    if not rows:
+        return
+    total = sum(stats.seconds for stats in rows)
+    print(f"\n{'Pattern':<32}{'Calls':>10}{'Seconds':>10}{'Share':>8}{'Scanned MB':>12}{'MB/s':>9}")
+    for stats in rows[:limit]:
+        megabytes = stats.scanned / 1e6
+        rate = megabytes / stats.seconds if stats.seconds else 0.0
+        share = stats.seconds / total if total else 0.0
+        print(
+            f"{stats.name[:31]:<32}{stats.calls:>10}{stats.seconds:>10.3f}{share:>8.1%}"
+            f"{megabytes:>12.2f}{rate:>9.1f}"
+        )
+    if len(rows) > limit:
+        print(f"... {len(rows) - limit} more patterns")
+
+
+# --------------------------------------------------------------------------
+# Block finders and navboxes
+# --------------------------------------------------------------------------
+
+NON_BRACE = register("block.non_brace", r"[^{}]*")
+WHITESPACE = register("block.whitespace", r"\s*")
+
+NAVBOX_PARAM = register(
+    "navbox.param", r"^\|\s*([A-Za-z_]+?)(\d*)\s*=\s*(.*?)\s*$", re.MULTILINE
+)
+NAVBOX_FLAG = register(
+    "navbox.flag",
+    r"(?P<start><!--\s*Bot flag\|Navbox\|id=(?P<id>[^>]+?)\s*-->)"
+    r".*?"
+    r"(?P<end><!--\s*Bot flag end\|Navbox\|id=(?P=id)\s*-->)",
+    re.DOTALL,
+)
+
+# --------------------------------------------------------------------------
+# Items
+# --------------------------------------------------------------------------
+
+ITEM_INFOBOX_BODY = register(
+    "item.infobox_body", r"\{\{Infobox\s*item(.*?)\}\}", re.DOTALL | re.IGNORECASE
+)
+ITEM_INFOBOX_BLOCK = register(
+    "item.infobox_block", r"(\{\{Infobox\s*item[\s\S]*?\n\}\})", re.IGNORECASE
+)
+ITEM_ID_PARAM = register("item.item_id", r"\|\s*item_id\s*=\s*([^\|\n]+)")
+ITEM_BODY_PART = register("item.body_part", r"\{\{Body part.*?\}\}", re.DOTALL)
+ITEM_BODY_PART_ID = register("item.body_part_id", r"\|id\s*=\s*([^\|\n]+)")
+ITEM_CODESNIP = register("item.codesnip", r"(?m)^\s*{{CodeSnip[\s\S]*?^\}\}\s*$", re.MULTILINE)
+ITEM_CODE_PARAM = register("item.code_param", r"\|\s*code\s*=\s*\n(.*?)\n", re.DOTALL)
+ITEM_FILENAME_UNSAFE = register("item.filename_unsafe", r"[^A-Za-z0-9_.-]")
+ITEM_DURABILITY = register("item.durability", r"(\{\{Durability weapon.*?\}\})", re.DOTALL)
+ITEM_CONTENTS_TABLE = register(
+    "item.contents_table",
+    r'{\| class="wikitable theme-red sortable mw-collapsible(?: mw-collapsed)?" id="contents-([^"]+)"',
+)
+ITEM_TABLE_END = register("item.table_end", r"\|\}")
+ITEM_CRAFTING_ID = register("item.crafting_id", r"\|id=([^\n|]+)")
+ITEM_CRAFTING_ITEM = register("item.crafting_item", r"\|item=([^\n|]+)")
+ITEM_FIXING_ID = register("item.fixing_id", r"\|fixing_id\s*=\s*([^\|\n]+)")
+ITEM_BLANK_LINES = register("item.blank_lines", r"\n{3,}")
+ITEM_TEACHED_RECIPES = register(
+    "item.teached_recipes",
+    r"(?P<start><!--\s*Bot flag\|TeachedRecipes\|id=(?P<id>[^>]+)\s*-->)"
+    r".*?"
+    r"(?P<end><!--\s*Bot flag end\|TeachedRecipes\|id=(?P=id)\s*-->)",
+    re.DOTALL,
+)
+
+
+def item_infobox_value(key: str) -> TrackedPattern:
+    """Pattern reading one parameter from an item infobox file."""
+    return dynamic("item.infobox_value", rf"\|{key}\s*=\s*(.*)")
+
+
+# --------------------------------------------------------------------------
+# Tiles
+# --------------------------------------------------------------------------
+
+TILE_INFOBOX_BODY = register(
+    "tile.infobox_body", r"\{\{Infobox\s*tile(.*?)\}\}", re.DOTALL | re.IGNORECASE
+)
+TILE_INFOBOX_BLOCK = register(
+    "tile.infobox_block", r"(\{\{Infobox\s*tile[\s\S]*?\n\}\})", re.IGNORECASE
+)
+TILE_NAME = register("tile.name", r"\|\s*name\s*=\s*([^\|\n]+)")
+TILE_SPRITE_ID = register("tile.sprite_id", r"\|\s*sprite_id(?:\d+)?\s*=\s*([^\|\n]+)")
+TILE_TILE_ID = register("tile.tile_id", r"\|\s*tile_id(?:\d+)?\s*=\s*([^\|\n]+)")
+TILE_INFOBOX_PARAM = register("tile.infobox_param", r"\|\s*([^=]+)\s*=\s*(.*)")
+TILE_IMAGE_KEY = register("tile.image_key", r"^image(\d*)$")
+TILE_CODE_SECTION = register("tile.code_section", r"==Code==\s*(.*?)(?=\n==|\Z)", re.DOTALL)
+TILE_CODESNIP = register("tile.codesnip", r"{{CodeSnip(.*?)}}", re.DOTALL)
+TILE_CODESNIP_SPRITE = register("tile.codesnip_sprite", r'"sprite":\s*"([^"]+)"')
+
+
+def tile_section(section_header: str) -> TrackedPattern:
+    """Pattern capturing the body of a section, e.g. "===Breakage===", up to the next heading."""
+    return dynamic(
+        "tile.section", f"{re.escape(section_header)}\\s*(.*?)(?=\\n==|\\Z)", re.DOTALL
+    )
+
+
+# --------------------------------------------------------------------------
+# Fluids, vehicles and tags
+# --------------------------------------------------------------------------
+
+FLUID_INFOBOX = register("fluid.infobox", r"\{\{Infobox fluid.*?\n\}\}", re.DOTALL)
+FLUID_ID = register("fluid.fluid_id", r"\|fluid_id=(.*?)$", re.MULTILINE)
+
+VEHICLE_INFOBOX_BODY = register(
+    "vehicle.infobox_body", r"\{\{Infobox\s*vehicle(.*?)\}\}", re.DOTALL | re.IGNORECASE
+)
+VEHICLE_INFOBOX_BLOCK = register(
+    "vehicle.infobox_block", r"(\{\{Infobox\s*vehicle[\s\S]*?\n\}\})", re.IGNORECASE
+)
+VEHICLE_ID = register("vehicle.vehicle_id", r"\|\s*vehicle_id\s*=\s*([^\|\n]+)")
+
+TAG_PAGE_VERSION = register("tag.page_version", r"{{Page version\|(.*?)(?:\||}})")
+TAG_TABLE = register(
+    "tag.table",
+    r"\{\| class=\"wikitable theme-blue sortable\" style=\"text-align: center;\".*?\|\}",
+    re.DOTALL,
+)
+TAG_SUFFIX = register("tag.suffix", r"\s*\([Tt]ag\)\s*$")
+
+
+def search_pattern(category: str, pattern: str) -> TrackedPattern:
+    """Pattern marking a page for an orchestrator, matched case-insensitively."""
+    return dynamic(f"search.{category}", pattern, re.IGNORECASE)
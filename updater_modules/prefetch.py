@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+
+import concurrent.futures
+import time
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from .item.file_utils import find_file_with_subfolders, path_exists, read_parser_file
+
+# Pages read ahead of the one being processed, and threads reading them
+DEFAULT_LOOKAHEAD = 64
+DEFAULT_WORKERS = 8
+
+
+def load_files(paths: Iterable[str]) -> int:
+    """
+    Read parser files into the shared content cache.
+
+    Each path is looked up with its /id and /page subfolder variants, as the
+    processors do. Paths that exist nowhere are skipped.
+
+    Args:
+        paths: Candidate parser file paths
+
+    Returns:
+        Number of files read
+    """
+    loaded = 0
+    for path in paths:
+        found_path = find_file_with_subfolders(path)
+        if not path_exists(found_path):
+            continue
+        try:
+            read_parser_file(found_path)
+            loaded += 1
+        except (FileNotFoundError, OSError, UnicodeDecodeError):
+            pass
+    return loaded
+
+
+class Prefetcher:
+    """
+    Reads the parser files of upcoming pages on a background thread pool.
+
+    The orchestration loop calls wait() before each page: it tops up the
+    window of pages being read ahead, then waits for the page's own files,
+    which are usually loaded by then. Reads land in the shared content
+    cache, so the processors find them there.
+
+    Args:
+        pages: (title, text) of the pages, in processing order
+        paths_for: Callable (title, text) returning the page's candidate parser paths
+        lookahead: Pages read ahead of the current one
+        workers: Reading threads
+    """
+
+    def __init__(
+        self,
+        pages: List[Tuple[str, str]],
+        paths_for: Callable[[str, str], Iterable[str]],
+        lookahead: int = DEFAULT_LOOKAHEAD,
+        workers: int = DEFAULT_WORKERS,
+    ):
+        self.pages = pages
+        self.paths_for = paths_for
+        self.lookahead = max(1, lookahead)
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, workers), thread_name_prefix="prefetch"
+        )
+        self._pending: Dict[str, concurrent.futures.Future] = {}
+        self._next = 0
+        self._consumed = 0
+        self.files = 0
+        self.waited = 0.0
+
+    def __enter__(self) -> "Prefetcher":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _read(self, title: str, text: str) -> int:
+        return load_files(self.paths_for(title, text))
+
+    def _fill(self) -> None:
+        while self._next < len(self.pages) and self._next < self._consumed + self.lookahead:
+            title, text = self.pages[self._next]
+            self._pending[title] = self.executor.submit(self._read, title, text)
+            self._next += 1
+
+    def wait(self, title: str) -> None:
+        """Wait for the files of a page about to be processed, reading ahead of it."""
+        self._fill()
+        future = self._pending.pop(title, None)
+        if future is None:
+            return
+        self._consumed += 1
+        start = time.perf_counter()
+        try:
+            self.files += future.result()
+        except Exception:
+            # A failed read ahead only means the processors read the file themselves
+            pass
+        self.waited += time.perf_counter() - start
+
+    def close(self) -> None:
+        """Drop the reads still queued and stop the threads."""
+        for future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+        self.executor.shutdown(wait=True)
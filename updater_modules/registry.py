@@ -0,0 +1,268 @@
+#!/usr/bin/env python
+
+import os
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .item_orchestrator import orchestrate_item, prefetch_item_paths
+from .tile_orchestrator import orchestrate_tile, prefetch_tile_paths
+from .fluid_orchestrator import orchestrate_fluid, prefetch_fluid_paths
+from .vehicle_orchestrator import orchestrate_vehicle, prefetch_vehicle_paths
+from .tag_orchestrator import orchestrate_tag
+from .item.file_utils import is_directory, list_directory
+
+
+class OrchestratorPlugin:
+    """
+    One orchestrator and everything the run needs to know about it.
+
+    Args:
+        name: Category name, also used for stage names and progress bars
+        pattern: Regex marking a page for this orchestrator, or None if its
+            pages are not found by searching page text
+        template: Infobox template transcluded by the plugin's pages, if any
+        subtrees: Parser output directories the orchestrator reads, relative
+            to parser_output_path; "{lang}" expands to every language folder
+        uses_history: Whether the orchestrator reads history_path
+        template_scan: Whether the plugin's pages come from the tag template files
+        entry: Callable (title, text, language_code, settings) returning
+            (new_text, processes), or None when the page should be left alone
+        prefetch: Callable (title, text, language_code, settings) returning the
+            parser files the entry is likely to read, for reading them ahead
+    """
+
+    def __init__(
+        self,
+        name: str,
+        pattern: Optional[str],
+        entry: Callable[[str, str, str, Dict], Optional[Tuple[str, List[str]]]],
+        template: Optional[str] = None,
+        subtrees: Tuple[str, ...] = (),
+        uses_history: bool = False,
+        template_scan: bool = False,
+        prefetch: Optional[Callable[[str, str, str, Dict], List[str]]] = None,
+    ):
+        self.name = name
+        self.pattern = pattern
+        self.entry = entry
+        self.template = template
+        self.subtrees = subtrees
+        self.uses_history = uses_history
+        self.template_scan = template_scan
+        self.prefetch = prefetch
+        self.enabled = True
+
+
+# Registered plugins, in processing and saving order
+PLUGINS: Dict[str, OrchestratorPlugin] = {}
+
+
+def register(plugin: OrchestratorPlugin) -> OrchestratorPlugin:
+    PLUGINS[plugin.name] = plugin
+    return plugin
+
+
+def set_enabled(name: str, enabled: bool) -> None:
+    if name in PLUGINS:
+        PLUGINS[name].enabled = enabled
+
+
+def enabled_plugins() -> List[OrchestratorPlugin]:
+    return [plugin for plugin in PLUGINS.values() if plugin.enabled]
+
+
+def get_plugin(name: str) -> Optional[OrchestratorPlugin]:
+    """Return the plugin for a category if it is registered and enabled."""
+    plugin = PLUGINS.get(name)
+    return plugin if plugin is not None and plugin.enabled else None
+
+
+def category_names() -> List[str]:
+    """Names of the enabled categories, in processing order."""
+    return [plugin.name for plugin in enabled_plugins()]
+
+
+def search_patterns() -> Dict[str, str]:
+    """Page text patterns of the enabled plugins that are found by searching."""
+    return {
+        plugin.name: plugin.pattern
+        for plugin in enabled_plugins()
+        if plugin.pattern is not None
+    }
+
+
+def template_scan_enabled() -> bool:
+    return any(plugin.template_scan for plugin in enabled_plugins())
+
+
+def index_roots(parser_output_path: str, history_path: str) -> List[str]:
+    """
+    Parser output directories read by the enabled plugins, for the parser index.
+
+    Args:
+        parser_output_path: Path to the parser output
+        history_path: Path to the history files
+
+    Returns:
+        Existing directories to index
+    """
+    try:
+        languages = sorted(
+            entry
+            for entry in list_directory(parser_output_path)
+            if is_directory(os.path.join(parser_output_path, entry))
+        )
+    except OSError:
+        languages = []
+
+    roots = []
+    for plugin in enabled_plugins():
+        for subtree in plugin.subtrees:
+            if "{lang}" in subtree:
+                paths = [subtree.format(lang=lang) for lang in languages]
+            else:
+                paths = [subtree]
+            for path in paths:
+                root = os.path.join(parser_output_path, path)
+                if root not in roots and is_directory(root):
+                    roots.append(root)
+        if plugin.uses_history and history_path not in roots:
+            roots.append(history_path)
+    return roots
+
+
+# --------------------------------------------------------------------------
+# Built-in orchestrators
+# --------------------------------------------------------------------------
+# Vehicle parts (orchestrate_part) and modding pages have no implementation
+# yet, so they are not registered and their pages are not searched for.
+
+
+def _item_entry(title, text, language_code, settings):
+    return orchestrate_item(
+        text,
+        settings["parser_output_path"],
+        settings["history_path"],
+        language_code,
+        title,
+        settings.get("features"),
+    )
+
+
+def _item_prefetch(title, text, language_code, settings):
+    return prefetch_item_paths(
+        text, settings["parser_output_path"], settings["history_path"], language_code, title
+    )
+
+
+def _tile_entry(title, text, language_code, settings):
+    return orchestrate_tile(
+        text,
+        settings["parser_output_path"],
+        settings["history_path"],
+        language_code,
+        settings.get("features"),
+    )
+
+
+def _tile_prefetch(title, text, language_code, settings):
+    return prefetch_tile_paths(
+        text, settings["parser_output_path"], settings["history_path"], language_code
+    )
+
+
+def _vehicle_entry(title, text, language_code, settings):
+    return orchestrate_vehicle(
+        text,
+        settings["parser_output_path"],
+        settings["history_path"],
+        language_code,
+        title,
+    )
+
+
+def _vehicle_prefetch(title, text, language_code, settings):
+    return prefetch_vehicle_paths(
+        text, settings["parser_output_path"], settings["history_path"], language_code, title
+    )
+
+
+def _fluid_entry(title, text, language_code, settings):
+    new_text, processes, was_edited = orchestrate_fluid(
+        text,
+        settings["parser_output_path"],
+        settings["history_path"],
+        language_code,
+        settings.get("features"),
+    )
+    return (new_text, processes) if was_edited else None
+
+
+def _fluid_prefetch(title, text, language_code, settings):
+    return prefetch_fluid_paths(
+        text, settings["parser_output_path"], settings["history_path"], language_code
+    )
+
+
+def _tag_entry(title, text, language_code, settings):
+    new_text, processes, was_edited = orchestrate_tag(
+        text,
+        settings["parser_output_path"],
+        settings["history_path"],
+        language_code,
+        settings["current_version"],
+        title,
+        settings.get("features"),
+    )
+    return (new_text, processes) if was_edited else None
+
+
+register(
+    OrchestratorPlugin(
+        "item",
+        r"\{\{Infobox\s*item",
+        _item_entry,
+        template="Template:Infobox item",
+        subtrees=("{lang}/item", "{lang}/fixing", "recipes", "evolved_recipes"),
+        uses_history=True,
+        prefetch=_item_prefetch,
+    )
+)
+register(
+    OrchestratorPlugin(
+        "tile",
+        r"\{\{Infobox\s*tile",
+        _tile_entry,
+        template="Template:Infobox tile",
+        subtrees=("{lang}/tiles",),
+        prefetch=_tile_prefetch,
+    )
+)
+register(
+    OrchestratorPlugin(
+        "vehicle",
+        r"\{\{Infobox\s*vehicle(?!\s+part)",
+        _vehicle_entry,
+        template="Template:Infobox vehicle",
+        subtrees=("{lang}/vehicle",),
+        prefetch=_vehicle_prefetch,
+    )
+)
+register(
+    OrchestratorPlugin(
+        "fluid",
+        r"\{\{Infobox\s*fluid",
+        _fluid_entry,
+        template="Template:Infobox fluid",
+        subtrees=("{lang}/fluid_infoboxes",),
+        prefetch=_fluid_prefetch,
+    )
+)
+register(
+    OrchestratorPlugin(
+        "tag",
+        None,
+        _tag_entry,
+        subtrees=("{lang}/tags",),
+        template_scan=True,
+    )
+)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+
+import asyncio
+import concurrent.futures
+import time
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+
+class Stage:
+    """
+    One step of a run.
+
+    Args:
+        name: Unique stage name
+        func: Callable taking a dict of dependency results by stage name
+        deps: Names of the stages that must finish first
+        kind: "io" for network/disk bound stages, "cpu" for processing stages
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[Dict[str, Any]], Any],
+        deps: Iterable[str] = (),
+        kind: str = "cpu",
+    ):
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+        self.kind = kind
+
+
+def _check_graph(stages: List[Stage]) -> None:
+    """Raise ValueError on duplicate names, unknown dependencies or cycles."""
+    by_name = {}
+    for stage in stages:
+        if stage.name in by_name:
+            raise ValueError(f"Duplicate stage: {stage.name}")
+        by_name[stage.name] = stage
+
+    for stage in stages:
+        for dep in stage.deps:
+            if dep not in by_name:
+                raise ValueError(f"Stage {stage.name} depends on unknown stage {dep}")
+
+    visiting, done = set(), set()
+
+    def visit(name, chain):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"Stage cycle: {' -> '.join(chain + [name])}")
+        visiting.add(name)
+        for dep in by_name[name].deps:
+            visit(dep, chain + [name])
+        visiting.discard(name)
+        done.add(name)
+
+    for stage in stages:
+        visit(stage.name, [])
+
+
+async def run_stages(
+    stages: List[Stage], cpu_workers: int = 4, io_workers: int = 8
+) -> Tuple[Dict[str, Any], Dict[str, Tuple[float, float]]]:
+    """
+    Run stages as soon as their dependencies finish.
+
+    IO stages and CPU stages run on separate thread pools, so network-bound
+    stages overlap with processing instead of waiting behind it.
+
+    Args:
+        stages: Stages to run
+        cpu_workers: Threads for CPU stages
+        io_workers: Threads for IO stages
+
+    Returns:
+        Tuple containing:
+        - Dictionary of stage results by name
+        - Dictionary of (start, end) times by name, relative to the run start
+    """
+    _check_graph(stages)
+
+    loop = asyncio.get_running_loop()
+    results = {}
+    timings = {}
+    tasks = {}
+    run_start = time.perf_counter()
+
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=cpu_workers
+    ) as cpu_pool, concurrent.futures.ThreadPoolExecutor(
+        max_workers=io_workers
+    ) as io_pool:
+
+        async def run(stage: Stage):
+            if stage.deps:
+                await asyncio.gather(*(tasks[dep] for dep in stage.deps))
+            inputs = {dep: results[dep] for dep in stage.deps}
+            pool = io_pool if stage.kind == "io" else cpu_pool
+
+            start = time.perf_counter() - run_start
+            try:
+                results[stage.name] = await loop.run_in_executor(
+                    pool, stage.func, inputs
+                )
+            finally:
+                timings[stage.name] = (start, time.perf_counter() - run_start)
+
+        for stage in stages:
+            tasks[stage.name] = asyncio.ensure_future(run(stage))
+        try:
+            await asyncio.gather(*tasks.values())
+        except Exception:
+            for task in tasks.values():
+                task.cancel()
+            raise
+
+    return results, timings
+
+
+def critical_path(
+    stages: List[Stage], timings: Dict[str, Tuple[float, float]]
+) -> List[str]:
+    """
+    Trace the chain of stages that determined the total run time.
+
+    Starting from the stage that finished last, repeatedly step to the
+    dependency that finished last, since that one gated the stage's start.
+    """
+    by_name = {stage.name: stage for stage in stages}
+    current = max(timings, key=lambda name: timings[name][1])
+    path = [current]
+    while by_name[current].deps:
+        current = max(by_name[current].deps, key=lambda name: timings[name][1])
+        path.append(current)
+    return list(reversed(path))
+
+
+def print_stage_report(
+    stages: List[Stage], timings: Dict[str, Tuple[float, float]]
+) -> None:
+    """Print per-stage timings and the critical path."""
+    path = critical_path(stages, timings)
+
+    print(f"\n{'Stage':<20}{'Kind':<6}{'Start':>10}{'End':>10}{'Seconds':>10}")
+    for stage in sorted(stages, key=lambda s: timings[s.name][0]):
+        start, end = timings[stage.name]
+        marker = " *" if stage.name in path else ""
+        print(
+            f"{stage.name:<20}{stage.kind:<6}{start:>10.1f}{end:>10.1f}"
+            f"{end - start:>10.1f}{marker}"
+        )
+
+    total = timings[path[-1]][1]
+    busy = sum(timings[name][1] - timings[name][0] for name in path)
+    print(f"Critical path: {' -> '.join(path)} ({busy:.1f}s busy of {total:.1f}s)")
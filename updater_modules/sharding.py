@@ -0,0 +1,401 @@
+#!/usr/bin/env python
+
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+def shard_of(title: str, shard_count: int) -> int:
+    """
+    Assign a page title to a shard.
+
+    Uses a cryptographic hash rather than hash(), which is salted per process,
+    so every worker on every host agrees on the assignment.
+    """
+    digest = hashlib.blake2b(title.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % shard_count
+
+
+def worker_name() -> str:
+    """Identify this worker process across hosts."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class ShardQueue:
+    """
+    SQLite-backed work queue of shards plus a shared result queue.
+
+    Workers claim pending shards, push the page updates they compute as
+    results, and record their progress. A single saver drains the results so
+    edits still go out at one place under one rate limit. The database can
+    live on any filesystem every worker can reach with working file locks.
+
+    A claim is a lease: the worker keeps it alive through the shard's
+    updated time, and a running shard not updated for longer than the lease
+    is taken to have lost its worker and can be claimed again. A failed
+    shard is claimed again until it has been attempted max_attempts times.
+
+    Args:
+        db_path: Path to the SQLite database, created if missing
+        run_id: Name of the run, e.g. the game version being synced
+        shard_count: Number of shards the run is split into
+        lease: Seconds a running shard may go without an update
+        max_attempts: Claims of a shard before a failure is final
+    """
+
+    def __init__(
+        self, db_path: str, run_id: str, shard_count: int, lease: float = 600, max_attempts: int = 3
+    ):
+        self.db_path = db_path
+        self.run_id = run_id
+        self.shard_count = shard_count
+        self.lease = lease
+        self.max_attempts = max(1, max_attempts)
+        self.conn = sqlite3.connect(db_path, timeout=60, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS shards (
+                run_id TEXT NOT NULL,
+                shard_index INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                worker TEXT,
+                pages INTEGER NOT NULL DEFAULT 0,
+                processed INTEGER NOT NULL DEFAULT 0,
+                edits INTEGER NOT NULL DEFAULT 0,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                started REAL,
+                updated REAL,
+                finished REAL,
+                PRIMARY KEY (run_id, shard_index)
+            );
+            CREATE TABLE IF NOT EXISTS results (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id TEXT NOT NULL,
+                shard_index INTEGER NOT NULL,
+                title TEXT NOT NULL,
+                new_text TEXT NOT NULL,
+                processes TEXT NOT NULL,
+                saved INTEGER NOT NULL DEFAULT 0,
+                old_text TEXT,
+                category TEXT
+            );
+            CREATE INDEX IF NOT EXISTS results_pending ON results (run_id, saved);
+            """
+        )
+        # Databases created before results kept the page text and category,
+        # and before shards counted their attempts
+        for table, column, definition in (
+            ("results", "old_text", "TEXT"),
+            ("results", "category", "TEXT"),
+            ("shards", "attempts", "INTEGER NOT NULL DEFAULT 0"),
+        ):
+            columns = {row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+            if column not in columns:
+                try:
+                    self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+                except sqlite3.OperationalError:
+                    # Added by another worker starting at the same time
+                    pass
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO shards (run_id, shard_index) VALUES (?, ?)",
+            [(run_id, index) for index in range(shard_count)],
+        )
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def claim(self, worker: str, shard_index: Optional[int] = None) -> Optional[int]:
+        """
+        Claim a pending shard, a failed one with attempts left, or a running
+        one whose lease has expired.
+
+        Args:
+            worker: Name of the claiming worker
+            shard_index: Specific shard to claim, or None for the next pending one
+
+        Returns:
+            The claimed shard index, or None if nothing is left to claim
+        """
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            if shard_index is None:
+                # Pending shards first, then failed ones, then those of workers that stopped updating
+                row = self.conn.execute(
+                    "SELECT shard_index FROM shards WHERE run_id = ? AND (status = 'pending' "
+                    "OR (status = 'failed' AND attempts < ?) "
+                    "OR (status = 'running' AND updated < ?)) "
+                    "ORDER BY CASE status WHEN 'pending' THEN 0 WHEN 'failed' THEN 1 ELSE 2 END, "
+                    "shard_index LIMIT 1",
+                    (self.run_id, self.max_attempts, now - self.lease),
+                ).fetchone()
+            else:
+                # An explicitly assigned shard may be re-run after a crash
+                row = self.conn.execute(
+                    "SELECT shard_index FROM shards WHERE run_id = ? AND shard_index = ? "
+                    "AND status != 'done'",
+                    (self.run_id, shard_index),
+                ).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+
+            self.conn.execute(
+                "UPDATE shards SET status = 'running', worker = ?, processed = 0, "
+                "edits = 0, attempts = attempts + 1, started = ?, updated = ?, finished = NULL "
+                "WHERE run_id = ? AND shard_index = ?",
+                (worker, now, now, self.run_id, row[0]),
+            )
+            # Drop unsaved results of an earlier attempt at this shard
+            self.conn.execute(
+                "DELETE FROM results WHERE run_id = ? AND shard_index = ? AND saved = 0",
+                (self.run_id, row[0]),
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return row[0]
+
+    def set_pages(self, shard_index: int, pages: int) -> None:
+        self.conn.execute(
+            "UPDATE shards SET pages = ?, updated = ? WHERE run_id = ? AND shard_index = ?",
+            (pages, time.time(), self.run_id, shard_index),
+        )
+
+    def heartbeat(self, shard_index: int, worker: str) -> "ShardHeartbeat":
+        """Keep a worker's lease on a shard while the returned context is open."""
+        return ShardHeartbeat(self.db_path, self.run_id, shard_index, worker, self.lease / 4)
+
+    def push_results(self, shard_index: int, worker: str, processed: int, updates: List[Dict]) -> bool:
+        """
+        Queue page updates for saving and advance the shard's progress.
+
+        Returns:
+            False, with nothing queued, if the worker no longer holds the shard
+        """
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = self.conn.execute(
+                "UPDATE shards SET processed = processed + ?, edits = edits + ?, "
+                "updated = ? WHERE run_id = ? AND shard_index = ? AND worker = ? "
+                "AND status = 'running'",
+                (processed, len(updates), time.time(), self.run_id, shard_index, worker),
+            )
+            if cursor.rowcount == 0:
+                self.conn.execute("ROLLBACK")
+                return False
+            self.conn.executemany(
+                "INSERT INTO results (run_id, shard_index, title, new_text, processes, "
+                "old_text, category) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        self.run_id,
+                        shard_index,
+                        update["title"],
+                        update["new_text"],
+                        json.dumps(update["processes"]),
+                        update.get("old_text"),
+                        update.get("category"),
+                    )
+                    for update in updates
+                ],
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return True
+
+    def finish(self, shard_index: int, worker: str, failed: bool = False) -> bool:
+        """
+        Mark a shard done or failed.
+
+        Returns:
+            False if the worker no longer holds the shard
+        """
+        cursor = self.conn.execute(
+            "UPDATE shards SET status = ?, finished = ?, updated = ? "
+            "WHERE run_id = ? AND shard_index = ? AND worker = ? AND status = 'running'",
+            (
+                "failed" if failed else "done",
+                time.time(),
+                time.time(),
+                self.run_id,
+                shard_index,
+                worker,
+            ),
+        )
+        return cursor.rowcount > 0
+
+    def take_results(self, limit: int = 50) -> List[Dict]:
+        """Return the oldest unsaved results, without marking them saved."""
+        rows = self.conn.execute(
+            "SELECT id, title, new_text, processes, old_text, category FROM results "
+            "WHERE run_id = ? AND saved = 0 ORDER BY id LIMIT ?",
+            (self.run_id, limit),
+        ).fetchall()
+        return [
+            {
+                "id": row[0],
+                "title": row[1],
+                "new_text": row[2],
+                "processes": json.loads(row[3]),
+                "old_text": row[4],
+                "category": row[5],
+            }
+            for row in rows
+        ]
+
+    def mark_saved(self, result_ids: List[int]) -> None:
+        self.conn.executemany(
+            "UPDATE results SET saved = 1 WHERE id = ?", [(i,) for i in result_ids]
+        )
+
+    def unfinished_count(self) -> int:
+        """Number of shards pending, running, or failed with attempts left."""
+        row = self.conn.execute(
+            "SELECT COUNT(*) FROM shards WHERE run_id = ? "
+            "AND (status IN ('pending', 'running') OR (status = 'failed' AND attempts < ?))",
+            (self.run_id, self.max_attempts),
+        ).fetchone()
+        return row[0]
+
+    def all_finished(self) -> bool:
+        """True once no shard is pending, running or waiting for a retry."""
+        return self.unfinished_count() == 0
+
+    def failed_shards(self) -> List[Dict]:
+        """Shards that failed on their last allowed attempt, with their worker."""
+        rows = self.conn.execute(
+            "SELECT shard_index, worker, attempts, pages FROM shards WHERE run_id = ? "
+            "AND status = 'failed' AND attempts >= ? ORDER BY shard_index",
+            (self.run_id, self.max_attempts),
+        ).fetchall()
+        return [{"shard": row[0], "worker": row[1], "attempts": row[2], "pages": row[3]} for row in rows]
+
+    def stalled_shards(self) -> List[Dict]:
+        """Running shards whose lease has expired, with their worker and idle seconds."""
+        now = time.time()
+        rows = self.conn.execute(
+            "SELECT shard_index, worker, updated FROM shards WHERE run_id = ? "
+            "AND status = 'running' AND updated < ? ORDER BY shard_index",
+            (self.run_id, now - self.lease),
+        ).fetchall()
+        return [{"shard": row[0], "worker": row[1], "idle": now - row[2]} for row in rows]
+
+    def shard_rows(self) -> List[Dict]:
+        cursor = self.conn.execute(
+            "SELECT s.shard_index, s.status, s.worker, s.pages, s.processed, s.edits, "
+            "s.started, s.updated, s.finished, "
+            "(SELECT COUNT(*) FROM results r WHERE r.run_id = s.run_id "
+            "AND r.shard_index = s.shard_index AND r.saved = 1) "
+            "FROM shards s WHERE s.run_id = ? ORDER BY s.shard_index",
+            (self.run_id,),
+        )
+        columns = [
+            "shard",
+            "status",
+            "worker",
+            "pages",
+            "processed",
+            "edits",
+            "started",
+            "updated",
+            "finished",
+            "saved",
+        ]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+class ShardHeartbeat:
+    """
+    Keeps a worker's lease on its shard alive from a background thread.
+
+    Long phases without progress updates, like loading the wiki cache, would
+    otherwise let the lease expire under a working worker. The thread uses
+    its own connection, as SQLite connections stay in the thread that made
+    them.
+
+    Args:
+        db_path: Path to the shard database
+        run_id: Name of the run
+        shard_index: The claimed shard
+        worker: Name of the worker holding it
+        interval: Seconds between updates
+    """
+
+    def __init__(self, db_path: str, run_id: str, shard_index: int, worker: str, interval: float):
+        self.db_path = db_path
+        self.run_id = run_id
+        self.shard_index = shard_index
+        self.worker = worker
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name=f"shard-{shard_index}-heartbeat", daemon=True
+        )
+
+    def _run(self) -> None:
+        conn = sqlite3.connect(self.db_path, timeout=60, isolation_level=None)
+        try:
+            while not self._stop.wait(self.interval):
+                try:
+                    conn.execute(
+                        "UPDATE shards SET updated = ? WHERE run_id = ? AND shard_index = ? "
+                        "AND worker = ? AND status = 'running'",
+                        (time.time(), self.run_id, self.shard_index, self.worker),
+                    )
+                except sqlite3.Error as e:
+                    print(f"Could not renew the lease on shard {self.shard_index}: {e}")
+        finally:
+            conn.close()
+
+    def __enter__(self) -> "ShardHeartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def print_shard_report(queue: ShardQueue) -> None:
+    """Print per-shard progress and the merged totals of the run."""
+    rows = queue.shard_rows()
+    print(f"\nRun {queue.run_id}: {queue.shard_count} shards")
+    print(
+        f"{'Shard':<7}{'Status':<10}{'Worker':<24}{'Pages':>8}{'Done':>8}"
+        f"{'Edits':>8}{'Saved':>8}{'Seconds':>10}"
+    )
+    stale_before = time.time() - queue.lease
+    for row in rows:
+        seconds = 0.0
+        if row["started"]:
+            seconds = (row["finished"] or row["updated"]) - row["started"]
+        status = row["status"]
+        if status == "running" and row["updated"] < stale_before:
+            status = "stalled"
+        print(
+            f"{row['shard']:<7}{status:<10}{(row['worker'] or '-'):<24}"
+            f"{row['pages']:>8}{row['processed']:>8}{row['edits']:>8}"
+            f"{row['saved']:>8}{seconds:>10.1f}"
+        )
+
+    started = [row["started"] for row in rows if row["started"]]
+    ended = [row["finished"] or row["updated"] for row in rows if row["started"]]
+    wall = max(ended) - min(started) if started else 0.0
+    pages = sum(row["pages"] for row in rows)
+    print(
+        f"{'Total':<41}{pages:>8}{sum(row['processed'] for row in rows):>8}"
+        f"{sum(row['edits'] for row in rows):>8}{sum(row['saved'] for row in rows):>8}"
+        f"{wall:>10.1f}"
+    )
+    if wall:
+        print(f"Merged throughput: {pages / wall:.1f} pages/s")
@@ -1,6 +1,8 @@
 import os
-import re
 from typing import List, Tuple, Optional
+from ..item.file_utils import read_parser_file
+from ..diagnostics import record_event
+from ..patterns import TAG_PAGE_VERSION, TAG_SUFFIX, TAG_TABLE
 
 
 def process_tag_article(
@@ -27,25 +29,27 @@ def process_tag_article(
     processes = []
 
     # Update the page version template
-    version_pattern = r"{{Page version\|(.*?)(?:\||}})"
-    if re.search(version_pattern, text):
-        text = re.sub(version_pattern, f"{{{{Page version|{version}}}}}", text)
+    if TAG_PAGE_VERSION.search(text):
+        text = TAG_PAGE_VERSION.sub(f"{{{{Page version|{version}}}}}", text)
         processes.append("Updated page version")
 
     # Find and replace the wikitable
-    table_pattern = r"\{\| class=\"wikitable theme-blue sortable\" style=\"text-align: center;\".*?\|\}"
-    table_match = re.search(table_pattern, text, re.DOTALL)
+    table_match = TAG_TABLE.search(text)
 
     if table_match:
         article_name = get_article_name(title) if title else None
         if not article_name:
             if title:
-                print(
-                    f"Error: Failed to extract article name from title '{title}' - skipping tag table update"
+                record_event(
+                    "article_name_invalid",
+                    "tag.process_tag_article",
+                    language_code,
+                    title,
+                    "error",
                 )
             else:
-                print(
-                    f"Error: No title provided for tag processing - skipping tag table update"
+                record_event(
+                    "title_missing", "tag.process_tag_article", language_code, level="error"
                 )
             return text, processes
 
@@ -58,13 +62,12 @@ def process_tag_article(
         )
 
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                new_table = f.read().strip()
+            new_table = read_parser_file(file_path).strip()
             text = text[: table_match.start()] + new_table + text[table_match.end() :]
             processes.append("Updated tag table")
         except FileNotFoundError:
-            print(
-                f"Error: Tag data file not found: {file_path} - skipping tag table update"
+            record_event(
+                "tag_file_missing", "tag.process_tag_article", language_code, file_path
             )
 
     return text, processes
@@ -86,7 +89,7 @@ def get_article_name(input_text: str) -> Optional[str]:
 
     # Only process if this looks like a page title (short string without wiki markup)
     if len(input_text) > 200 or input_text.strip().startswith("{{"):
-        print(f"Error: Expected page title but received wiki text for tag processing")
+        record_event("title_is_wikitext", "tag.get_article_name", level="error")
         return None
 
     article_name = input_text.strip()
@@ -97,13 +100,15 @@ def get_article_name(input_text: str) -> Optional[str]:
 
     # Clean up the article name
     # Remove "(tag)" suffix (case insensitive)
-    article_name = re.sub(r"\s*\([Tt]ag\)\s*$", "", article_name)
+    article_name = TAG_SUFFIX.sub("", article_name)
 
     # Remove extra whitespace
     article_name = article_name.strip()
 
     if not article_name:
-        print(f"Error: Could not extract valid article name from title: {input_text}")
+        record_event(
+            "article_name_empty", "tag.get_article_name", detail=input_text, level="error"
+        )
         return None
 
     # Apply URL encoding for special characters (same as item/vehicle orchestrators)
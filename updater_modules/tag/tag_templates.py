@@ -2,6 +2,8 @@ import os
 import re
 from typing import List, Tuple, Dict, Optional
 import pywikibot
+from ..item.file_utils import read_parser_file
+from ..diagnostics import record_event
 
 
 def scan_and_update_templates(
@@ -70,7 +72,13 @@ def scan_and_update_templates(
             )
 
         except Exception as e:
-            print(f"Error processing template file {file_path}: {e}")
+            record_event(
+                "template_file_failed",
+                "tag.scan_and_update_templates",
+                language_code,
+                f"{file_path}: {e}",
+                "error",
+            )
             continue
 
     return update_queue
@@ -115,8 +123,7 @@ def process_tag_template(
     )
 
     try:
-        with open(template_file_path, "r", encoding="utf-8") as f:
-            new_content = f.read()
+        new_content = read_parser_file(template_file_path)
 
         # Check if content is different
         if new_content.strip() != text.strip():
@@ -126,12 +133,19 @@ def process_tag_template(
             return text, processes
 
     except FileNotFoundError:
-        print(
-            f"Error: Template file not found: {template_file_path} - skipping template update"
+        record_event(
+            "template_file_missing",
+            "tag.process_tag_template",
+            language_code,
+            template_file_path,
         )
         return text, processes
     except Exception as e:
-        print(
-            f"Error: Failed to read template file {template_file_path}: {e} - skipping template update"
+        record_event(
+            "template_file_failed",
+            "tag.process_tag_template",
+            language_code,
+            f"{template_file_path}: {e}",
+            "error",
         )
         return text, processes
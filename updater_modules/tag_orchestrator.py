@@ -3,6 +3,8 @@ import os
 
 from .tag.tag_articles import process_tag_article
 from .tag.tag_templates import process_tag_template
+from .watchdog import mark_processor
+from .features import PageFeatures, features_for
 
 
 def orchestrate_tag(
@@ -12,6 +14,7 @@ def orchestrate_tag(
     language_code: str,
     version: str,
     title: str = None,
+    features: Optional[PageFeatures] = None,
 ) -> Tuple[str, List[str], bool]:
     """
     Orchestrate the tag updates.
@@ -22,6 +25,8 @@ def orchestrate_tag(
         history_path: Path to the history files
         language_code: Language code for the page
         version: Current game version
+        features: Processor markers found while categorizing; the article
+            processor is skipped when the page has none of its markers
 
     Returns:
         Tuple containing:
@@ -33,15 +38,18 @@ def orchestrate_tag(
     was_edited = False
 
     # Process tag article
-    new_text, article_processes = process_tag_article(
-        text, parser_output_path, language_code, version, title
-    )
-    if article_processes:
-        processes.extend(article_processes)
-        was_edited = True
-        text = new_text
+    if features_for(text, features).has("tag_article"):
+        mark_processor("tag.process_tag_article")
+        new_text, article_processes = process_tag_article(
+            text, parser_output_path, language_code, version, title
+        )
+        if article_processes:
+            processes.extend(article_processes)
+            was_edited = True
+            text = new_text
 
     # Process tag template
+    mark_processor("tag.process_tag_template")
     new_text, template_processes = process_tag_template(
         text, parser_output_path, language_code, title
     )
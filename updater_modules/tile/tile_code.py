@@ -1,7 +1,8 @@
 #!/usr/bin/env python
 
-import re
-import os
+from ..item.file_utils import read_parser_file
+from .tile_index import tile_index
+from ..patterns import TILE_CODE_SECTION, TILE_CODESNIP, TILE_CODESNIP_SPRITE
 
 
 def extract_sprite_from_codesnip(codesnip):
@@ -15,7 +16,7 @@ def extract_sprite_from_codesnip(codesnip):
         str: The sprite value or None if not found
     """
     # Find the sprite value in the code
-    sprite_match = re.search(r'"sprite":\s*"([^"]+)"', codesnip)
+    sprite_match = TILE_CODESNIP_SPRITE.search(codesnip)
     if sprite_match:
         sprite = sprite_match.group(1)
         return sprite
@@ -23,7 +24,7 @@ def extract_sprite_from_codesnip(codesnip):
 
 
 def process_code(
-    text, parser_output_path, infobox_name, sprite_ids, tile_ids, language_code
+    text, parser_output_path, infobox_name, sprite_ids, tile_ids, language_code, start=0
 ):
     """
     Process the tile code section.
@@ -35,20 +36,21 @@ def process_code(
         sprite_ids (list): List of sprite IDs
         tile_ids (list): List of tile IDs
         language_code (str): Language code
+        start (int): Offset to search for the Code section from
 
     Returns:
         tuple: (updated_text, changed)
     """
 
     # Find the Code section
-    code_section_match = re.search(r"==Code==\s*(.*?)(?=\n==|\Z)", text, re.DOTALL)
+    code_section_match = TILE_CODE_SECTION.search(text, start)
     if not code_section_match:
         return text, False
 
     code_section = code_section_match.group(1)
 
     # Find all code snippets
-    codesnips = re.finditer(r"{{CodeSnip(.*?)}}", code_section, re.DOTALL)
+    codesnips = TILE_CODESNIP.finditer(code_section)
 
     updated_section = code_section
     changed = False
@@ -59,14 +61,13 @@ def process_code(
         sprite = extract_sprite_from_codesnip(codesnip_text)
 
         if sprite:
-            # Construct the file path
-            file_path = os.path.join(
-                parser_output_path, language_code, "tiles", "codesnips", f"{sprite}.txt"
-            )
+            # The index knows which sprites have a codesnip file
+            file_path = tile_index.codesnip_path(parser_output_path, language_code, sprite)
+            if file_path is None:
+                continue
 
             try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    file_content = f.read().strip()
+                file_content = read_parser_file(file_path).strip()
 
                 # Replace the codesnip with the file content
                 updated_section = updated_section.replace(codesnip_text, file_content)
@@ -1,7 +1,9 @@
 #!/usr/bin/env python
 
-import re
 import os
+from ..item.file_utils import read_parser_file
+from .tile_index import tile_index
+from ..patterns import tile_section
 
 def find_table_boundaries(text, section_header):
     """
@@ -16,7 +18,7 @@ def find_table_boundaries(text, section_header):
     """
     
     # Find the section
-    section_match = re.search(f'{re.escape(section_header)}\\s*(.*?)(?=\\n==|\\Z)', text, re.DOTALL)
+    section_match = tile_section(section_header).search(text)
     if not section_match:
         return None, None
         
@@ -56,6 +58,10 @@ def process_crafting(text, parser_output_path, infobox_name, sprite_ids, tile_id
         tuple: (updated_text, changed)
     """
     
+    # Resolve the infobox file, by sprite or tile ID if the page was renamed
+    infobox_name = tile_index.resolve_infobox(
+        parser_output_path, language_code, infobox_name, sprite_ids, tile_ids
+    )
     if not infobox_name:
         return text, False
         
@@ -63,7 +69,9 @@ def process_crafting(text, parser_output_path, infobox_name, sprite_ids, tile_id
     updated_text = text
     
     # Process Breakage section
-    if "===Breakage===" in text:
+    if "===Breakage===" in text and tile_index.has_crafting(
+        parser_output_path, language_code, f'{infobox_name}_breakage'
+    ):
         breakage_file = os.path.join(
             parser_output_path,
             language_code,
@@ -73,9 +81,8 @@ def process_crafting(text, parser_output_path, infobox_name, sprite_ids, tile_id
         )
         
         try:
-            with open(breakage_file, 'r', encoding='utf-8') as f:
-                breakage_content = f.read().strip()
-                
+            breakage_content = read_parser_file(breakage_file).strip()
+
             start, end = find_table_boundaries(text, "===Breakage===")
             if start is not None and end is not None:
                 updated_text = updated_text[:start] + breakage_content + updated_text[end:]
@@ -84,7 +91,9 @@ def process_crafting(text, parser_output_path, infobox_name, sprite_ids, tile_id
             pass
             
     # Process Dismantling section
-    if "===Dismantling===" in text:
+    if "===Dismantling===" in text and tile_index.has_crafting(
+        parser_output_path, language_code, f'{infobox_name}_scrapping'
+    ):
         dismantling_file = os.path.join(
             parser_output_path,
             language_code,
@@ -94,8 +103,7 @@ def process_crafting(text, parser_output_path, infobox_name, sprite_ids, tile_id
         )
         
         try:
-            with open(dismantling_file, 'r', encoding='utf-8') as f:
-                dismantling_content = f.read().strip()
+            dismantling_content = read_parser_file(dismantling_file).strip()
 
             start, end = find_table_boundaries(text, "===Dismantling===")
             if start is not None and end is not None:
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..item.file_utils import is_directory, list_directory, read_parser_file
+from ..patterns import TILE_SPRITE_ID, TILE_TILE_ID
+
+
+def _stems(folder: str) -> List[str]:
+    """Names of the .txt files directly in a parser output folder, without extension."""
+    if not is_directory(folder):
+        return []
+    try:
+        names = list_directory(folder)
+    except OSError as e:
+        print(f"Could not list {folder}: {e}")
+        return []
+    return sorted(name[:-4] for name in names if name.endswith(".txt"))
+
+
+class TileIndex:
+    """
+    Reverse index of the tile parser output, per language.
+
+    Maps the sprite and tile IDs listed in tiles/infoboxes to the infobox
+    they belong to, and records which crafting tables and codesnips exist.
+    Built once per run, so a tile page whose title no longer matches its
+    infobox file is still found by its IDs, and a codesnip lookup is a set
+    membership test rather than a file probe per sprite.
+
+    Languages that are not indexed, or a different parser output path,
+    resolve by name as before.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.parser_output_path: Optional[str] = None
+        # language -> {"infoboxes", "sprites", "tiles", "crafting", "codesnips"}
+        self._languages: Dict[str, Dict] = {}
+
+    def refresh(self, parser_output_path: str, language_codes: Iterable[str]) -> Tuple[int, int]:
+        """
+        Rebuild the index from the parser output.
+
+        Infobox files are read through the shared content cache, so the
+        tile processors find them there afterwards.
+
+        Args:
+            parser_output_path: Path to the parser output files
+            language_codes: Languages to index
+
+        Returns:
+            (number of infoboxes, number of sprite and tile IDs indexed)
+        """
+        languages = {}
+        infoboxes = ids = 0
+        for language_code in language_codes:
+            tiles_dir = os.path.join(parser_output_path, language_code, "tiles")
+            entry = {
+                "infoboxes": set(),
+                "sprites": {},
+                "tiles": {},
+                "crafting": set(_stems(os.path.join(tiles_dir, "crafting"))),
+                "codesnips": set(_stems(os.path.join(tiles_dir, "codesnips"))),
+            }
+            for stem in _stems(os.path.join(tiles_dir, "infoboxes")):
+                file_path = os.path.join(tiles_dir, "infoboxes", f"{stem}.txt")
+                try:
+                    content = read_parser_file(file_path)
+                except (FileNotFoundError, OSError, UnicodeDecodeError):
+                    continue
+                entry["infoboxes"].add(stem)
+                # The first infobox listing an ID (by file name) keeps it
+                for pattern, ids_of in ((TILE_SPRITE_ID, entry["sprites"]), (TILE_TILE_ID, entry["tiles"])):
+                    for match in pattern.finditer(content):
+                        ids_of.setdefault(match.group(1).strip(), stem)
+            infoboxes += len(entry["infoboxes"])
+            ids += len(entry["sprites"]) + len(entry["tiles"])
+            languages[language_code] = entry
+
+        with self._lock:
+            self.parser_output_path = parser_output_path
+            self._languages = languages
+        return infoboxes, ids
+
+    def state(self) -> Tuple[Optional[str], Dict[str, Dict]]:
+        """The index, to hand to another process with load_state."""
+        with self._lock:
+            return self.parser_output_path, self._languages
+
+    def load_state(self, state: Tuple[Optional[str], Dict[str, Dict]]) -> None:
+        """Take over an index returned by state instead of refreshing from the parser output."""
+        with self._lock:
+            self.parser_output_path, self._languages = state
+
+    def _entry(self, parser_output_path: str, language_code: str) -> Optional[Dict]:
+        if parser_output_path != self.parser_output_path:
+            return None
+        return self._languages.get(language_code)
+
+    def resolve_infobox(
+        self,
+        parser_output_path: str,
+        language_code: str,
+        infobox_name: Optional[str],
+        sprite_ids: List[str],
+        tile_ids: List[str],
+    ) -> Optional[str]:
+        """
+        Name of the infobox file (without extension) a tile page belongs to.
+
+        Args:
+            parser_output_path: Path to parser output
+            language_code: Language code
+            infobox_name: Name from the page's infobox
+            sprite_ids: Sprite IDs from the page's infobox
+            tile_ids: Tile IDs from the page's infobox
+
+        Returns:
+            The page's own infobox name if its file exists (or the language is
+            not indexed), else the infobox holding one of its sprite or tile
+            IDs, else the page's own infobox name
+        """
+        entry = self._entry(parser_output_path, language_code)
+        if entry is None:
+            return infobox_name
+        if infobox_name and infobox_name in entry["infoboxes"]:
+            return infobox_name
+        for sprite_id in sprite_ids:
+            if sprite_id in entry["sprites"]:
+                return entry["sprites"][sprite_id]
+        for tile_id in tile_ids:
+            if tile_id in entry["tiles"]:
+                return entry["tiles"][tile_id]
+        return infobox_name
+
+    def has_crafting(self, parser_output_path: str, language_code: str, file_name: str) -> bool:
+        """Whether tiles/crafting holds a file, True when the language is not indexed."""
+        entry = self._entry(parser_output_path, language_code)
+        return entry is None or file_name in entry["crafting"]
+
+    def codesnip_path(self, parser_output_path: str, language_code: str, sprite: str) -> Optional[str]:
+        """Path of a sprite's codesnip file, None if the index knows there is none."""
+        entry = self._entry(parser_output_path, language_code)
+        if entry is not None and sprite not in entry["codesnips"]:
+            return None
+        return os.path.join(parser_output_path, language_code, "tiles", "codesnips", f"{sprite}.txt")
+
+
+# Index shared by the whole run
+tile_index = TileIndex()
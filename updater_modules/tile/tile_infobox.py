@@ -1,7 +1,9 @@
 #!/usr/bin/env python
 
-import re
 import os
+from ..item.file_utils import read_parser_file
+from .tile_index import tile_index
+from ..patterns import TILE_IMAGE_KEY, TILE_INFOBOX_BLOCK, TILE_INFOBOX_PARAM, dynamic
 
 # --------------------------------------------------------------------------
 # Constants
@@ -29,7 +31,7 @@ def parse_infobox(infobox_text):
     infobox_params = {}
     lines = infobox_text.split('\n')
     for line in lines:
-        match = re.match(r'\|\s*([^=]+)\s*=\s*(.*)', line)
+        match = TILE_INFOBOX_PARAM.match(line)
         if match:
             key = match.group(1).strip()
             value = match.group(2).strip()
@@ -43,7 +45,7 @@ def ensure_icon_naming_convention(params):
 
     for key, value in params.items():
         # Replace imageX with iconX
-        image_match = re.match(r'^image(\d*)$', key)
+        image_match = TILE_IMAGE_KEY.match(key)
         if image_match:
             index = image_match.group(1)
             new_key = f"icon{index}"
@@ -76,7 +78,7 @@ def update_infobox(page_params, local_params):
 
     for key, local_value in local_params.items():
         # Skip excluded parameters
-        if any(re.match(pattern, key) for pattern in EXCLUDED_PARAMS):
+        if any(dynamic("tile.excluded_param", pattern).match(key) for pattern in EXCLUDED_PARAMS):
             continue
 
         # Update if parameter is missing or different
@@ -111,12 +113,15 @@ def process_infobox(text, parser_output_path, language_code, infobox_name, sprit
     """
     
     # Find the infobox block
-    match = re.search(r'(\{\{Infobox\s*tile[\s\S]*?\n\}\})', text, re.IGNORECASE)
+    match = TILE_INFOBOX_BLOCK.search(text)
     if not match:
         return text, False
     infobox_block = match.group(1)
 
-    # Check if infobox name is provided
+    # Resolve the infobox file, by sprite or tile ID if the page was renamed
+    infobox_name = tile_index.resolve_infobox(
+        parser_output_path, language_code, infobox_name, sprite_ids, tile_ids
+    )
     if not infobox_name:
         return text, False
 
@@ -133,8 +138,7 @@ def process_infobox(text, parser_output_path, language_code, infobox_name, sprit
     )
     
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            file_lines = [ln.strip() for ln in f if ln.strip()]
+        file_lines = [ln.strip() for ln in read_parser_file(file_path).split('\n') if ln.strip()]
     except FileNotFoundError:
         return text, False
 
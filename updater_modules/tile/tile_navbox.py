@@ -1,7 +1,10 @@
 #!/usr/bin/env python
 
-def process_navbox(text):
+from ..navbox_index import render_navboxes
+
+
+def process_navbox(text, language_code):
     """
-    Purely a placeholder for now
+    Render the navboxes between navbox bot flags from the navbox index.
     """
-    return text, False
+    return render_navboxes(text, "tile", language_code)
@@ -1,10 +1,20 @@
 #!/usr/bin/env python
 
-import re
+import os
 from scripts.userscripts.updater_modules.tile.tile_infobox import process_infobox # type: ignore
 from scripts.userscripts.updater_modules.tile.tile_crafting import process_crafting # type: ignore
 from scripts.userscripts.updater_modules.tile.tile_code import process_code # type: ignore
 from scripts.userscripts.updater_modules.tile.tile_navbox import process_navbox # type: ignore
+from scripts.userscripts.updater_modules.tile.tile_index import tile_index # type: ignore
+from scripts.userscripts.updater_modules.watchdog import mark_processor # type: ignore
+from scripts.userscripts.updater_modules.features import features_for # type: ignore
+from scripts.userscripts.updater_modules.patterns import ( # type: ignore
+    TILE_CODESNIP_SPRITE,
+    TILE_INFOBOX_BODY,
+    TILE_NAME,
+    TILE_SPRITE_ID,
+    TILE_TILE_ID,
+)
 
 def extract_tile_identifiers(text):
     """
@@ -13,37 +23,64 @@ def extract_tile_identifiers(text):
         tuple: (infobox_name, sprite_ids, tile_ids)
     """
     # Find the infobox block
-    m = re.search(r'\{\{Infobox\s*tile(.*?)\}\}', text, re.DOTALL | re.IGNORECASE)
+    m = TILE_INFOBOX_BODY.search(text)
     if not m:
         return None, [], []
 
     infobox_body = m.group(1)
     
     # Extract infobox name
-    name_match = re.search(r'\|\s*name\s*=\s*([^\|\n]+)', infobox_body)
+    name_match = TILE_NAME.search(infobox_body)
     infobox_name = name_match.group(1).strip().replace(" ", "_") if name_match else None
 
     # Extract sprite IDs
     sprite_ids = []
-    sprite_pattern = r'\|\s*sprite_id(?:\d+)?\s*=\s*([^\|\n]+)'
-    for match in re.finditer(sprite_pattern, infobox_body):
+    for match in TILE_SPRITE_ID.finditer(infobox_body):
         sprite_ids.append(match.group(1).strip())
 
     # Extract tile IDs
     tile_ids = []
-    tile_pattern = r'\|\s*tile_id(?:\d+)?\s*=\s*([^\|\n]+)'
-    for match in re.finditer(tile_pattern, infobox_body):
+    for match in TILE_TILE_ID.finditer(infobox_body):
         tile_ids.append(match.group(1).strip())
 
     return infobox_name, sprite_ids, tile_ids
 
-def orchestrate_tile(text, parser_output_path, history_path, language_code):
+def prefetch_tile_paths(text, parser_output_path, history_path, language_code):
+    """
+    Parser files the tile processors are likely to read for a page, for the prefetcher.
+
+    Returns:
+        list[str]: Candidate paths
+    """
+    infobox_name, sprite_ids, tile_ids = extract_tile_identifiers(text)
+    infobox_name = tile_index.resolve_infobox(
+        parser_output_path, language_code, infobox_name, sprite_ids, tile_ids
+    )
+    tiles_dir = os.path.join(parser_output_path, language_code, 'tiles')
+    paths = []
+    if infobox_name:
+        paths += [
+            os.path.join(tiles_dir, 'infoboxes', f'{infobox_name}.txt'),
+            os.path.join(tiles_dir, 'crafting', f'{infobox_name}_breakage.txt'),
+            os.path.join(tiles_dir, 'crafting', f'{infobox_name}_scrapping.txt'),
+        ]
+    sprites = set(sprite_ids)
+    sprites.update(m.group(1) for m in TILE_CODESNIP_SPRITE.finditer(text))
+    for sprite in sorted(sprites):
+        path = tile_index.codesnip_path(parser_output_path, language_code, sprite)
+        if path:
+            paths.append(path)
+    return paths
+
+def orchestrate_tile(text, parser_output_path, history_path, language_code, features=None):
     """
     Args:
         text (str): Original wikitext.
         parser_output_path (str)
         history_path (str)
         language_code (str)
+        features (PageFeatures|None): Processor markers found while categorizing;
+            processors whose markers are absent are skipped
     Returns:
         (updated_text (str), processes (list[str]))
     """
@@ -54,6 +91,7 @@ def orchestrate_tile(text, parser_output_path, history_path, language_code):
     processes = []
 
     # Process each module
+    mark_processor('tile.process_infobox')
     try:
         new_text, changed = process_infobox(updated, parser_output_path, language_code, infobox_name, sprite_ids, tile_ids)
         if changed:
@@ -62,28 +100,37 @@ def orchestrate_tile(text, parser_output_path, history_path, language_code):
     except (FileNotFoundError, OSError):
         pass
 
-    try:
-        new_text, changed = process_crafting(updated, parser_output_path, infobox_name, sprite_ids, tile_ids, language_code)
-        if changed:
-            updated = new_text
-            processes.append('Crafting')
-    except (FileNotFoundError, OSError):
-        pass
+    features = features_for(updated, features)
+    if features.has("tile_crafting"):
+        mark_processor('tile.process_crafting')
+        try:
+            new_text, changed = process_crafting(updated, parser_output_path, infobox_name, sprite_ids, tile_ids, language_code)
+            if changed:
+                updated = new_text
+                processes.append('Crafting')
+        except (FileNotFoundError, OSError):
+            pass
 
-    try:
-        new_text, changed = process_code(updated, parser_output_path, infobox_name, sprite_ids, tile_ids, language_code)
-        if changed:
-            updated = new_text
-            processes.append('Code')
-    except (FileNotFoundError, OSError):
-        pass
+    features = features_for(updated, features)
+    if features.has("tile_code"):
+        mark_processor('tile.process_code')
+        try:
+            new_text, changed = process_code(updated, parser_output_path, infobox_name, sprite_ids, tile_ids, language_code, features.offset('tile_code'))
+            if changed:
+                updated = new_text
+                processes.append('Code')
+        except (FileNotFoundError, OSError):
+            pass
 
-    try:
-        new_text, changed = process_navbox(updated)
-        if changed:
-            updated = new_text
-            processes.append('Navbox')
-    except (FileNotFoundError, OSError):
-        pass
+    features = features_for(updated, features)
+    if features.has("navbox"):
+        mark_processor('tile.process_navbox')
+        try:
+            new_text, changed = process_navbox(updated, language_code)
+            if changed:
+                updated = new_text
+                processes.append('Navbox')
+        except (FileNotFoundError, OSError):
+            pass
 
     return updated, processes
@@ -1,29 +1,38 @@
 #!/usr/bin/env python
 
-import re
 import asyncio
 import os
 import pywikibot  # type: ignore
 from pywikibot import pagegenerators  # type: ignore
 from tqdm import tqdm
-from typing import Dict, List, Set, Tuple
-import concurrent.futures
+from typing import Callable, Dict, List, Optional, Set, Tuple
 import multiprocessing
-from datetime import datetime
-
-# Search patterns for different infobox types
-SEARCH_PATTERNS = {
-    "item": r"\{\{Infobox\s*item",
-    "tile": r"\{\{Infobox\s*tile",
-    "vehicle": r"\{\{Infobox\s*vehicle(?!\s+part)",
-    "vehicle_part": r"\{\{Infobox\s*vehicle\s+part",
-    "fluid": r"\{\{Infobox\s*fluid",
-    "modding": r"\{\{Header\|Modding\|Item\s+tags",
-}
-
-# Increase batch sizes and concurrency
-BATCH_SIZE = 500
-MAX_WORKERS = multiprocessing.cpu_count() * 2
+from datetime import datetime, timedelta, timezone
+from .item.file_utils import read_parser_file
+from .async_reader import (
+    AsyncWikiReader,
+    DEFAULT_CONCURRENCY,
+    fetch_pages_blocking,
+    get_api_url,
+)
+from .dump_reader import load_dump_cache
+from .registry import category_names, enabled_plugins, search_patterns
+from .diagnostics import record_event
+from .autotune import AutoTuner
+from .patterns import search_pattern
+from .features import page_features, scan_features
+
+# Defaults until the tuners have calibrated; network fetches and CPU work are tuned separately
+FETCH_BATCH_SIZE = 500
+FETCH_WORKERS = multiprocessing.cpu_count() * 2
+CPU_BATCH_SIZE = 500
+CPU_WORKERS = multiprocessing.cpu_count()
+
+fetch_tuner = AutoTuner("fetch", (50, 100, 250, 500), (2, 4, 8, 16), FETCH_BATCH_SIZE, FETCH_WORKERS)
+cpu_tuner = AutoTuner("cpu", (100, 250, 500, 1000), (1, 2, 4, CPU_WORKERS), CPU_BATCH_SIZE, CPU_WORKERS)
+
+# How long MediaWiki keeps recent changes by default ($wgRCMaxAge)
+RECENT_CHANGES_MAX_AGE = timedelta(days=90)
 
 
 def fetch_page_batch(site, titles: List[str]) -> Dict[str, str]:
@@ -33,84 +42,264 @@ def fetch_page_batch(site, titles: List[str]) -> Dict[str, str]:
     return {page.title(): page.text for page in preloaded_gen}
 
 
-async def load_wiki_cache(site) -> Dict[str, str]:
-    """Load all wiki pages into memory using concurrent processing and tqdm progress bars."""
+async def load_wiki_cache_async(
+    site,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    title_filter: Optional[Callable[[str], bool]] = None,
+) -> Dict[str, str]:
+    """Load all wiki pages into memory with the pooled asyncio reader."""
+    print(f"Loading wiki pages into memory (async, {concurrency} connections)...")
+    async with AsyncWikiReader(get_api_url(site), concurrency) as reader:
+        all_titles = await reader.list_titles(namespace=0)
+        if title_filter is not None:
+            all_titles = [title for title in all_titles if title_filter(title)]
+        if not all_titles:
+            print("No pages found to cache")
+            return {}
+
+        with tqdm(total=len(all_titles), desc="Loading pages") as pbar:
+            wiki_cache = await reader.fetch_texts(all_titles, pbar)
+
+    print(f"Loaded {len(wiki_cache)} pages into memory")
+    return wiki_cache
+
+
+async def load_wiki_cache(
+    site,
+    fetch_backend: str = "pywikibot",
+    fetch_concurrency: int = None,
+    title_filter: Optional[Callable[[str], bool]] = None,
+) -> Dict[str, str]:
+    """Load all wiki pages into memory using concurrent processing and tqdm progress bars.
+
+    Args:
+        site: The wiki site to load
+        fetch_backend: "pywikibot" or "async" page fetching
+        fetch_concurrency: Connections used by the async backend
+        title_filter: Optional predicate; only matching titles are fetched
+    """
+    if fetch_backend == "async":
+        return await load_wiki_cache_async(
+            site, fetch_concurrency or DEFAULT_CONCURRENCY, title_filter
+        )
+
     print("Loading wiki pages into memory...")
     all_pages = list(site.allpages(namespace=0, total=None, filterredir=False))
     all_titles = [page.title() for page in all_pages]
+    if title_filter is not None:
+        all_titles = [title for title in all_titles if title_filter(title)]
     total = len(all_titles)
 
     if total == 0:
         print("No pages found to cache")
         return {}
 
-    # Split into batches
-    batches = [all_titles[i : i + BATCH_SIZE] for i in range(0, total, BATCH_SIZE)]
     wiki_cache = {}
     start_ts = datetime.now()
 
-    # Process batches concurrently with progress tracking
-    with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        future_to_batch = {
-            executor.submit(fetch_page_batch, site, batch): len(batch)
-            for batch in batches
-        }
+    # Fetch batches concurrently with progress tracking; the fetch tuner
+    # calibrates batch size and workers on the first batches
+    with tqdm(total=total, desc="Loading pages") as pbar:
+
+        def on_result(batch, batch_dict):
+            wiki_cache.update(batch_dict)
+            pbar.update(len(batch))
 
-        with tqdm(total=total, desc="Loading pages") as pbar:
-            for future in concurrent.futures.as_completed(future_to_batch):
-                try:
-                    batch_dict = future.result()
-                    wiki_cache.update(batch_dict)
-                    batch_size = future_to_batch[future]
-                    pbar.update(batch_size)
-
-                    # Calculate and display ETA
-                    done = pbar.n
-                    elapsed = (datetime.now() - start_ts).total_seconds() or 0.001
-                    eta = int((total - done) * (elapsed / done))
-                    pbar.set_postfix(eta=f"{eta}s")
-                except Exception as e:
-                    print(f"Error loading batch: {e}")
+            # Calculate and display ETA
+            done = pbar.n
+            elapsed = (datetime.now() - start_ts).total_seconds() or 0.001
+            eta = int((total - done) * (elapsed / done))
+            pbar.set_postfix(eta=f"{eta}s")
+
+        def on_error(batch, e):
+            pbar.update(len(batch))
+            record_event("batch_failed", "load_wiki_cache", detail=str(e), level="error")
+
+        fetch_tuner.run(
+            all_titles, lambda batch: fetch_page_batch(site, batch), on_result, on_error
+        )
 
     print(f"Loaded {len(wiki_cache)} pages into memory")
     return wiki_cache
 
 
+def fetch_changed_titles(site, since: str, namespaces=(0,)) -> Set[str]:
+    """
+    Collect the titles of pages changed since a timestamp.
+
+    Args:
+        site: The wiki site to query
+        since: ISO 8601 timestamp, e.g. "2025-01-31T00:00:00Z"
+        namespaces: Namespace IDs to include
+
+    Returns:
+        Set of page titles edited, created, moved or deleted after the timestamp
+    """
+    changed = set()
+    for change in site.recentchanges(
+        start=pywikibot.Timestamp.fromISOformat(since),
+        reverse=True,
+        namespaces=list(namespaces),
+    ):
+        if change.get("title"):
+            changed.add(change["title"])
+        # Moves also touch their target page
+        target = change.get("logparams", {}).get("target_title")
+        if target:
+            changed.add(target)
+    return changed
+
+
+def recent_changes_cover(site, since: str) -> bool:
+    """
+    Check whether recentchanges still reaches back to a timestamp.
+
+    The wiki drops changes older than its retention window, so changes made
+    between an old timestamp and the oldest entry still kept are lost.
+
+    Args:
+        site: The wiki site to query
+        since: ISO 8601 timestamp, e.g. "2025-01-31T00:00:00Z"
+
+    Returns:
+        True if no change after the timestamp can have been dropped
+    """
+    since_ts = pywikibot.Timestamp.fromISOformat(since)
+    oldest = next(iter(site.recentchanges(reverse=True, total=1)), None)
+    if oldest is None:
+        # Nothing kept at all; trust only a gap shorter than the default window
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return now - since_ts.replace(tzinfo=None) < RECENT_CHANGES_MAX_AGE
+    return pywikibot.Timestamp.fromISOformat(oldest["timestamp"]) <= since_ts
+
+
+async def load_wiki_cache_from_dump(
+    site,
+    dump_path: str,
+    fetch_backend: str = "pywikibot",
+    fetch_concurrency: int = None,
+    title_filter: Optional[Callable[[str], bool]] = None,
+) -> Dict[str, str]:
+    """
+    Load the wiki cache from an XML dump, refreshing only pages edited after it.
+
+    Args:
+        site: The wiki site, used for the post-dump catch-up
+        dump_path: Path to a pages-articles dump, optionally compressed
+        fetch_backend: "pywikibot" or "async" page fetching for the catch-up
+        fetch_concurrency: Connections used by the async backend
+        title_filter: Optional predicate; only matching titles are kept
+    """
+    print(f"Loading wiki pages from dump {dump_path}...")
+    wiki_cache, _, dump_timestamp = load_dump_cache(dump_path)
+    if title_filter is not None:
+        wiki_cache = {
+            title: text for title, text in wiki_cache.items() if title_filter(title)
+        }
+    print(f"Loaded {len(wiki_cache)} pages from dump (newest revision {dump_timestamp})")
+
+    if site is None or dump_timestamp is None:
+        return wiki_cache
+
+    if not recent_changes_cover(site, dump_timestamp):
+        print(
+            f"Dump is older than the recent changes kept by the wiki ({dump_timestamp}); "
+            "changes since then cannot be caught up, loading every page live instead"
+        )
+        return await load_wiki_cache(site, fetch_backend, fetch_concurrency, title_filter)
+
+    changed_titles = sorted(fetch_changed_titles(site, dump_timestamp))
+    if title_filter is not None:
+        changed_titles = [title for title in changed_titles if title_filter(title)]
+    if not changed_titles:
+        return wiki_cache
+
+    print(f"Refreshing {len(changed_titles)} pages changed since the dump...")
+    refresh_pages(site, wiki_cache, changed_titles, fetch_backend, fetch_concurrency)
+    return wiki_cache
+
+
+def refresh_pages(
+    site,
+    wiki_cache: Dict[str, str],
+    titles: List[str],
+    fetch_backend: str = "pywikibot",
+    fetch_concurrency: int = None,
+) -> None:
+    """
+    Re-fetch a set of pages into an existing wiki cache.
+
+    Args:
+        site: The wiki site to fetch from
+        wiki_cache: Cache to update in place
+        titles: Page titles to re-fetch
+        fetch_backend: "pywikibot" or "async" page fetching
+        fetch_concurrency: Connections used by the async backend
+    """
+    titles = list(titles)
+    if fetch_backend == "async":
+        refreshed = fetch_pages_blocking(
+            site, titles, fetch_concurrency or DEFAULT_CONCURRENCY
+        )
+    else:
+        refreshed = {}
+
+        def on_error(batch, e):
+            record_event("batch_failed", "refresh_pages", detail=str(e), level="error")
+
+        fetch_tuner.run(
+            titles,
+            lambda batch: fetch_page_batch(site, batch),
+            lambda batch, batch_dict: refreshed.update(batch_dict),
+            on_error,
+        )
+
+    # Pages that can no longer be fetched were deleted or moved away
+    for title in titles:
+        if title in refreshed and refreshed[title]:
+            wiki_cache[title] = refreshed[title]
+        else:
+            wiki_cache.pop(title, None)
+
+
 def categorize_page(text: str) -> Set[str]:
     """Categorize a page based on its content."""
     categories = set()
 
-    # Check each pattern
-    for category, pattern in SEARCH_PATTERNS.items():
-        if re.search(pattern, text, re.IGNORECASE):
+    # Check the pattern of each enabled orchestrator
+    for category, pattern in search_patterns().items():
+        if search_pattern(category, pattern).search(text):
             categories.add(category)
 
     return categories
 
 
 def process_batch(batch: List[Tuple[str, str]]) -> Dict[str, List[str]]:
-    """Process a batch of pages using multiple threads."""
+    """
+    Categorize a batch of pages; batches run in parallel under the CPU tuner.
+
+    The processor markers of every categorized page are recorded in
+    page_features as well, so orchestrators can skip absent processors.
+    """
     results = {}
-    with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        # Create a list of futures for parallel processing
-        futures = []
-        for title, text in batch:
-            future = executor.submit(categorize_page, text)
-            futures.append((title, future))
-
-        # Process results as they complete
-        for title, future in futures:
-            categories = future.result()
-            for category in categories:
-                if category not in results:
-                    results[category] = []
-                results[category].append(title)
+    for title, text in batch:
+        categories = categorize_page(text)
+        if categories:
+            page_features.record(title, scan_features(text, categories))
+        for category in categories:
+            if category not in results:
+                results[category] = []
+            results[category].append(title)
 
     return results
 
 
 def scan_template_files(
-    site: pywikibot.Site, parser_output_path: str, language_code: str
+    site: pywikibot.Site,
+    parser_output_path: str,
+    language_code: str,
+    fetch_backend: str = "pywikibot",
+    fetch_concurrency: int = None,
 ) -> List[str]:
     """
     Scan template files and return list of template page titles that need updating.
@@ -119,6 +308,8 @@ def scan_template_files(
         site: Pywikibot site object
         parser_output_path: Path to the parser output files
         language_code: Language code for the page
+        fetch_backend: "pywikibot" to fetch pages one by one, "async" to bulk read them
+        fetch_concurrency: Connections used by the async backend
 
     Returns:
         List of template page titles that need updating
@@ -141,6 +332,15 @@ def scan_template_files(
         print(f"Error reading templates folder {templates_folder}: {e}")
         return template_titles
 
+    # Bulk read every template page up front with the async backend
+    page_texts = None
+    if fetch_backend == "async":
+        page_texts = fetch_pages_blocking(
+            site,
+            [f"Template:Tag_{f[:-4]}" for f in template_files],
+            fetch_concurrency or DEFAULT_CONCURRENCY,
+        )
+
     for template_file in template_files:
         # Extract template name (remove .txt extension)
         template_name = template_file[:-4]  # Remove .txt
@@ -149,8 +349,14 @@ def scan_template_files(
 
         try:
             # Read the template file content
-            with open(file_path, "r", encoding="utf-8") as f:
-                file_content = f.read()
+            file_content = read_parser_file(file_path)
+
+            if page_texts is not None:
+                existing = page_texts.get(page_title)
+                if existing is not None and existing.strip() == file_content.strip():
+                    continue
+                template_titles.append(page_title)
+                continue
 
             # Get the wiki page
             page = pywikibot.Page(site, page_title)
@@ -165,7 +371,13 @@ def scan_template_files(
             template_titles.append(page_title)
 
         except Exception as e:
-            print(f"Error processing template file {file_path}: {e}")
+            record_event(
+                "template_file_failed",
+                "scan_template_files",
+                language_code,
+                f"{file_path}: {e}",
+                "error",
+            )
             continue
 
     return template_titles
@@ -176,48 +388,39 @@ async def process_pages(
     parser_output_path: str = None,
     language_code: str = "en",
     site: pywikibot.Site = None,
+    fetch_backend: str = "pywikibot",
+    fetch_concurrency: int = None,
 ) -> Dict[str, List[str]]:
     """Process all pages and categorize them using multiple threads with progress bar."""
     print("Categorizing pages...")
 
     # Initialize category lists
-    categorized_pages = {
-        "item": [],
-        "tile": [],
-        "vehicle": [],
-        "vehicle_part": [],
-        "fluid": [],
-        "modding": [],
-        "tag": [],
-    }
-
-    # Split into larger batches for parallel processing
-    items = list(wiki_cache.items())
-    batches = [items[i : i + BATCH_SIZE] for i in range(0, len(items), BATCH_SIZE)]
-
-    # Process batches concurrently using ThreadPoolExecutor with progress bar
-    with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        # Submit all batch processing tasks
-        future_to_batch = {
-            executor.submit(process_batch, batch): batch for batch in batches
-        }
+    categorized_pages = {category: [] for category in category_names()}
+
+    # Process batches concurrently with progress bar; the CPU tuner
+    # calibrates batch size and workers on the first batches
+    with tqdm(total=len(wiki_cache), desc="Processing pages") as pbar:
+
+        def on_result(batch, batch_result):
+            for category, titles in batch_result.items():
+                categorized_pages[category].extend(titles)
+            pbar.update(len(batch))
+
+        def on_error(batch, e):
+            pbar.update(len(batch))
+            record_event("batch_failed", "process_pages", language_code, str(e), "error")
 
-        # Process results as they complete with progress bar
-        with tqdm(total=len(batches), desc="Processing batches") as pbar:
-            for future in concurrent.futures.as_completed(future_to_batch):
-                try:
-                    batch_result = future.result()
-                    for category, titles in batch_result.items():
-                        categorized_pages[category].extend(titles)
-                    pbar.update(1)
-                except Exception as e:
-                    print(f"Error processing batch: {e}")
+        cpu_tuner.run(wiki_cache.items(), process_batch, on_result, on_error)
 
     # Scan template files and add to tag category (if parser_output_path provided)
-    if parser_output_path and site:
+    scan_plugins = [plugin for plugin in enabled_plugins() if plugin.template_scan]
+    if parser_output_path and site and scan_plugins:
         print("Scanning tag template files...")
-        template_titles = scan_template_files(site, parser_output_path, language_code)
-        categorized_pages["tag"].extend(template_titles)
+        template_titles = scan_template_files(
+            site, parser_output_path, language_code, fetch_backend, fetch_concurrency
+        )
+        for plugin in scan_plugins:
+            categorized_pages[plugin.name].extend(template_titles)
         print(f"Found {len(template_titles)} tag templates to update")
 
     # Sort each category list alphabetically
@@ -230,9 +433,13 @@ async def process_pages(
 async def search_wiki(
     site,
     language_pages=None,
-    cpu_threads=None,
+    cpu_workers=None,
     parser_output_path=None,
     language_code="en",
+    fetch_backend="pywikibot",
+    fetch_concurrency=None,
+    dump_path=None,
+    title_filter=None,
 ) -> Tuple[Dict[str, List[str]], Dict[str, str]]:
     """Main function to search and categorize wiki pages.
 
@@ -240,16 +447,26 @@ async def search_wiki(
         site: The wiki site to search
         language_pages: If True or None, process all pages. If False, exclude pages with language codes.
                       If a list, only process those specific pages.
-        cpu_threads: Optional number of CPU threads to use for processing
+        cpu_workers: Optional number of categorization workers, pinning the CPU tuner
         parser_output_path: Path to parser output files for template scanning
         language_code: Language code for template scanning
+        fetch_backend: "pywikibot" or "async" page fetching
+        fetch_concurrency: Connections used by the async backend
+        dump_path: Optional XML dump to read pages from instead of the API
+        title_filter: Optional predicate; only matching titles are loaded, e.g. one shard
     """
-    global MAX_WORKERS
-    if cpu_threads is not None:
-        MAX_WORKERS = cpu_threads
+    if cpu_workers is not None:
+        cpu_tuner.pin(cpu_tuner.pinned_batch_size, cpu_workers)
 
     # Load all pages into memory
-    wiki_cache = await load_wiki_cache(site)
+    if dump_path:
+        wiki_cache = await load_wiki_cache_from_dump(
+            site, dump_path, fetch_backend, fetch_concurrency, title_filter
+        )
+    else:
+        wiki_cache = await load_wiki_cache(
+            site, fetch_backend, fetch_concurrency, title_filter
+        )
 
     # Handle language pages filtering
     if isinstance(language_pages, list):
@@ -269,16 +486,87 @@ async def search_wiki(
 
     # Process and categorize pages
     categorized_pages = await process_pages(
-        wiki_cache, parser_output_path, language_code, site
+        wiki_cache,
+        parser_output_path,
+        language_code,
+        site,
+        fetch_backend,
+        fetch_concurrency,
     )
 
     return categorized_pages, wiki_cache  # Return both categorized pages and wiki cache
 
 
+def get_language_code(title: str, default_language: str = "en") -> str:
+    """Derive the language code of a page from its title suffix."""
+    if title.startswith("User:") or "/" not in title:
+        return default_language
+    return title.rsplit("/", 1)[1]
+
+
+def partition_by_language(
+    wiki_cache: Dict[str, str], default_language: str = "en", languages=None
+) -> Dict[str, Dict[str, str]]:
+    """Split the wiki cache into one partition per language suffix.
+
+    Args:
+        wiki_cache: Dictionary mapping page titles to page text
+        default_language: Language code of pages without a suffix
+        languages: Optional list of language codes to keep, all if None
+
+    Returns:
+        Dictionary mapping language codes to their share of the wiki cache
+    """
+    partitions = {}
+    for title, text in wiki_cache.items():
+        language_code = get_language_code(title, default_language)
+        if languages is not None and language_code not in languages:
+            continue
+        partitions.setdefault(language_code, {})[title] = text
+
+    return partitions
+
+
+async def load_language_partitions(
+    site,
+    cpu_workers=None,
+    default_language="en",
+    languages=None,
+    fetch_backend="pywikibot",
+    fetch_concurrency=None,
+    dump_path=None,
+) -> Dict[str, Dict[str, str]]:
+    """Load the wiki once and partition its pages by language suffix.
+
+    Args:
+        site: The wiki site to load
+        cpu_workers: Optional number of categorization workers, pinning the CPU tuner
+        default_language: Language code of pages without a suffix
+        languages: Optional list of language codes to keep, all if None
+        fetch_backend: "pywikibot" or "async" page fetching
+        fetch_concurrency: Connections used by the async backend
+        dump_path: Optional XML dump to read pages from instead of the API
+    """
+    if cpu_workers is not None:
+        cpu_tuner.pin(cpu_tuner.pinned_batch_size, cpu_workers)
+
+    if dump_path:
+        wiki_cache = await load_wiki_cache_from_dump(
+            site, dump_path, fetch_backend, fetch_concurrency
+        )
+    else:
+        wiki_cache = await load_wiki_cache(site, fetch_backend, fetch_concurrency)
+    partitions = partition_by_language(wiki_cache, default_language, languages)
+    for language_code in sorted(partitions):
+        print(f"{language_code}: {len(partitions[language_code])} pages")
+
+    return partitions
+
+
 def get_ordered_page_list(categorized_pages: Dict[str, List[str]]) -> List[str]:
     """Get an ordered list of pages based on category priority."""
-    # Define the order of categories
-    category_order = ["item", "tile", "vehicle", "vehicle_part", "fluid", "modding"]
+    # Categories found by searching page text, in registry order
+    category_order = list(search_patterns())
 
     # Combine lists in order
     ordered_list = []
@@ -1,5 +1,7 @@
 import os
-import re
+from ..diagnostics import record_event
+from ..item.item_infobox import article_file_name
+from ..patterns import VEHICLE_INFOBOX_BLOCK
 
 
 # --------------------------------------------------------------------------
@@ -90,7 +92,7 @@ def process_infobox(
     from ..item.file_utils import read_file_with_subfolders
 
     # 1) Extract the first {{Infobox vehicle…}} block
-    match = re.search(r"(\{\{Infobox\s*vehicle[\s\S]*?\n\}\})", text, re.IGNORECASE)
+    match = VEHICLE_INFOBOX_BLOCK.search(text)
     if not match:
         return text, False
     infobox_block = match.group(1)
@@ -109,15 +111,7 @@ def process_infobox(
 
     # Try with article name first if available
     if article_name:
-        article_name = article_name.replace(" ", "_")
-        article_name = article_name.replace("'", "%27")
-        article_name = article_name.replace(":", "%3A")
-        article_name = article_name.replace('"', "%22")
-        article_name = article_name.replace(",", "%2C")
-        article_name = article_name.replace("!", "%21")
-        article_name = article_name.replace(";", "%3B")
-        article_name = article_name.replace("&", "%26")
-        article_name = article_name.replace("?", "%3F")
+        article_name = article_file_name(article_name)
         article_file_path = os.path.join(
             parser_output_path,
             language_code,
@@ -133,7 +127,12 @@ def process_infobox(
             if "41.78.16" in infobox_block:
                 pass
             else:
-                print(f"Article file not found: {article_file_path}")
+                record_event(
+                    "article_file_missing",
+                    "vehicle.process_infobox",
+                    language_code,
+                    article_file_path,
+                )
                 pass
 
     # If article name file doesn't exist or no article name provided, use vehicle_id
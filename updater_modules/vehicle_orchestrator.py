@@ -1,7 +1,33 @@
 #!/usr/bin/env python
 
-import re
+import os
+from scripts.userscripts.updater_modules.item.item_infobox import article_file_name  # type: ignore
 from scripts.userscripts.updater_modules.vehicle.vehicle_infobox import process_infobox  # type: ignore
+from scripts.userscripts.updater_modules.watchdog import mark_processor  # type: ignore
+from scripts.userscripts.updater_modules.patterns import VEHICLE_ID, VEHICLE_INFOBOX_BODY  # type: ignore
+
+
+def find_vehicle_id(text):
+    """Return the vehicle_id of the page's Infobox vehicle, or None."""
+    m = VEHICLE_INFOBOX_BODY.search(text)
+    if not m:
+        return None
+    id_match = VEHICLE_ID.search(m.group(1))
+    return id_match.group(1).strip() if id_match else None
+
+
+def prefetch_vehicle_paths(
+    text, parser_output_path, history_path, language_code, article_name=None
+):
+    """Parser files the vehicle processors are likely to read for a page, for the prefetcher."""
+    infobox_dir = os.path.join(parser_output_path, language_code, "vehicle", "infoboxes")
+    paths = []
+    if article_name:
+        paths.append(os.path.join(infobox_dir, f"{article_file_name(article_name)}.txt"))
+    vehicle_id = find_vehicle_id(text)
+    if vehicle_id:
+        paths.append(os.path.join(infobox_dir, f"{vehicle_id}.txt"))
+    return paths
 
 
 def orchestrate_vehicle(
@@ -17,19 +43,14 @@ def orchestrate_vehicle(
     Returns:
         (updated_text (str), processes (list[str]))
     """
-    # 1) Extract the Infobox vehicle block
-    m = re.search(r"\{\{Infobox\s*vehicle(.*?)\}\}", text, re.DOTALL | re.IGNORECASE)
-    if m:
-        infobox_body = m.group(1)
-        id_match = re.search(r"\|\s*vehicle_id\s*=\s*([^\|\n]+)", infobox_body)
-        vehicle_id = id_match.group(1).strip() if id_match else None
-    else:
-        vehicle_id = None
+    # 1) Extract the vehicle_id of the Infobox vehicle block
+    vehicle_id = find_vehicle_id(text)
 
     updated = text
     processes = []
 
     # 2) Run through each processor
+    mark_processor("vehicle.process_infobox")
     try:
         new_text, changed = process_infobox(
             updated, parser_output_path, language_code, vehicle_id, article_name
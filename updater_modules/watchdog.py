@@ -0,0 +1,288 @@
+#!/usr/bin/env python
+
+import json
+import multiprocessing
+import signal
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .diagnostics import diagnostics
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; memory limits are skipped there
+    resource = None
+
+# Name of the processor running in this worker process, shared with the parent
+_current_processor = None
+
+# Pages cancelled during the run
+quarantine: List[Dict] = []
+_quarantine_lock = threading.Lock()
+
+
+def mark_processor(name: str) -> None:
+    """
+    Record which processor is about to run, so a page that has to be
+    cancelled can be reported against it. A no-op outside watchdog workers.
+    """
+    if _current_processor is not None:
+        _current_processor.value = name.encode("utf-8")[:127]
+
+
+def _address_space() -> Optional[int]:
+    """Current virtual memory size of this process in bytes, if known."""
+    try:
+        with open("/proc/self/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmSize:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _worker_main(conn, func, processor, memory_limit_mb, initializer, initargs) -> None:
+    """Set the worker up, then run pages sent over conn until the parent closes it."""
+    global _current_processor
+    _current_processor = processor
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    diagnostics.forward_in_child()
+
+    if initializer is not None:
+        try:
+            initializer(*initargs)
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+            return
+    conn.send(("ready", None))
+
+    # The limit counts from the set-up worker, so building its indexes is not charged to a page
+    if memory_limit_mb and resource is not None:
+        current = _address_space()
+        if current is not None:
+            limit = current + memory_limit_mb * 1024 * 1024
+            _, hard = resource.getrlimit(resource.RLIMIT_AS)
+            if hard != resource.RLIM_INFINITY:
+                limit = min(limit, hard)
+            resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+    while True:
+        try:
+            args = conn.recv()
+        except EOFError:
+            return
+        try:
+            reply = ("ok", func(*args))
+        except MemoryError:
+            reply = ("memory", processor.value.decode("utf-8", "replace"))
+        except Exception as e:
+            reply = ("error", f"{type(e).__name__}: {e}")
+        # Diagnostics recorded while processing travel back with the result
+        conn.send(reply + (diagnostics.take_forwarded(),))
+
+
+class PageWatchdog:
+    """
+    Runs page processing in a worker process under a time and memory budget.
+
+    The worker is started from a fork server (or spawned where there is none)
+    rather than forked from this process, whose other threads may hold locks
+    at fork time that the worker would then wait on forever. It starts
+    without this process's state, so it first runs initializer(*initargs),
+    which has to rebuild whatever func reads, and is then reused for every
+    page. A page that runs past the timeout gets its worker killed and
+    replaced, and the page is quarantined along with the processor that was
+    running.
+
+    func, initializer and initargs are pickled, so the functions must be
+    importable by name.
+
+    Args:
+        func: Callable run in the worker for each page
+        timeout: Seconds a single page may take
+        memory_limit_mb: Extra address space a worker may allocate, None for no limit
+        initializer: Callable run once in each new worker, before any page
+        initargs: Arguments passed to initializer
+    """
+
+    def __init__(
+        self,
+        func: Callable[..., Any],
+        timeout: float,
+        memory_limit_mb: Optional[int] = None,
+        initializer: Optional[Callable[..., None]] = None,
+        initargs: Tuple = (),
+    ):
+        self.func = func
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.initializer = initializer
+        self.initargs = initargs
+        methods = multiprocessing.get_all_start_methods()
+        self.context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        self.process = None
+        self.conn = None
+        self.processor = None
+        # Set when a worker could not be set up; pages then run in this process
+        self.failed = False
+
+    def __enter__(self) -> "PageWatchdog":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _spawn(self) -> bool:
+        """Start a worker and wait until it is set up; False if that failed."""
+        self.processor = self.context.RawArray("c", 128)
+        parent_conn, child_conn = self.context.Pipe()
+        self.process = self.context.Process(
+            target=_worker_main,
+            args=(
+                child_conn,
+                self.func,
+                self.processor,
+                self.memory_limit_mb,
+                self.initializer,
+                self.initargs,
+            ),
+            daemon=True,
+        )
+        try:
+            self.process.start()
+        except Exception as e:
+            kind, detail = "error", f"{type(e).__name__}: {e}"
+            self.process = None
+        else:
+            self.conn = parent_conn
+        # Only the worker holds this end now, so its exit ends the wait below
+        child_conn.close()
+        if self.process is not None:
+            try:
+                kind, detail = parent_conn.recv()
+            except EOFError:
+                self.process.join()
+                kind, detail = "error", f"worker exited with code {self.process.exitcode}"
+        if kind == "ready":
+            return True
+
+        self._kill()
+        parent_conn.close()
+        print(f"Watchdog worker could not be started ({detail}), processing pages without a watchdog")
+        self.failed = True
+        return False
+
+    def _kill(self) -> None:
+        if self.process is not None:
+            self.process.kill()
+            self.process.join()
+            self.conn.close()
+        self.process = None
+        self.conn = None
+
+    def close(self) -> None:
+        if self.process is not None:
+            self.conn.close()
+            self.process.join(timeout=5)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join()
+        self.process = None
+        self.conn = None
+
+    def run(self, title: str, category: str, *args) -> Tuple[bool, Any]:
+        """
+        Process one page in the worker.
+
+        Args:
+            title: Page title, for the quarantine report
+            category: Page category, for the quarantine report
+            *args: Arguments passed on to func
+
+        Returns:
+            (True, result of func) on success, (False, None) if the page was quarantined
+        """
+        if not self.failed and (self.process is None or not self.process.is_alive()):
+            self._spawn()
+        if self.failed:
+            return True, self.func(*args)
+
+        self.processor.value = b""
+        start = time.perf_counter()
+        self.conn.send(args)
+
+        reason = detail = None
+        if self.conn.poll(self.timeout):
+            try:
+                kind, payload, events = self.conn.recv()
+                diagnostics.extend(events)
+            except EOFError:
+                kind, payload = "crash", None
+            if kind == "ok":
+                return True, payload
+            reason, detail = kind, payload
+        else:
+            reason = "timeout"
+
+        processor = self.processor.value.decode("utf-8", "replace") or None
+        if reason != "error":
+            # Timed out, out of memory or crashed: the worker is not reusable
+            self._kill()
+
+        add_quarantine(
+            title,
+            category,
+            reason,
+            processor,
+            time.perf_counter() - start,
+            detail if reason == "error" else None,
+        )
+        return False, None
+
+
+def add_quarantine(
+    title: str,
+    category: str,
+    reason: str,
+    processor: Optional[str],
+    seconds: float,
+    detail: Optional[str] = None,
+) -> None:
+    entry = {
+        "title": title,
+        "category": category,
+        "reason": reason,
+        "processor": processor,
+        "seconds": round(seconds, 2),
+    }
+    if detail:
+        entry["detail"] = detail
+    with _quarantine_lock:
+        quarantine.append(entry)
+    print(f"Quarantined {title} ({reason} in {processor or 'unknown processor'})")
+
+
+def print_quarantine_report() -> None:
+    """Print the pages quarantined during the run."""
+    if not quarantine:
+        return
+    print(f"\n{len(quarantine)} pages quarantined")
+    print(f"{'Page':<40}{'Category':<10}{'Reason':<9}{'Seconds':>9}  Processor")
+    for entry in sorted(quarantine, key=lambda e: (e["category"], e["title"])):
+        print(
+            f"{entry['title'][:39]:<40}{entry['category']:<10}{entry['reason']:<9}"
+            f"{entry['seconds']:>9.1f}  {entry['processor'] or '-'}"
+        )
+
+
+def write_quarantine_report(path: str) -> None:
+    """Write the quarantined pages to a JSON file."""
+    if not quarantine:
+        return
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(quarantine, f, indent=2)
+    except OSError as e:
+        print(f"Could not write quarantine report {path}: {e}")
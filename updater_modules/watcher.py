@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+# inotify event flags, see inotify(7)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+)
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def _as_dir(path: str) -> str:
+    """Mark a path as a directory by giving it a trailing separator."""
+    return os.path.join(path, "")
+
+
+class InotifyWatcher:
+    """
+    Recursive directory watcher on top of Linux inotify.
+
+    Changed files are reported by path; changed directories (created, moved
+    or deleted as a whole, or the queue overflowing) are reported with a
+    trailing separator, meaning everything below them may have changed.
+    """
+
+    def __init__(self, roots: Iterable[str]):
+        libc_name = ctypes.util.find_library("c")
+        if sys.platform != "linux" or not libc_name:
+            raise OSError("inotify is only available on Linux")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("libc has no inotify support")
+
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.roots = [root for root in roots if root and os.path.isdir(root)]
+        self._paths_by_wd: Dict[int, str] = {}
+        try:
+            for root in self.roots:
+                self._add_tree(root)
+        except OSError:
+            self.close()
+            raise
+
+    def _add_watch(self, directory: str) -> None:
+        wd = self._libc.inotify_add_watch(
+            self.fd, os.fsencode(directory), WATCH_MASK
+        )
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOENT:
+                return  # Removed before we got to it
+            raise OSError(err, f"inotify_add_watch failed for {directory}")
+        self._paths_by_wd[wd] = directory
+
+    def _add_tree(self, root: str) -> None:
+        for dirpath, _, _ in os.walk(root):
+            self._add_watch(dirpath)
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+    def read_events(self, timeout: Optional[float]) -> Set[str]:
+        """
+        Wait up to timeout seconds (forever if None) and return changed paths.
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        changed = set()
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            changed.update(self._parse(data))
+        return changed
+
+    def _parse(self, data: bytes) -> Set[str]:
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped, so everything may have changed
+                changed.update(_as_dir(root) for root in self.roots)
+                continue
+            if mask & IN_IGNORED:
+                self._paths_by_wd.pop(wd, None)
+                continue
+
+            directory = self._paths_by_wd.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_DELETE_SELF:
+                changed.add(_as_dir(directory))
+                continue
+
+            path = os.path.join(directory, name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and os.path.isdir(path):
+                    # Files moved in with the directory raise no events of their own
+                    self._add_tree(path)
+                changed.add(_as_dir(path))
+            elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_DELETE):
+                changed.add(path)
+        return changed
+
+
+class PollingWatcher:
+    """Directory watcher that compares snapshots of file mtimes and sizes."""
+
+    def __init__(self, roots: Iterable[str], interval: float = 10.0):
+        self.roots = [root for root in roots if root and os.path.isdir(root)]
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        for root in self.roots:
+            for dirpath, _, filenames in os.walk(root):
+                for filename in filenames:
+                    path = os.path.join(dirpath, filename)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def close(self) -> None:
+        pass
+
+    def read_events(self, timeout: Optional[float]) -> Set[str]:
+        """
+        Sleep for timeout seconds (the poll interval if None), rescan and
+        return the paths that were added, removed or modified.
+        """
+        time.sleep(self.interval if timeout is None else timeout)
+        snapshot = self._scan()
+        previous = self._snapshot
+        self._snapshot = snapshot
+
+        changed = {path for path in snapshot if previous.get(path) != snapshot[path]}
+        changed.update(path for path in previous if path not in snapshot)
+        return changed
+
+
+def create_watcher(roots: Iterable[str], poll_interval: float = 10.0):
+    """Watch roots with inotify where available, otherwise by polling."""
+    roots = list(roots)
+    try:
+        return InotifyWatcher(roots)
+    except OSError as e:
+        print(f"inotify unavailable ({e}), polling every {poll_interval}s instead")
+        return PollingWatcher(roots, poll_interval)
+
+
+def collect_changes(watcher, debounce: float = 5.0, max_delay: float = 60.0) -> Set[str]:
+    """
+    Block until files change, then keep collecting until writes settle.
+
+    A batch closes once no new change has arrived for `debounce` seconds, or
+    `max_delay` seconds after its first change, whichever comes first.
+    """
+    changed = set()
+    while not changed:
+        changed |= watcher.read_events(None)
+
+    first = time.monotonic()
+    while True:
+        remaining = max_delay - (time.monotonic() - first)
+        if remaining <= 0:
+            break
+        more = watcher.read_events(min(debounce, remaining))
+        if not more:
+            break
+        changed |= more
+    return changed